@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import random
+import re
+import time
+import pandas as pd
+from nutrient_parsing import CANONICAL_UNITS, _parse_text, parse_column, parse_nutrient
+
+RAW_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '1.2_Raw_Data')
+RAW_FILES = ['mcdonalds_products_data.json', 'wendys_menu_mapped.json', 'kfc_menu_mapped.json']
+
+
+def clean_numeric(value):
+    """Previous data_processing_en parser, kept as the reference for the comparison"""
+    if pd.isna(value) or value == "" or value is None:
+        return None
+    value_str = str(value).lower().strip()
+    if '-' in value_str:
+        parts = value_str.split('-')
+        try:
+            nums = [float(re.sub(r'[^\d.]', '', p)) for p in parts]
+            return sum(nums) / len(nums)
+        except:
+            pass
+    cleaned = re.sub(r'[^\d.]', '', value_str)
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+def raw_values(raw_dir):
+    """(nutrient, value) for every nutrient of every raw item"""
+    values = []
+    for filename in RAW_FILES:
+        with open(os.path.join(raw_dir, filename), 'r', encoding='utf-8') as f:
+            for item in json.load(f):
+                values += [(nutrient, item.get(nutrient)) for nutrient in CANONICAL_UNITS]
+    return values
+
+
+def synthetic_column(size, distinct, seed=0):
+    """`size` calorie strings drawn from `distinct` different ones, in the shapes the scrapers produce"""
+    rng = random.Random(seed)
+    shapes = ['{a} kcal', '{a} - {b} kcal', '{a} – {b} kcal', '{k} kJ / {a} kcal', '{a}', '']
+    pool = [rng.choice(shapes).format(a=rng.randint(5, 1500), b=rng.randint(1500, 2500), k=rng.randint(20, 6000))
+            for _ in range(distinct)]
+    return [rng.choice(pool) for _ in range(size)]
+
+
+def best_ms(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        _parse_text.cache_clear()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nutrient string parsing: previous clean_numeric vs nutrient_parsing")
+    parser.add_argument('--raw-dir', default=RAW_DATA_DIR)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--distinct', type=int, default=2000, help="Different strings in the synthetic columns")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    # Where the two parsers disagree on the real raw files
+    values = raw_values(args.raw_dir)
+    differences = [(nutrient, value, clean_numeric(value), parse_nutrient(value, nutrient))
+                   for nutrient, value in values if clean_numeric(value) != parse_nutrient(value, nutrient)]
+    print(f"Raw values: {len(values)}, parsed differently: {len(differences)}")
+    for nutrient, value, old, new in differences:
+        print(f"  {nutrient:<9} {value!r:<22} clean_numeric={old}  parse_nutrient={new}")
+
+    print(f"\n{'values':>9} {'clean_numeric ms':>17} {'parse_nutrient ms':>18} {'parse_column ms':>16} {'speedup':>8}")
+    for size in args.sizes:
+        column = synthetic_column(size, args.distinct)
+        series = pd.Series(column)
+        old = best_ms(lambda: [clean_numeric(value) for value in column], args.repeat)
+        new = best_ms(lambda: [parse_nutrient(value, 'calories') for value in column], args.repeat)
+        vectorized = best_ms(lambda: parse_column(series, 'calories'), args.repeat)
+        print(f"{size:>9} {old:>17.1f} {new:>18.1f} {vectorized:>16.1f} {old / vectorized:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
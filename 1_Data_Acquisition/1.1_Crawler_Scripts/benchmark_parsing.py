@@ -0,0 +1,88 @@
+import argparse
+import glob
+import os
+import time
+from bs4 import BeautifulSoup
+from html_parsing import (KFC_CATEGORY_TAGS, KFC_DETAIL_TAGS, MCDONALDS_CATEGORY_TAGS,
+                          WENDYS_CATEGORY_TAGS, WENDYS_DETAIL_TAGS, make_soup)
+
+# Small pages with the markup each extractor reads, plus typical head / nav / script weight
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'fixtures')
+
+TAG_SETS = {
+    'kfc-detail': KFC_DETAIL_TAGS,
+    'kfc-category': KFC_CATEGORY_TAGS,
+    'mcdonalds-category': MCDONALDS_CATEGORY_TAGS,
+    'wendys-category': WENDYS_CATEGORY_TAGS,
+    'wendys-detail': WENDYS_DETAIL_TAGS,
+}
+
+
+def available_parsers():
+    parsers = ['html.parser']
+    for name, module in (('lxml', 'lxml'), ('html5lib', 'html5lib')):
+        try:
+            __import__(module)
+            parsers.append(name)
+        except ImportError:
+            pass
+    return parsers
+
+
+def load_fixtures(path):
+    """Saved HTML pages: *.html files, or *.body files from an http_cache directory"""
+    pages = []
+    for filename in sorted(glob.glob(os.path.join(path, '*.html')) + glob.glob(os.path.join(path, '*.body'))):
+        with open(filename, 'rb') as f:
+            content = f.read()
+        if b'<' in content[:2048]:  # skip cached JSON API responses
+            pages.append((os.path.basename(filename), content))
+    return pages
+
+
+def time_parse(func, repeat):
+    """Best-of-N wall time in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page HTML parse time for each backend")
+    parser.add_argument('fixtures', nargs='?', default=DEFAULT_FIXTURES,
+                        help="Directory with saved HTML pages (or an http_cache directory); defaults to tests/fixtures")
+    parser.add_argument('--only', choices=sorted(TAG_SETS), help="Also time a targeted parse with this tag set")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures)
+    if not pages:
+        print(f"No HTML fixtures found in {args.fixtures}")
+        return
+
+    columns = [('before: html.parser', lambda content: BeautifulSoup(content, 'html.parser'))]
+    for backend in available_parsers()[1:]:
+        columns.append((f'{backend} full', lambda content, backend=backend: make_soup(content, backend)))
+    if args.only:
+        tags = TAG_SETS[args.only]
+        for backend in available_parsers():
+            columns.append((f'{backend} {args.only}', lambda content, backend=backend: make_soup(content, backend, tags)))
+
+    totals = [0.0] * len(columns)
+    print(f"{'page':<40}" + ''.join(f"{title:>28}" for title, _ in columns))
+    for name, content in pages:
+        row = []
+        for i, (_, func) in enumerate(columns):
+            elapsed = time_parse(lambda: func(content), args.repeat)
+            totals[i] += elapsed
+            row.append(elapsed)
+        print(f"{name[:40]:<40}" + ''.join(f"{ms:>25.2f} ms" for ms in row))
+
+    print(f"{'mean per page':<40}" + ''.join(f"{total / len(pages):>25.2f} ms" for total in totals))
+    print(f"{'speedup vs html.parser':<40}" + ''.join(f"{totals[0] / total:>27.1f}x" for total in totals))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+from collections.abc import Sequence
+
+
+class JsonlCheckpoint:
+    """
+    Append-only JSONL checkpoint: one {"key", "record"} line per fetched product,
+    flushed and fsynced after every write so a crash loses at most one product.
+    Only byte offsets are kept in memory; records are read back on demand.
+    """
+    def __init__(self, filename, resume=False):
+        self.filename = filename
+        self.offsets = {}
+        self._lock = threading.Lock()
+        self._reader = None
+
+        if resume and os.path.exists(filename):
+            self._load()
+            print(f"Resuming from {filename}: {len(self.offsets)} products already fetched")
+        else:
+            open(filename, 'wb').close()
+        self._file = open(filename, 'ab')
+
+    def _load(self):
+        """Index existing lines, dropping a partially written last line"""
+        offset = 0
+        with open(self.filename, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self.offsets[entry['key']] = offset
+                offset += len(line)
+        with open(self.filename, 'r+b') as f:
+            f.truncate(offset)
+
+    def __contains__(self, key):
+        return key in self.offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def append(self, key, record):
+        """Durably write one product (safe to call from worker threads)"""
+        line = (json.dumps({'key': key, 'record': record}, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.offsets[key] = offset
+
+    def read(self, key):
+        """Load one stored record"""
+        with self._lock:
+            if self._reader is None:
+                self._reader = open(self.filename, 'rb')
+            self._reader.seek(self.offsets[key])
+            line = self._reader.readline()
+        return json.loads(line)['record']
+
+    def records(self, keys):
+        """List-like view of the stored records in `keys` order (keys without a record are skipped)"""
+        return CheckpointRecords(self, [key for key in keys if key in self.offsets])
+
+    def close(self):
+        self._file.close()
+        if self._reader is not None:
+            self._reader.close()
+
+
+class CheckpointRecords(Sequence):
+    """Lazy sequence over checkpointed records; memory use is one key per product"""
+    def __init__(self, checkpoint, keys):
+        self.checkpoint = checkpoint
+        self.keys = keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.checkpoint.read(key) for key in self.keys[index]]
+        return self.checkpoint.read(self.keys[index])
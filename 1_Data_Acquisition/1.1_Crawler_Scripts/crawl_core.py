@@ -0,0 +1,298 @@
+import requests
+import asyncio
+import time
+import json
+import csv
+import os
+from async_crawl import HostRateLimiter, run_bounded
+from html_parsing import DEFAULT_PARSER, make_soup
+from checkpoint import JsonlCheckpoint
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Shared CSV field list (target structure for all brands)
+CSV_FIELDNAMES = [
+    'product_id', 'marketing_name', 'name', 'scraped_category', 'category_api',
+    'image_url', 'description_api', 'company',
+    'calories', 'protein', 'carbs', 'fat', 'sugar', 'salt',
+    'total_components', 'ingredient_statement_preview'
+]
+
+
+def write_json_array(f, records):
+    """
+    Write records as a JSON array one at a time.
+    Output is identical to json.dump(list(records), f, ensure_ascii=False, indent=2)
+    without building the whole list in memory.
+    """
+    first = True
+    for record in records:
+        f.write('[\n  ' if first else ',\n  ')
+        f.write(json.dumps(record, ensure_ascii=False, indent=2).replace('\n', '\n  '))
+        first = False
+    f.write('[]' if first else '\n]')
+
+
+class BaseScraper:
+    """
+    Common crawl core for the brand scrapers.
+    A brand adapter only implements get_categories / get_products_from_category /
+    get_product_details; session handling, politeness, the crawl loop and
+    saving are shared.
+    """
+    company = ''
+    json_filename = 'products.json'
+    csv_filename = 'products.csv'
+    user_agent = DEFAULT_USER_AGENT
+    # Politeness budget: delays for the sequential crawl, rate for the concurrent one
+    request_delay = 0.5
+    category_delay = 0
+    requests_per_second = 2.0
+    html_parser = DEFAULT_PARSER
+
+    def __init__(self, base_url, session=None):
+        self.base_url = base_url.rstrip('/')
+        # Any requests.Session works, e.g. http_cache.CachingSession
+        self.session = session if session is not None else requests.Session()
+        self.session.headers.update({'User-Agent': self.user_agent})
+        self.all_products = []  # For storing final results
+
+    def fetch(self, url, **kwargs):
+        """GET a URL through the shared session and raise on HTTP errors"""
+        response = self.session.get(url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def parse_html(self, response, only=None):
+        """Parse a response body with the configured backend (see html_parsing.make_soup)"""
+        return make_soup(response.content, self.html_parser, only)
+
+    # --- I. Brand Adapter Interface ---
+
+    def get_categories(self):
+        """Return a list of {'name', 'url'} category dicts"""
+        raise NotImplementedError
+
+    def get_products_from_category(self, category_url, category_name):
+        """Return a list of product page dicts for one category"""
+        raise NotImplementedError
+
+    def get_product_details(self, product_page_data):
+        """Return the final product dict, or None if it could not be fetched"""
+        raise NotImplementedError
+
+    def product_key(self, product_page_data):
+        """Key used to skip products listed in several categories (None = keep all)"""
+        return None
+
+    def has_details(self, record):
+        """Whether a stored record holds the detail data (delta crawls only reuse complete records)"""
+        return True
+
+    def product_identity(self, product):
+        """Stable identity of a product across runs (delta crawls, checkpoints)"""
+        key = self.product_key(product)
+        if key is not None:
+            return str(key)
+        return f"{product.get('url') or product.get('product_id', '')}|{product.get('scraped_category', '')}"
+
+    def _unique_products(self, category_products, seen=None):
+        """Flatten per-category product lists, dropping repeated product keys"""
+        seen = set() if seen is None else seen
+        pending = []
+        for product_page_data in category_products:
+            key = self.product_key(product_page_data)
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            pending.append(product_page_data)
+        return pending
+
+    # --- II. Sequential Crawl ---
+
+    def scrape_all(self, delta=None, checkpoint=None):
+        """
+        Execute complete scraping process one request at a time.
+        With a delta_crawl.DeltaTracker, unchanged products reuse their previous record.
+        With a checkpoint.JsonlCheckpoint, every product is written to disk as soon as
+        it is fetched, products already in the checkpoint are skipped (resume), and
+        all_products becomes a lazy view over the checkpoint file.
+        """
+        print(f"Starting {self.company} menu scraping...")
+
+        categories = self.get_categories()
+        if not categories:
+            print("No categories found, scraping terminated")
+            return []
+
+        all_products = []
+        order = []
+        seen = set()
+
+        for i, category in enumerate(categories, 1):
+            print(f"\n[{i}/{len(categories)}] Processing category: {category['name']}")
+            products = self.get_products_from_category(category['url'], category['name'])
+
+            for product_page_data in self._unique_products(products, seen):
+                identity = self.product_identity(product_page_data)
+                order.append(identity)
+                if checkpoint is not None and identity in checkpoint:
+                    continue
+
+                final_data = delta.reuse(product_page_data) if delta else None
+                if final_data is None:
+                    # Delay to avoid too many requests
+                    time.sleep(self.request_delay)
+
+                    # Get detailed information
+                    final_data = self.get_product_details(product_page_data)
+
+                    if final_data:
+                        print(f"  ✓ Fetched: {final_data.get('name')}")
+                    else:
+                        print(f"  ✗ Failed to fetch: {product_page_data.get('name')}")
+                        if delta:
+                            delta.fetch_failed(product_page_data)
+
+                if final_data:
+                    self._keep(identity, final_data, all_products, checkpoint)
+
+            if self.category_delay:
+                time.sleep(self.category_delay)
+
+        self.all_products = checkpoint.records(order) if checkpoint is not None else all_products
+        print(f"\nScraping completed! Total {len(self.all_products)} products fetched")
+        return self.all_products
+
+    def open_checkpoint(self, resume=False, filename=None):
+        """Append-only JSONL checkpoint stored next to the JSON output"""
+        filename = filename or os.path.splitext(self.json_filename)[0] + '.checkpoint.jsonl'
+        return JsonlCheckpoint(filename, resume=resume)
+
+    def _keep(self, identity, final_data, all_products, checkpoint):
+        """Store one finished product in memory, or stream it to the checkpoint"""
+        if checkpoint is not None:
+            checkpoint.append(identity, final_data)
+        else:
+            all_products.append(final_data)
+
+    # --- III. Data Saving ---
+
+    def save_to_json(self, filename=None, products=None):
+        """Save data to JSON file (streamed record by record)"""
+        filename = filename or self.json_filename
+        products = self.all_products if products is None else products
+        with open(filename, 'w', encoding='utf-8') as f:
+            write_json_array(f, products)
+        print(f"Data saved to {filename}")
+
+    def csv_row(self, product):
+        """Map one product to the target CSV structure"""
+        # Ensure all fields exist, default to empty string or 0 if not extracted
+        return {
+            'product_id': product.get('product_id', ''),
+            'marketing_name': product.get('marketing_name', product.get('name', '')),
+            'name': product.get('name', ''),
+            'scraped_category': product.get('scraped_category', ''),
+            'category_api': product.get('category_api', ''),
+            'image_url': product.get('image_url', ''),
+            'description_api': product.get('description_api', ''),
+            'company': product.get('company', self.company),
+            'calories': product.get('calories', ''),
+            'protein': product.get('protein', ''),
+            'carbs': product.get('carbs', ''),
+            'fat': product.get('fat', ''),
+            'sugar': product.get('sugar', ''),
+            'salt': product.get('salt', ''),
+            'total_components': product.get('total_components', 0),
+            'ingredient_statement_preview': product.get('ingredient_statement_preview', '')
+        }
+
+    def save_to_csv(self, filename=None, products=None):
+        """Save data to CSV file (using target structure)"""
+        filename = filename or self.csv_filename
+        products = self.all_products if products is None else products
+
+        if not products:
+            print("No data to save")
+            return
+
+        with open(filename, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDNAMES, extrasaction='ignore')
+            writer.writeheader()
+            for product in products:
+                writer.writerow(self.csv_row(product))
+
+        print(f"Data saved to {filename}")
+
+
+class CrawlEngine:
+    """
+    Concurrent crawl of one brand: category pages and detail pages go through a
+    bounded worker pool, limited by the brand's own per-host token bucket.
+    The product list matches BaseScraper.scrape_all.
+    """
+    def __init__(self, scraper, concurrency=4, requests_per_second=None):
+        self.scraper = scraper
+        self.concurrency = concurrency
+        self.limiter = HostRateLimiter(requests_per_second or scraper.requests_per_second, capacity=concurrency)
+
+    async def crawl(self, delta=None, checkpoint=None):
+        scraper = self.scraper
+        print(f"Starting {scraper.company} menu scraping (async, {self.concurrency} workers)...")
+
+        await self.limiter.acquire(scraper.base_url)
+        categories = await asyncio.to_thread(scraper.get_categories)
+        if not categories:
+            print(f"No {scraper.company} categories found, scraping terminated")
+            return []
+
+        category_products = await run_bounded(
+            lambda category: scraper.get_products_from_category(category['url'], category['name']),
+            categories, self.concurrency, self.limiter, url_of=lambda category: category['url']
+        )
+
+        pending = scraper._unique_products(p for products in category_products for p in products)
+        identities = [scraper.product_identity(product_page_data) for product_page_data in pending]
+        results = [None] * len(pending)
+        to_fetch = []
+        for index, product_page_data in enumerate(pending):
+            if checkpoint is not None and identities[index] in checkpoint:
+                continue
+            previous = delta.reuse(product_page_data) if delta else None
+            if previous is None:
+                to_fetch.append(index)
+            elif checkpoint is not None:
+                checkpoint.append(identities[index], previous)
+            else:
+                results[index] = previous
+        print(f"Getting details for {len(to_fetch)} {scraper.company} products...")
+
+        def fetch(index):
+            final_data = scraper.get_product_details(pending[index])
+            if not final_data and delta:
+                delta.fetch_failed(pending[index])
+            if final_data and checkpoint is not None:
+                # Written by the worker thread as soon as it is fetched
+                checkpoint.append(identities[index], final_data)
+                return None
+            return final_data
+
+        fetched = await run_bounded(
+            fetch, to_fetch, self.concurrency, self.limiter,
+            url_of=lambda index: pending[index].get('url') or scraper.base_url
+        )
+
+        if checkpoint is not None:
+            all_products = checkpoint.records(identities)
+        else:
+            for index, final_data in zip(to_fetch, fetched):
+                results[index] = final_data
+            all_products = [final_data for final_data in results if final_data]
+        scraper.all_products = all_products
+        print(f"\n{scraper.company} scraping completed! Total {len(all_products)} products fetched")
+        return all_products
+
+    def run(self, delta=None, checkpoint=None):
+        return asyncio.run(self.crawl(delta, checkpoint))
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+
+
+def load_previous_products(filename):
+    """Load a previous raw JSON file; a missing file means a full crawl"""
+    if not filename or not os.path.exists(filename):
+        print(f"No previous data at {filename}, every product will be fetched")
+        return []
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def listing_hash(listing, record=None):
+    """
+    Hash the listing-page fields of a product.
+    With `record` given, hash the same fields taken from a stored record,
+    so old and new fingerprints are computed over identical keys.
+    """
+    source = listing if record is None else record
+    fields = {key: source.get(key) for key in sorted(listing)}
+    payload = json.dumps(fields, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class DeltaTracker:
+    """
+    Incremental crawl state for one brand.
+    A product whose identity (product key / URL + category) and listing-page
+    hash match the previous run reuses the stored record instead of fetching
+    the detail page again.
+    """
+    def __init__(self, scraper, previous_products):
+        self.scraper = scraper
+        self.previous = {}
+        for record in previous_products:
+            self.previous[self.identity(record)] = record
+        self.reused = 0
+        self.fetched = 0
+        self.failed = {}  # identity -> listing data of products whose detail fetch failed
+
+    def identity(self, product):
+        return self.scraper.product_identity(product)
+
+    def reuse(self, product_page_data):
+        """Return the previous record if the listing is unchanged and it has its details, else None"""
+        record = self.previous.get(self.identity(product_page_data))
+        if (record is not None and self.scraper.has_details(record)
+                and listing_hash(product_page_data) == listing_hash(product_page_data, record)):
+            self.reused += 1
+            return record
+        self.fetched += 1
+        return None
+
+    def fetch_failed(self, product_page_data):
+        """A listed product whose details could not be fetched: not in the output, but not removed either"""
+        self.failed[self.identity(product_page_data)] = product_page_data
+
+    def change_log(self, products):
+        """Compare the new product list with the previous run"""
+        current = {self.identity(record): record for record in products}
+        added = [key for key in current if key not in self.previous]
+        removed = [key for key in self.previous if key not in current and key not in self.failed]
+        modified = [key for key in current if key in self.previous and current[key] != self.previous[key]]
+
+        def describe(keys, source):
+            return [{'id': key, 'name': source[key].get('name', '')} for key in keys]
+
+        return {
+            'company': self.scraper.company,
+            'added': describe(added, current),
+            'removed': describe(removed, self.previous),
+            'modified': describe(modified, current),
+            'fetch_failed': describe(self.failed, self.failed),
+            'unchanged': len(current) - len(added) - len(modified),
+            'details_fetched': self.fetched,
+            'details_reused': self.reused,
+        }
+
+
+def save_change_log(change_log, filename):
+    """Write the change log and print a one-line summary"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(change_log, f, ensure_ascii=False, indent=2)
+    print(f"{change_log['company']} changes: {len(change_log['added'])} added, "
+          f"{len(change_log['modified'])} modified, {len(change_log['removed'])} removed, "
+          f"{change_log['unchanged']} unchanged, {len(change_log['fetch_failed'])} failed to fetch -> {filename}")
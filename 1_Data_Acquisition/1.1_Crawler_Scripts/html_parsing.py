@@ -0,0 +1,32 @@
+from bs4 import BeautifulSoup, SoupStrainer
+import os
+
+# Fastest installed BS4 tree builder; override with SCRAPER_HTML_PARSER=html.parser|lxml|html5lib
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+DEFAULT_PARSER = os.environ.get('SCRAPER_HTML_PARSER', DEFAULT_PARSER)
+
+# Tags needed by the detail/listing extractors, used to skip building the rest of the tree
+KFC_DETAIL_TAGS = ['title', 'meta', 'img', 'script']
+KFC_CATEGORY_TAGS = ['a', 'script']
+MCDONALDS_MENU_TAGS = ['ul']
+MCDONALDS_CATEGORY_TAGS = ['li']
+WENDYS_CATEGORY_TAGS = ['article']
+# Everything the detail extractors read is an img, div or article, or sits inside one;
+# this drops <head> and the settings/script tags after the page's wrapper div
+WENDYS_DETAIL_TAGS = ['img', 'div', 'article']
+
+
+def make_soup(markup, parser=None, only=None):
+    """
+    Parse HTML with the selected backend.
+    `only` is a tag name (or list of names): just those elements and their
+    children are built, which is much cheaper than a full tree.
+    Matching is by tag name only; class filters in a SoupStrainer do not
+    work reliably for multi-class elements.
+    """
+    parse_only = SoupStrainer(only) if only else None
+    return BeautifulSoup(markup, parser or DEFAULT_PARSER, parse_only=parse_only)
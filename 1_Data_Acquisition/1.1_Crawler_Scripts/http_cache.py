@@ -0,0 +1,122 @@
+import requests
+from requests.structures import CaseInsensitiveDict
+import hashlib
+import json
+import os
+
+# Response headers kept on disk with the body
+STORED_HEADERS = ['Content-Type', 'ETag', 'Last-Modified']
+
+
+class OfflineCacheMiss(requests.exceptions.ConnectionError):
+    """Raised in offline replay mode when a URL is not in the snapshot"""
+
+
+class CachingSession(requests.Session):
+    """
+    requests.Session with an on-disk HTTP cache for GET requests.
+
+    Online mode: cached bodies are revalidated with If-None-Match /
+    If-Modified-Since, and a 304 answer is served from disk.
+    Offline mode: every GET is answered from disk without touching the
+    network, so parsers can be re-run against a frozen snapshot.
+    """
+    def __init__(self, cache_dir, offline=False):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # --- I. Cache Storage ---
+
+    def cache_key(self, url, params=None):
+        """Full request URL (including query string) identifies a cache entry"""
+        return requests.Request('GET', url, params=params).prepare().url
+
+    def _paths(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, digest)
+        return base + '.json', base + '.body'
+
+    def load_entry(self, key):
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    def store_entry(self, key, response):
+        meta = {
+            'url': key,
+            'encoding': response.encoding,
+            'headers': {name: response.headers[name] for name in STORED_HEADERS if name in response.headers},
+        }
+        meta_path, body_path = self._paths(key)
+        # Write to temp files first so a crash never leaves a half-written entry
+        for path, payload in ((body_path, response.content),
+                              (meta_path, json.dumps(meta, ensure_ascii=False).encode('utf-8'))):
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+
+    def _cached_response(self, key, meta, body):
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = key
+        response._content = body
+        response.encoding = meta.get('encoding')
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response.request = requests.Request('GET', key).prepare()
+        response.from_cache = True
+        return response
+
+    # --- II. Request Handling ---
+
+    def request(self, method, url, params=None, headers=None, **kwargs):
+        if method.upper() != 'GET':
+            return super().request(method, url, params=params, headers=headers, **kwargs)
+
+        key = self.cache_key(url, params)
+        entry = self.load_entry(key)
+
+        if self.offline:
+            if entry is None:
+                self.stats['misses'] += 1
+                raise OfflineCacheMiss(f"Not in offline cache: {key}")
+            self.stats['hits'] += 1
+            return self._cached_response(key, *entry)
+
+        headers = dict(headers or {})
+        if entry is not None:
+            stored = entry[0].get('headers', {})
+            if stored.get('ETag'):
+                headers['If-None-Match'] = stored['ETag']
+            if stored.get('Last-Modified'):
+                headers['If-Modified-Since'] = stored['Last-Modified']
+
+        response = super().request(method, url, params=params, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.stats['revalidated'] += 1
+            return self._cached_response(key, *entry)
+
+        self.stats['misses'] += 1
+        if response.status_code == 200:
+            self.store_entry(key, response)
+        return response
+
+
+def make_session(cache_dir=None, offline=False):
+    """Plain session by default, caching session when a cache directory is given"""
+    if cache_dir:
+        return CachingSession(cache_dir, offline=offline)
+    if offline:
+        raise ValueError("Offline replay needs a cache directory")
+    return requests.Session()
@@ -1,22 +1,22 @@
-import requests
-from bs4 import BeautifulSoup
-import time
 import json
-import csv
 from urllib.parse import urljoin
 import re
 import traceback
+import argparse
+from crawl_core import BaseScraper
+from html_parsing import KFC_CATEGORY_TAGS, KFC_DETAIL_TAGS
+from http_cache import make_session
+from delta_crawl import DeltaTracker, load_previous_products, save_change_log
 
-class KFCProductScraper:
-    def __init__(self):
-        self.base_url = "https://www.kfc.co.uk"
+class KFCProductScraper(BaseScraper):
+    company = 'kfc'
+    json_filename = "kfc_menu_mapped.json"
+    csv_filename = "kfc_menu_mapped.csv"
+
+    def __init__(self, base_url="https://www.kfc.co.uk", session=None):
+        super().__init__(base_url, session)
         # Menu page as entry point
-        self.menu_url = "https://www.kfc.co.uk/our-menu" 
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        self.all_products = [] # For storing final results
+        self.menu_url = f"{self.base_url}/our-menu"
     
     # --- I. Menu and Category Scraping ---
 
@@ -24,9 +24,8 @@ class KFCProductScraper:
         """Get all menu categories"""
         print("Fetching KFC menu categories...")
         try:
-            response = self.session.get(self.menu_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = self.fetch(self.menu_url)
+            soup = self.parse_html(response)
             
             categories = []
             
@@ -95,9 +94,8 @@ class KFCProductScraper:
         """Get all product links and names from category page"""
         print(f"Fetching products from category '{category_name}'...")
         try:
-            response = self.session.get(category_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = self.fetch(category_url)
+            soup = self.parse_html(response, only=KFC_CATEGORY_TAGS)
             
             products = []
             
@@ -178,9 +176,8 @@ class KFCProductScraper:
         product_name = product_page_data['name']
         
         try:
-            response = self.session.get(product_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = self.fetch(product_url)
+            soup = self.parse_html(response, only=KFC_DETAIL_TAGS)
             
             final_data = product_page_data.copy()
             
@@ -235,7 +232,7 @@ class KFCProductScraper:
         """Extract product image"""
         try:
             # Find product image - based on provided HTML structure
-            image_elements = soup.find_all('img')
+            image_elements = soup.find_all('img', src=True)
             for img in image_elements:
                 src = img.get('src', '')
                 if src and ('rice-bowl' in src.lower() or 'product' in src.lower() or 'menu' in src.lower()):
@@ -279,91 +276,10 @@ class KFCProductScraper:
         
         return ""
 
-    # --- III. Complete Scraping Process ---
-
-    def scrape_all(self):
-        """Execute complete scraping process"""
-        print("Starting KFC menu scraping...")
-        
-        categories = self.get_categories()
-        if not categories:
-            print("No categories found, scraping terminated")
-            return
-        
-        all_products = []
-        
-        for category in categories:
-            print(f"\nProcessing category: {category['name']}")
-            products = self.get_products_from_category(category['url'], category['name'])
-            
-            for product_page_data in products:
-                # Delay to avoid too many requests
-                time.sleep(0.5) 
-                
-                # Get detailed information
-                final_data = self.get_product_details(product_page_data)
-                
-                if final_data:
-                    all_products.append(final_data)
-                    print(f"  ✓ Fetched: {final_data['name']}")
-                else:
-                    print(f"  ✗ Failed to fetch: {product_page_data['name']}")
-        
-        self.all_products = all_products
-        print(f"\nScraping completed! Total {len(self.all_products)} products fetched")
-        
-    # --- IV. Data Saving and Reporting ---
-    
-    def save_to_json(self, filename="kfc_menu_mapped.json"):
-        """Save data to JSON file"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.all_products, f, ensure_ascii=False, indent=2)
-        print(f"Data saved to {filename}")
-    
-    def save_to_csv(self, filename="kfc_menu_mapped.csv"):
-        """Save data to CSV file"""
-        
-        if not self.all_products:
-            print("No data to save")
-            return
-        
-        # CSV field list
-        fieldnames = [
-            'product_id', 'marketing_name', 'name', 'scraped_category', 'category_api',
-            'image_url', 'description_api', 'company',
-            'calories', 'protein', 'carbs', 'fat', 'sugar', 'salt',
-            'total_components', 'ingredient_statement_preview'
-        ]
-        
-        with open(filename, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-            writer.writeheader()
-            
-            for product in self.all_products:
-                # Ensure all fields exist
-                csv_row = {
-                    'product_id': product.get('product_id', ''),
-                    'marketing_name': product.get('marketing_name', product.get('name', '')),
-                    'name': product.get('name', ''),
-                    'scraped_category': product.get('scraped_category', ''),
-                    'category_api': product.get('category_api', ''),
-                    'image_url': product.get('image_url', ''),
-                    'description_api': product.get('description_api', ''),
-                    'company': product.get('company', 'kfc'),
-                    'calories': product.get('calories', ''),
-                    'protein': product.get('protein', ''),
-                    'carbs': product.get('carbs', ''),
-                    'fat': product.get('fat', ''),
-                    'sugar': product.get('sugar', ''),
-                    'salt': product.get('salt', ''),
-                    'total_components': product.get('total_components', 0),
-                    'ingredient_statement_preview': product.get('ingredient_statement_preview', '')
-                }
-                writer.writerow(csv_row)
-        
-        print(f"Data saved to {filename}")
+    # --- III. Complete Scraping Process, Saving and Reporting ---
+    # scrape_all / save_to_json / save_to_csv are provided by BaseScraper
 
-    # --- V. Test Methods ---
+    # --- IV. Test Methods ---
     
     def test_single_product(self, product_url):
         """Test single product URL and print mapping results"""
@@ -392,7 +308,14 @@ class KFCProductScraper:
             print(f"Test failed: Could not extract product details. URL: {product_url}")
 
 def main():
-    scraper = KFCProductScraper()
+    parser = argparse.ArgumentParser(description="KFC UK menu scraper")
+    parser.add_argument('--cache-dir', help="On-disk HTTP cache directory (conditional revalidation)")
+    parser.add_argument('--offline', action='store_true', help="Replay from --cache-dir without network access")
+    parser.add_argument('--delta', metavar='PREVIOUS_JSON', help="Only fetch details for products that changed since this raw JSON")
+    parser.add_argument('--resume', action='store_true', help="Continue from the checkpoint of an interrupted run")
+    args = parser.parse_args()
+
+    scraper = KFCProductScraper(session=make_session(args.cache_dir, args.offline))
     
     # Choose to run complete scraping or single test
     choice = input("Select mode: (1)Complete scraping (2)Single product test: ")
@@ -402,8 +325,12 @@ def main():
         test_url = "https://www.kfc.co.uk/our-menu/rice-bowls/kfc-original-ranch-rice-bowl"
         scraper.test_single_product(test_url)
     else:
-        # Complete scraping
-        scraper.scrape_all()
+        # Complete scraping (incremental when a previous raw JSON is given)
+        delta = DeltaTracker(scraper, load_previous_products(args.delta)) if args.delta else None
+        # Every fetched product is appended to the checkpoint, so a crash loses nothing
+        scraper.scrape_all(delta, scraper.open_checkpoint(resume=args.resume))
+        if delta and scraper.all_products:  # an empty crawl is a failure, not a removal of everything
+            save_change_log(delta.change_log(scraper.all_products), "kfc_changes.json")
         
         if scraper.all_products:
             scraper.save_to_json()
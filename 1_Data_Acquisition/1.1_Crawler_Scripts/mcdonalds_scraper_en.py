@@ -1,22 +1,29 @@
-import requests
 from bs4 import BeautifulSoup
 import json
-import time
-import csv
+import requests
 from urllib.parse import urljoin
-import traceback
-import re
+import argparse
+from crawl_core import BaseScraper, CrawlEngine
+from html_parsing import MCDONALDS_CATEGORY_TAGS, MCDONALDS_MENU_TAGS
+from http_cache import make_session
+from delta_crawl import DeltaTracker, load_previous_products, save_change_log
+from nutrient_parsing import parse_nutrient
+
+class McDonaldsProductScraper(BaseScraper):
+    company = "McDonald's"
+    json_filename = "mcdonalds_products_data.json"
+    csv_filename = "mcdonalds_products_data.csv"
+    user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    request_delay = 1
+    category_delay = 2
+    requests_per_second = 1.0
 
-class McDonaldsProductScraper:
-    def __init__(self):
-        self.base_url = "https://www.mcdonalds.com"
-        self.menu_url = "https://www.mcdonalds.com/gb/en-gb/menu.html"
-        self.api_url = "https://www.mcdonalds.com/dnaapp/itemDetails"  # API URL for regular items
-        self.collection_api_url = "https://www.mcdonalds.com/dnaapp/itemCollectionDetails"  # API URL for collections (Happy Meals)
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+    def __init__(self, base_url="https://www.mcdonalds.com", session=None):
+        # base_url can point to a local stub server for testing
+        super().__init__(base_url, session)
+        self.menu_url = f"{self.base_url}/gb/en-gb/menu.html"
+        self.api_url = f"{self.base_url}/dnaapp/itemDetails"  # API URL for regular items
+        self.collection_api_url = f"{self.base_url}/dnaapp/itemCollectionDetails"  # API URL for collections (Happy Meals)
     
     # --- I. Page Scraping: Get Categories and Product IDs/Images ---
 
@@ -24,9 +31,8 @@ class McDonaldsProductScraper:
         """Get all menu categories"""
         try:
             print("Accessing menu page to get all categories...")
-            response = self.session.get(self.menu_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = self.fetch(self.menu_url)
+            soup = self.parse_html(response, only=MCDONALDS_MENU_TAGS)
             
             categories = []
             menu_items = soup.find('ul', class_='menu-items')
@@ -58,6 +64,10 @@ class McDonaldsProductScraper:
             print(f"Error getting menu categories: {e}")
             return []
     
+    def get_categories(self):
+        """Brand adapter entry point (see BaseScraper)"""
+        return self.get_menu_categories()
+
     def get_products_from_category(self, category_url, category_name):
         """
         Get all product IDs, names and image URLs from category page.
@@ -65,9 +75,8 @@ class McDonaldsProductScraper:
         """
         try:
             print(f"Getting product IDs and images from category '{category_name}'...")
-            response = self.session.get(category_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = self.fetch(category_url)
+            soup = self.parse_html(response, only=MCDONALDS_CATEGORY_TAGS)
             
             product_items = soup.find_all('li', class_='cmp-category__item')
             print(f"  Found {len(product_items)} products in category '{category_name}'")
@@ -109,6 +118,25 @@ class McDonaldsProductScraper:
             return []
 
     # --- II. API Data Retrieval and Parsing: Get Detailed Data ---
+
+    def product_key(self, product_page_data):
+        """The same product can be listed in several categories; fetch it once"""
+        return product_page_data['product_id']
+
+    def get_product_details(self, product_page_data):
+        """Brand adapter entry point: merge page data with API details"""
+        product_id = product_page_data['product_id']
+        api_info = self.get_product_details_from_api(product_id, product_page_data.get('is_happy_meal', False))
+        if api_info:
+            # Merge data: Page data + API data
+            return {**product_page_data, **api_info}
+        # Page data alone (no nutrients) would be saved, and reused by delta crawls, as a success
+        print(f"  ✗ Failed to get information for product {product_id}")
+        return None
+
+    def has_details(self, record):
+        """Records of older runs may hold page data only (the API call had failed)"""
+        return 'marketing_name' in record
     
     def get_product_details_from_api(self, product_id, is_happy_meal=False):
         """Get product details via API (【API Extraction】 part, using robust logic)"""
@@ -135,8 +163,7 @@ class McDonaldsProductScraper:
                 }
                 api_url = self.api_url
             
-            response = self.session.get(api_url, params=params)
-            response.raise_for_status() 
+            response = self.fetch(api_url, params=params)
             data = response.json()
             
             if is_happy_meal:
@@ -147,7 +174,7 @@ class McDonaldsProductScraper:
             return product_info
             
         except requests.exceptions.HTTPError as http_err:
-            print(f"API HTTP Error ({product_id}): {response.status_code}")
+            print(f"API HTTP Error ({product_id}): {http_err.response.status_code}")
             return None
             
         except json.JSONDecodeError:
@@ -228,8 +255,8 @@ class McDonaldsProductScraper:
             return None
 
     def extract_happy_meal_nutrition(self, meal_data):
-        """Extract nutrition information for Happy Meal"""
-        nutrition_info = {'calories': '', 'protein': '', 'carbs': '', 'fat': '', 'sugar': '', 'salt': ''}
+        """Extract nutrition information for Happy Meal (kcal / g floats, None when missing)"""
+        nutrition_info = {'calories': None, 'protein': None, 'carbs': None, 'fat': None, 'sugar': None, 'salt': None}
         try:
             collective_nutrition = meal_data.get('collective_nutrition', {})
             if collective_nutrition and 'nutrient_facts' in collective_nutrition:
@@ -243,17 +270,17 @@ class McDonaldsProductScraper:
                     uom = nutrient.get('uom', '')
                     
                     if 'energy kcal' in name: 
-                        nutrition_info['calories'] = f"{value} {uom}"
+                        nutrition_info['calories'] = parse_nutrient(value, 'calories', uom)
                     elif 'protein' in name: 
-                        nutrition_info['protein'] = f"{value} {uom}"
+                        nutrition_info['protein'] = parse_nutrient(value, 'protein', uom)
                     elif 'carbohydrates' in name: 
-                        nutrition_info['carbs'] = f"{value} {uom}"
+                        nutrition_info['carbs'] = parse_nutrient(value, 'carbs', uom)
                     elif 'fat' in name and 'saturated' not in name: 
-                        nutrition_info['fat'] = f"{value} {uom}"
+                        nutrition_info['fat'] = parse_nutrient(value, 'fat', uom)
                     elif 'sugars' in name: 
-                        nutrition_info['sugar'] = f"{value} {uom}"
+                        nutrition_info['sugar'] = parse_nutrient(value, 'sugar', uom)
                     elif 'salt' in name: 
-                        nutrition_info['salt'] = f"{value} {uom}"
+                        nutrition_info['salt'] = parse_nutrient(value, 'salt', uom)
         except Exception as e:
             print(f"Error extracting Happy Meal nutrition: {e}")
         
@@ -348,8 +375,8 @@ class McDonaldsProductScraper:
         return ingredients_info
     
     def extract_nutrition_info(self, item_data):
-        """Extract nutrition information"""
-        nutrition_info = {'calories': '', 'protein': '', 'carbs': '', 'fat': '', 'sugar': '', 'salt': ''}
+        """Extract nutrition information (kcal / g floats, None when missing)"""
+        nutrition_info = {'calories': None, 'protein': None, 'carbs': None, 'fat': None, 'sugar': None, 'salt': None}
         try:
             if 'nutrient_facts' in item_data and 'nutrient' in item_data['nutrient_facts']:
                 nutrients = item_data['nutrient_facts']['nutrient']
@@ -360,12 +387,12 @@ class McDonaldsProductScraper:
                     value = nutrient.get('value', '')
                     uom = nutrient.get('uom', '')
                     
-                    if 'energy kcal' in name: nutrition_info['calories'] = f"{value} {uom}"
-                    elif 'protein' in name: nutrition_info['protein'] = f"{value} {uom}"
-                    elif 'carbohydrates' in name: nutrition_info['carbs'] = f"{value} {uom}"
-                    elif 'fat' in name and 'saturated' not in name: nutrition_info['fat'] = f"{value} {uom}"
-                    elif 'sugars' in name: nutrition_info['sugar'] = f"{value} {uom}"
-                    elif 'salt' in name: nutrition_info['salt'] = f"{value} {uom}"
+                    if 'energy kcal' in name: nutrition_info['calories'] = parse_nutrient(value, 'calories', uom)
+                    elif 'protein' in name: nutrition_info['protein'] = parse_nutrient(value, 'protein', uom)
+                    elif 'carbohydrates' in name: nutrition_info['carbs'] = parse_nutrient(value, 'carbs', uom)
+                    elif 'fat' in name and 'saturated' not in name: nutrition_info['fat'] = parse_nutrient(value, 'fat', uom)
+                    elif 'sugars' in name: nutrition_info['sugar'] = parse_nutrient(value, 'sugar', uom)
+                    elif 'salt' in name: nutrition_info['salt'] = parse_nutrient(value, 'salt', uom)
         except:
             pass
         return nutrition_info
@@ -384,60 +411,18 @@ class McDonaldsProductScraper:
 
     # --- IV. Complete Scraping Process (Hybrid Mode) ---
 
-    def scrape_all_products(self):
+    def scrape_all_products(self, delta=None, checkpoint=None):
         """Complete scraping process: Page gets IDs and images -> API gets details"""
-        print("Starting to scrape all McDonald's category product information...")
-        
-        categories = self.get_menu_categories()
-        if not categories:
-            print("No categories found, stopping scraping.")
-            return []
-        
-        all_products = []
-        all_product_ids = set() 
-        
-        for i, category in enumerate(categories, 1):
-            category_name = category['name']
-            category_url = category['url']
-            
-            print(f"\n[{i}/{len(categories)}] Processing category: {category_name}")
-            
-            # 1. Get IDs and images from category page (Page Scraping)
-            products_in_category = self.get_products_from_category(category_url, category_name)
-            
-            for j, product_page_data in enumerate(products_in_category, 1):
-                product_id = product_page_data['product_id']
-                product_name = product_page_data['name']
-                is_happy_meal = product_page_data.get('is_happy_meal', False)
-                
-                if product_id in all_product_ids:
-                    continue
-                
-                all_product_ids.add(product_id)
-                
-                print(f"  [{j}] Getting details for ID {product_id} ({product_name}) via API...")
-                if is_happy_meal:
-                    print(f"  (This is a Happy Meal, using collection API)")
-                
-                # 2. Get detailed information via API (API Extraction)
-                api_info = self.get_product_details_from_api(product_id, is_happy_meal)
-                
-                if api_info:
-                    # 3. Merge data: Page data + API data
-                    final_product = {**product_page_data, **api_info}
-                    all_products.append(final_product)
-                    print(f"  ✓ Successfully got information for product {product_id}")
-                else:
-                    # Even if API fails, keep page data (ID/name/image)
-                    all_products.append(product_page_data) 
-                    print(f"  ✗ Failed to get information for product {product_id}, keeping only page data.")
-                
-                time.sleep(1)
-            
-            time.sleep(2) 
-            
-        print(f"\nScraping completed! Total {len(all_products)} products fetched")
-        return all_products
+        return self.scrape_all(delta, checkpoint)
+
+    def scrape_all_products_async(self, concurrency=8, requests_per_second=4.0, delta=None, checkpoint=None):
+        """
+        Concurrent version of scrape_all_products.
+        Category pages and API details are fetched by a bounded worker pool,
+        and a per-host token bucket replaces the fixed sleeps.
+        Returns the same product list (same order) as the sequential path.
+        """
+        return CrawlEngine(self, concurrency, requests_per_second).run(delta, checkpoint)
 
     # --- V. Data Saving and Reporting ---
     
@@ -448,55 +433,25 @@ class McDonaldsProductScraper:
             print("No data to save")
             return
         
-        # Save as JSON
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump(products, f, ensure_ascii=False, indent=2)
-        print(f"Complete data saved to {json_filename}")
-        
-        # Save as CSV
-        fieldnames = [
-            'product_id', 'marketing_name', 'name', 'scraped_category', 'category_api', 
-            'image_url', 'description_api', 'company',
-            'calories', 'protein', 'carbs', 'fat', 'sugar', 'salt',
-            'total_components', 'ingredient_statement_preview'
-        ]
+        self.save_to_json(json_filename, products)
+        self.save_to_csv(csv_filename, products)
+
+    def csv_row(self, product):
+        """Map one product to the target CSV structure (ingredient preview built from the statement)"""
+        # Create ingredients preview
+        # components_ingredients 现在是带名称的格式化字符串
+        main_ingredients = product.get('ingredient_statement', '')
+        if not main_ingredients and product.get('components_ingredients'):
+            # 如果有组件配料，使用第一个组件配料作为预览的基础
+            main_ingredients = product['components_ingredients'][0] if product['components_ingredients'] else ''
         
-        with open(csv_filename, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore') # Ignore undefined keys
-            writer.writeheader()
-            
-            for product in products:
-                # Create ingredients preview
-                # components_ingredients 现在是带名称的格式化字符串
-                main_ingredients = product.get('ingredient_statement', '')
-                if not main_ingredients and product.get('components_ingredients'):
-                    # 如果有组件配料，使用第一个组件配料作为预览的基础
-                    main_ingredients = product['components_ingredients'][0] if product['components_ingredients'] else ''
-                
-                # 预览仍然只取前100个字符
-                ingredient_preview = BeautifulSoup(main_ingredients, 'html.parser').get_text(strip=True)[:100] + '...' if main_ingredients else ''
-                
-                csv_row = {
-                    'product_id': product.get('product_id', ''),
-                    'marketing_name': product.get('marketing_name', ''),
-                    'name': product.get('name', ''),
-                    'scraped_category': product.get('scraped_category', ''),
-                    'category_api': product.get('category_api', ''),
-                    'image_url': product.get('image_url', ''),
-                    'description_api': product.get('description_api', ''),
-                    'company': product.get('company', "McDonald's"),
-                    'calories': product.get('calories', ''),
-                    'protein': product.get('protein', ''),
-                    'carbs': product.get('carbs', ''),
-                    'fat': product.get('fat', ''),
-                    'sugar': product.get('sugar', ''),
-                    'salt': product.get('salt', ''),
-                    'total_components': product.get('total_components', 0),
-                    'ingredient_statement_preview': ingredient_preview
-                }
-                writer.writerow(csv_row)
+        # 预览仍然只取前100个字符
+        ingredient_preview = BeautifulSoup(main_ingredients, 'html.parser').get_text(strip=True)[:100] + '...' if main_ingredients else ''
         
-        print(f"CSV data saved to {csv_filename}")
+        csv_row = super().csv_row(product)
+        csv_row['marketing_name'] = product.get('marketing_name', '')
+        csv_row['ingredient_statement_preview'] = ingredient_preview
+        return csv_row
     
     def generate_report(self, products):
         """Generate statistical report"""
@@ -525,9 +480,30 @@ class McDonaldsProductScraper:
 
 def main():
     """Main function"""
-    scraper = McDonaldsProductScraper()
+    parser = argparse.ArgumentParser(description="McDonald's UK menu scraper")
+    parser.add_argument('--async', dest='use_async', action='store_true', help="Use the concurrent crawl engine")
+    parser.add_argument('--concurrency', type=int, default=8, help="Maximum concurrent requests (async mode)")
+    parser.add_argument('--rate', type=float, default=4.0, help="Requests per second per host (async mode)")
+    parser.add_argument('--base-url', default="https://www.mcdonalds.com", help="Site root, e.g. a local stub server")
+    parser.add_argument('--cache-dir', help="On-disk HTTP cache directory (conditional revalidation)")
+    parser.add_argument('--offline', action='store_true', help="Replay from --cache-dir without network access")
+    parser.add_argument('--delta', metavar='PREVIOUS_JSON', help="Only fetch details for products that changed since this raw JSON")
+    parser.add_argument('--resume', action='store_true', help="Continue from the checkpoint of an interrupted run")
+    args = parser.parse_args()
+
+    scraper = McDonaldsProductScraper(base_url=args.base_url, session=make_session(args.cache_dir, args.offline))
+    delta = DeltaTracker(scraper, load_previous_products(args.delta)) if args.delta else None
+    # Every fetched product is appended to the checkpoint, so a crash loses nothing
+    checkpoint = scraper.open_checkpoint(resume=args.resume)
     
-    products = scraper.scrape_all_products()
+    if args.use_async:
+        products = scraper.scrape_all_products_async(concurrency=args.concurrency, requests_per_second=args.rate,
+                                                     delta=delta, checkpoint=checkpoint)
+    else:
+        products = scraper.scrape_all_products(delta, checkpoint)
+
+    if delta and products:  # an empty crawl is a failure, not a removal of everything
+        save_change_log(delta.change_log(products), "mcdonalds_changes.json")
     
     print(f"\nScraping completed! Total {len(products)} products fetched")
     
@@ -0,0 +1,106 @@
+import math
+import re
+from functools import lru_cache
+
+# ==========================================
+# Nutrient Value Parsing
+# Shared by the scrapers (values are stored already parsed) and by
+# preprocessing (older raw files hold strings such as "433 - 633 kcal").
+# Every value comes out as a float in the canonical unit of its nutrient:
+# kcal for energy, grams for everything else.
+# ==========================================
+
+CANONICAL_UNITS = {
+    'calories': 'kcal',
+    'protein': 'g',
+    'fat': 'g',
+    'carbs': 'g',
+    'sugar': 'g',
+    'salt': 'g',
+}
+
+# Unit spelling -> (dimension, factor to the canonical unit). On menus "Cal" / "Calories" are kcal.
+UNITS = {
+    'kcal': ('energy', 1.0), 'kcals': ('energy', 1.0), 'kilocalories': ('energy', 1.0),
+    'cal': ('energy', 1.0), 'cals': ('energy', 1.0), 'calories': ('energy', 1.0),
+    'kj': ('energy', 1 / 4.184), 'kilojoules': ('energy', 1 / 4.184),
+    'g': ('mass', 1.0), 'gr': ('mass', 1.0), 'grams': ('mass', 1.0),
+    'kg': ('mass', 1000.0),
+    'mg': ('mass', 0.001), 'milligrams': ('mass', 0.001),
+    'mcg': ('mass', 1e-6), 'µg': ('mass', 1e-6), 'ug': ('mass', 1e-6),
+}
+DIMENSIONS = {'kcal': 'energy', 'g': 'mass'}
+
+# Numbers never end inside a longer number ("250ml" is not 25 + "0ml"), nor start inside one
+NUMBER = r'(?<![\d.,])(?:\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:[.,]\d+)?|[.,]\d+)(?![.,]?\d)'
+UNIT = '|'.join(sorted(map(re.escape, UNITS), key=len, reverse=True))
+# "963 kcal", "0.5g", "<1 g", "433 - 633 kcal", "811 – 1136 kcal", "1 g to 2 g", "2087 kJ / 499 kcal".
+# A word right after a bare number that is not a known unit ("250 ml") is captured as `other`,
+# so the quantity is rejected instead of being read in the default unit. After a known unit a
+# word is just label text ("0.9 g salt", "963 kcal per item")
+QUANTITY_PATTERN = re.compile(
+    rf'(?P<low>{NUMBER})(?:\s*(?P<low_unit>{UNIT})(?![a-zµ]))?'
+    rf'(?:\s*(?:-|–|—|to)\s*(?P<high>{NUMBER}))?'
+    rf'(?:\s*(?:(?P<unit>{UNIT})(?![a-zµ])|(?P<other>[a-zµ]+)))?',
+    re.IGNORECASE,
+)
+THOUSANDS_PATTERN = re.compile(r'\d{1,3}(?:,\d{3})+(?:\.\d+)?')
+
+
+def _number(text):
+    if THOUSANDS_PATTERN.fullmatch(text):
+        return float(text.replace(',', ''))
+    return float(text.replace(',', '.'))
+
+
+@lru_cache(maxsize=8192)
+def _parse_text(text, unit, canonical):
+    """First quantity of `text` in the dimension of `canonical`, converted (None if there is none)"""
+    dimension = DIMENSIONS[canonical]
+    fallback = None
+    for match in QUANTITY_PATTERN.finditer(text):
+        if match.group('other') and not (match.group('low_unit') or match.group('unit')):
+            continue
+        name = (match.group('unit') or match.group('low_unit') or unit or canonical).lower()
+        found, factor = UNITS.get(name, (None, None))
+        if found != dimension:
+            continue
+        low = _number(match.group('low'))
+        value = (low + _number(match.group('high'))) / 2 if match.group('high') else low
+        if factor != 1.0:
+            value = round(value * factor, 6)  # drop float noise such as 350 mg -> 0.35000000000000003
+            # "2087 kJ / 499 kcal": kJ only counts when no kcal value follows
+            if dimension == 'energy':
+                if fallback is None:
+                    fallback = value
+                continue
+        return value
+    return fallback
+
+
+def parse_nutrient(value, nutrient='protein', unit=None):
+    """
+    Float in the canonical unit of `nutrient` (kcal or g), or None.
+    `value` may be a number or a string with its own unit; `unit` is the
+    unit given separately (e.g. the API's "uom") and applies when the
+    string has none. Ranges give their midpoint.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        return float(value)
+    return _parse_text(str(value), unit, CANONICAL_UNITS[nutrient])
+
+
+def parse_column(values, nutrient='protein', unit=None):
+    """
+    parse_nutrient over a whole column: a pandas Series gives a float Series
+    (NaN when missing), any other iterable a list. Each distinct value is
+    parsed once and then mapped onto the column.
+    """
+    if hasattr(values, 'unique'):
+        parsed = {value: parse_nutrient(value, nutrient, unit) for value in values.unique()}
+        return values.map(parsed).astype(float)
+    return [parse_nutrient(value, nutrient, unit) for value in values]
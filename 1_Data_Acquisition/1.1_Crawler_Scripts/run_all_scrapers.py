@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import os
+import time
+from crawl_core import CrawlEngine
+from http_cache import make_session
+from delta_crawl import DeltaTracker, load_previous_products, save_change_log
+from kfc_scraper_en import KFCProductScraper
+from mcdonalds_scraper_en import McDonaldsProductScraper
+from wendys_scraper_en import WendysProductScraper
+
+SCRAPERS = {
+    'kfc': KFCProductScraper,
+    'mcdonalds': McDonaldsProductScraper,
+    'wendys': WendysProductScraper,
+}
+
+
+async def crawl_brand(name, scraper, concurrency, delta=None, checkpoint=None):
+    """Crawl one brand with its own worker pool and politeness budget"""
+    started = time.perf_counter()
+    try:
+        products = await CrawlEngine(scraper, concurrency).crawl(delta, checkpoint)
+        error = None
+    except Exception as e:
+        print(f"Error crawling {name}: {e}")
+        products, error = [], e
+    return name, products, time.perf_counter() - started, error
+
+
+async def crawl_brands(scrapers, concurrency=4, deltas=None, checkpoints=None):
+    """Run all brand crawls at the same time; total time is the slowest brand"""
+    deltas = deltas or {}
+    checkpoints = checkpoints or {}
+    return await asyncio.gather(*(crawl_brand(name, scraper, concurrency, deltas.get(name), checkpoints.get(name))
+                                  for name, scraper in scrapers.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl all fast food brands in parallel")
+    parser.add_argument('--brands', nargs='+', choices=sorted(SCRAPERS), default=sorted(SCRAPERS),
+                        help="Brands to crawl (default: all)")
+    parser.add_argument('--concurrency', type=int, default=4, help="Concurrent requests per brand")
+    parser.add_argument('--cache-dir', help="On-disk HTTP cache directory (one subdirectory per brand)")
+    parser.add_argument('--offline', action='store_true', help="Replay from --cache-dir without network access")
+    parser.add_argument('--delta-dir', help="Directory with the previous raw JSON files (e.g. ../1.2_Raw_Data); "
+                                            "only changed products are fetched")
+    parser.add_argument('--resume', action='store_true', help="Continue from the checkpoints of an interrupted run")
+    parser.add_argument('--output-dir', default='.', help="Directory for the raw JSON / CSV files, checkpoints "
+                                                          "and change logs (e.g. ../1.2_Raw_Data)")
+    args = parser.parse_args()
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    def output(filename):
+        return os.path.join(args.output_dir, filename)
+
+    scrapers = {}
+    for name in args.brands:
+        cache_dir = os.path.join(args.cache_dir, name) if args.cache_dir else None
+        scrapers[name] = SCRAPERS[name](session=make_session(cache_dir, args.offline))
+
+    deltas = {}
+    if args.delta_dir:
+        for name, scraper in scrapers.items():
+            previous = load_previous_products(os.path.join(args.delta_dir, scraper.json_filename))
+            deltas[name] = DeltaTracker(scraper, previous)
+
+    checkpoints = {name: scraper.open_checkpoint(resume=args.resume, filename=output(
+                       os.path.splitext(scraper.json_filename)[0] + '.checkpoint.jsonl'))
+                   for name, scraper in scrapers.items()}
+
+    started = time.perf_counter()
+    results = asyncio.run(crawl_brands(scrapers, args.concurrency, deltas, checkpoints))
+    total = time.perf_counter() - started
+
+    print("\n=== Scraping Summary ===")
+    for name, products, elapsed, error in results:
+        scraper = scrapers[name]
+        if products:
+            scraper.save_to_json(output(scraper.json_filename))
+            scraper.save_to_csv(output(scraper.csv_filename))
+        if name in deltas:
+            # A crawl that failed (or found nothing) would report every previous product as removed
+            if error is None and products:
+                save_change_log(deltas[name].change_log(products), output(f"{name}_changes.json"))
+            else:
+                print(f"{scraper.company}: crawl {'failed' if error else 'returned no products'}, change log not written")
+        print(f"{scraper.company}: {len(products)} products in {elapsed:.1f}s")
+    print(f"Total wall time: {total:.1f}s")
+
+if __name__ == "__main__":
+    main()
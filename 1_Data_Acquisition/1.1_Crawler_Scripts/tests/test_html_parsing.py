@@ -0,0 +1,60 @@
+import os
+import pytest
+from benchmark_parsing import DEFAULT_FIXTURES, available_parsers
+from html_parsing import make_soup
+from kfc_scraper_en import KFCProductScraper
+from mcdonalds_scraper_en import McDonaldsProductScraper
+from wendys_scraper_en import WendysProductScraper
+
+
+class SavedPage:
+    def __init__(self, filename):
+        with open(os.path.join(DEFAULT_FIXTURES, filename), 'rb') as f:
+            self.content = f.read()
+
+    def raise_for_status(self):
+        pass
+
+
+def offline(scraper_class, filename, parser, full=False):
+    """Scraper answering every fetch with one saved page; `full` ignores the tag sets"""
+    scraper = scraper_class()
+    scraper.html_parser = parser
+    page = SavedPage(filename)
+    scraper.fetch = lambda url, **kwargs: page
+    if full:
+        scraper.parse_html = lambda response, only=None: make_soup(response.content, parser)
+    return scraper
+
+
+PAGES = [
+    (WendysProductScraper, 'wendys_detail.html',
+     lambda s: s.get_product_details({'name': "Dave's Single", 'url': 'https://www.wendys.com/en-gb/menu/daves-single'})),
+    (WendysProductScraper, 'wendys_category.html',
+     lambda s: s.get_products_from_category('https://www.wendys.com/en-gb/menu/burgers', 'Burgers')),
+    (McDonaldsProductScraper, 'mcdonalds_category.html',
+     lambda s: s.get_products_from_category('https://www.mcdonalds.com/gb/en-gb/menu/burgers.html', 'Burgers')),
+    (KFCProductScraper, 'kfc_category.html',
+     lambda s: s.get_products_from_category('https://www.kfc.co.uk/our-menu/burgers', 'Burgers')),
+    (KFCProductScraper, 'kfc_detail.html',
+     lambda s: s.get_product_details({'name': 'Zinger Burger', 'url': 'https://www.kfc.co.uk/our-menu/burgers/kfc-zinger-burger'})),
+]
+
+
+@pytest.mark.parametrize('parser', available_parsers())
+@pytest.mark.parametrize('scraper_class, filename, extract', PAGES)
+def test_targeted_parse_matches_full_parse(scraper_class, filename, extract, parser):
+    targeted = extract(offline(scraper_class, filename, parser))
+    assert targeted
+    assert targeted == extract(offline(scraper_class, filename, parser, full=True))
+
+
+@pytest.mark.parametrize('parser', available_parsers())
+def test_wendys_detail_fields(parser):
+    scraper = offline(WendysProductScraper, 'wendys_detail.html', parser)
+    product = scraper.get_product_details({'name': "Dave's Single", 'url': 'https://www.wendys.com/en-gb/menu/daves-single'})
+    assert product['image_url'] == 'https://www.wendys.com/sites/default/files/styles/large/public/daves-single.png'
+    assert product['description_api'].startswith('A quarter pound')
+    assert (product['calories'], product['fat'], product['sugar'], product['salt']) == (590.0, 34.0, 9.1, 2.6)
+    assert product['total_components'] == 6
+    assert product['components_ingredients'][0].startswith('Bun:\nWheat Flour')
@@ -0,0 +1,54 @@
+import math
+import pandas as pd
+import pytest
+from nutrient_parsing import parse_column, parse_nutrient
+
+
+@pytest.mark.parametrize('value, nutrient, expected', [
+    # label text after a known unit
+    ('0.9 g salt', 'salt', 0.9),
+    ('2.5g fat', 'fat', 2.5),
+    ('12 g per serving', 'protein', 12.0),
+    ('963 kcal per item', 'calories', 963.0),
+    ('5 g sugar 2 g', 'sugar', 5.0),
+    # ranges, unit conversion, kJ / kcal pairs
+    ('433 - 633 kcal', 'calories', 533.0),
+    ('811 – 1136 kcal', 'calories', 973.5),
+    ('1 g to 2 g', 'fat', 1.5),
+    ('2087 kJ / 499 kcal', 'calories', 499.0),
+    ('2092 kJ', 'calories', 500.0),
+    ('350 mg', 'salt', 0.35),
+    ('350 mg sodium', 'salt', 0.35),
+    ('<1 g', 'fat', 1.0),
+    ('1,200 kcal', 'calories', 1200.0),
+    ('0,5 g', 'salt', 0.5),
+    # bare numbers are in the canonical unit
+    ('963', 'calories', 963.0),
+    (12, 'protein', 12.0),
+])
+def test_parses_label_formats(value, nutrient, expected):
+    assert parse_nutrient(value, nutrient) == pytest.approx(expected, abs=1e-6)
+
+
+@pytest.mark.parametrize('value, nutrient', [
+    ('250ml', 'protein'),
+    ('250 ml', 'protein'),
+    ('', 'fat'),
+    ('n/a', 'fat'),
+    (None, 'fat'),
+    (float('nan'), 'fat'),
+    ('12 g', 'calories'),  # a mass is not an energy
+])
+def test_rejects_missing_or_unknown(value, nutrient):
+    assert parse_nutrient(value, nutrient) is None
+
+
+def test_separate_unit_applies_to_bare_numbers():
+    assert parse_nutrient('500', 'salt', unit='mg') == pytest.approx(0.5)
+    assert parse_nutrient('1 g', 'salt', unit='mg') == pytest.approx(1.0)
+
+
+def test_parse_column():
+    series = parse_column(pd.Series(['1 g', '2.5g fat', None, '1 g']), 'fat')
+    assert series.tolist()[:2] == [1.0, 2.5] and math.isnan(series[2]) and series[3] == 1.0
+    assert parse_column(['963 kcal per item', '250 ml'], 'calories') == [963.0, None]
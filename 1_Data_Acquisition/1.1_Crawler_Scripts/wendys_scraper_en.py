@@ -1,22 +1,23 @@
-import requests
-from bs4 import BeautifulSoup
-import time
-import json
-import csv
 from urllib.parse import urljoin
 import re
-import traceback
+import argparse
+from crawl_core import BaseScraper
+from html_parsing import WENDYS_CATEGORY_TAGS, WENDYS_DETAIL_TAGS
+from http_cache import make_session
+from delta_crawl import DeltaTracker, load_previous_products, save_change_log
+from nutrient_parsing import parse_nutrient
 
-class WendysProductScraper:
-    def __init__(self):
-        self.base_url = "https://www.wendys.com"
+INGREDIENTS_PATTERN = re.compile(r'Ingredients', re.IGNORECASE)
+
+class WendysProductScraper(BaseScraper):
+    company = "Wendy's"
+    json_filename = "wendys_menu_mapped.json"
+    csv_filename = "wendys_menu_mapped.csv"
+
+    def __init__(self, base_url="https://www.wendys.com", session=None):
+        super().__init__(base_url, session)
         # UK menu page as entry point
-        self.menu_url = "https://www.wendys.com/en-gb/menu/our-menu" 
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        self.all_products = [] # For storing final results
+        self.menu_url = f"{self.base_url}/en-gb/menu/our-menu"
     
     # --- I. Menu and Category Scraping (based on your original code) ---
 
@@ -24,9 +25,8 @@ class WendysProductScraper:
         """Get all menu categories"""
         print("Getting menu categories...")
         try:
-            response = self.session.get(self.menu_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = self.fetch(self.menu_url)
+            soup = self.parse_html(response, only=WENDYS_CATEGORY_TAGS)
             
             categories = []
             category_elements = soup.find_all('article', class_='node--food-menu-category')
@@ -53,9 +53,8 @@ class WendysProductScraper:
         """Get all product links, names and IDs from category page"""
         print(f"Getting products from category '{category_name}'...")
         try:
-            response = self.session.get(category_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = self.fetch(category_url)
+            soup = self.parse_html(response, only=WENDYS_CATEGORY_TAGS)
             
             products = []
             product_elements = soup.find_all('article', class_='node--food-menu-item')
@@ -93,9 +92,8 @@ class WendysProductScraper:
         product_name = product_page_data['name']
         
         try:
-            response = self.session.get(product_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = self.fetch(product_url)
+            soup = self.parse_html(response, only=WENDYS_DETAIL_TAGS)
             
             final_data = product_page_data.copy()
             
@@ -158,10 +156,10 @@ class WendysProductScraper:
         return description
 
     def _extract_nutrition(self, soup):
-        """Extract structured nutrition data from Nutrition accordion block"""
+        """Extract structured nutrition data from Nutrition accordion block (kcal / g floats, None when missing)"""
         nutrition_data = {
-            'calories': '', 'protein': '', 'carbs': '', 'fat': '', 
-            'sugar': '', 'salt': ''
+            'calories': None, 'protein': None, 'carbs': None, 'fat': None,
+            'sugar': None, 'salt': None
         }
         
         # Target div with class="field--name-nutrition-*"
@@ -170,7 +168,7 @@ class WendysProductScraper:
             # Try to extract from calorie info in summary
             calorie_element = soup.find('div', class_='field--name-calorie')
             if calorie_element:
-                nutrition_data['calories'] = calorie_element.get_text(strip=True)
+                nutrition_data['calories'] = parse_nutrient(calorie_element.get_text(strip=True), 'calories')
             return nutrition_data
         
         # Map field names to CSS class name parts
@@ -188,12 +186,8 @@ class WendysProductScraper:
             if field_div:
                 value_item = field_div.find('div', class_='field__item')
                 if value_item:
-                    value = value_item.get_text(strip=True)
-                    # Add units (kcal/g), need to judge by label, but for simplicity we assume units
-                    if key == 'calories':
-                        nutrition_data[key] = f"{value} kcal"
-                    else:
-                        nutrition_data[key] = f"{value} g"
+                    # A unit in the text (kJ, mg, ...) is converted; a bare number is taken as kcal / g
+                    nutrition_data[key] = parse_nutrient(value_item.get_text(strip=True), key)
         
         return nutrition_data
 
@@ -207,7 +201,7 @@ class WendysProductScraper:
         try:
             # Method 1: Find accordion header containing "Ingredients" text
             ingredients_header = None
-            all_headers = soup.find_all(['h3', 'div', 'a'], string=re.compile(r'Ingredients', re.IGNORECASE))
+            all_headers = soup.find_all(['h3', 'div', 'a'], string=INGREDIENTS_PATTERN)
             
             for header in all_headers:
                 if 'ingredient' in header.get_text(strip=True).lower():
@@ -255,84 +249,10 @@ class WendysProductScraper:
 
         return formatted_ingredients
 
-    # --- IV. Complete Scraping Process ---
-
-    def scrape_all(self):
-        """Execute complete scraping process"""
-        print("Starting Wendy's menu scraping...")
-        
-        categories = self.get_categories()
-        if not categories:
-            print("No categories found, scraping terminated")
-            return
-        
-        for category in categories:
-            products = self.get_products_from_category(category['url'], category['name'])
-            
-            for product_page_data in products:
-                # Delay
-                time.sleep(0.5) 
-                
-                # Get detailed information
-                final_data = self.get_product_details(product_page_data)
-                
-                if final_data:
-                    self.all_products.append(final_data)
-        
-        print(f"\nScraping completed! Total {len(self.all_products)} products fetched")
-        
-    # --- V. Data Saving and Reporting (mapped to target CSV structure) ---
-    
-    def save_to_json(self, filename="wendys_menu_mapped.json"):
-        """Save data to JSON file"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.all_products, f, ensure_ascii=False, indent=2)
-        print(f"Data saved to {filename}")
-    
-    def save_to_csv(self, filename="wendys_menu_mapped.csv"):
-        """Save data to CSV file (using target structure)"""
-        
-        if not self.all_products:
-            print("No data to save")
-            return
-        
-        # Target CSV field list
-        fieldnames = [
-            'product_id', 'marketing_name', 'name', 'scraped_category', 'category_api',
-            'image_url', 'description_api', 'company',
-            'calories', 'protein', 'carbs', 'fat', 'sugar', 'salt',
-            'total_components', 'ingredient_statement_preview'
-        ]
-        
-        with open(filename, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-            writer.writeheader()
-            
-            for product in self.all_products:
-                # Ensure all fields exist, default to empty string or 0 if not extracted
-                csv_row = {
-                    'product_id': product.get('product_id', ''),
-                    'marketing_name': product.get('marketing_name', product.get('name', '')),
-                    'name': product.get('name', ''),
-                    'scraped_category': product.get('scraped_category', ''),
-                    'category_api': product.get('category_api', ''),
-                    'image_url': product.get('image_url', ''),
-                    'description_api': product.get('description_api', ''),
-                    'company': product.get('company', "Wendy's"),
-                    'calories': product.get('calories', ''),
-                    'protein': product.get('protein', ''),
-                    'carbs': product.get('carbs', ''),
-                    'fat': product.get('fat', ''),
-                    'sugar': product.get('sugar', ''),
-                    'salt': product.get('salt', ''),
-                    'total_components': product.get('total_components', 0),
-                    'ingredient_statement_preview': product.get('ingredient_statement_preview', '')
-                }
-                writer.writerow(csv_row)
-        
-        print(f"Data saved to {filename}")
+    # --- IV. Complete Scraping Process, Saving and Reporting ---
+    # scrape_all / save_to_json / save_to_csv are provided by BaseScraper
 
-    # --- VI. Test Methods ---
+    # --- V. Test Methods ---
     
     def test_single_product(self, product_url):
         """Test single product URL and print mapping results"""
@@ -377,7 +297,14 @@ class WendysProductScraper:
             print(f"Test failed: Could not extract product details. URL: {product_url}")
 
 def main():
-    scraper = WendysProductScraper()
+    parser = argparse.ArgumentParser(description="Wendys UK menu scraper")
+    parser.add_argument('--cache-dir', help="On-disk HTTP cache directory (conditional revalidation)")
+    parser.add_argument('--offline', action='store_true', help="Replay from --cache-dir without network access")
+    parser.add_argument('--delta', metavar='PREVIOUS_JSON', help="Only fetch details for products that changed since this raw JSON")
+    parser.add_argument('--resume', action='store_true', help="Continue from the checkpoint of an interrupted run")
+    args = parser.parse_args()
+
+    scraper = WendysProductScraper(session=make_session(args.cache_dir, args.offline))
     
     # Choose to run complete scraping or single test
     choice = input("Select mode: (1)Complete scraping (2)Single product test: ")
@@ -387,8 +314,12 @@ def main():
         test_url = "https://www.wendys.com/en-gb/grilled-cheese-cheeseburger-single"
         scraper.test_single_product(test_url)
     else:
-        # Complete scraping
-        scraper.scrape_all()
+        # Complete scraping (incremental when a previous raw JSON is given)
+        delta = DeltaTracker(scraper, load_previous_products(args.delta)) if args.delta else None
+        # Every fetched product is appended to the checkpoint, so a crash loses nothing
+        scraper.scrape_all(delta, scraper.open_checkpoint(resume=args.resume))
+        if delta and scraper.all_products:  # an empty crawl is a failure, not a removal of everything
+            save_change_log(delta.change_log(scraper.all_products), "wendys_changes.json")
         
         if scraper.all_products:
             scraper.save_to_json()
@@ -0,0 +1,83 @@
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+from data_processing_en import (build_imputation_reference, impute_missing, load_raw_data,
+                                nutrients_cols, process_data_source)
+
+RAW_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '1.2_Raw_Data')
+
+
+def impute_missing_rowwise(item, mcd_df, sub_category_means, main_category_means):
+    """Previous per-item implementation, kept as the reference for the parity check"""
+    name = item['product_name']
+    for nut in nutrients_cols:
+        if pd.isna(item[nut]) or item[nut] == 0.0:
+            match = mcd_df[mcd_df['product_name'].str.lower() == name.lower()]
+            if not match.empty:
+                imputed_value = match.iloc[0][nut]
+                if not pd.isna(imputed_value):
+                    item[nut] = round(imputed_value, 2)
+                    continue
+            if item['category_sub'] in sub_category_means.index and not pd.isna(sub_category_means.loc[item['category_sub'], nut]):
+                item[nut] = round(sub_category_means.loc[item['category_sub'], nut], 2)
+            elif item['category_main'] in main_category_means.index and not pd.isna(main_category_means.loc[item['category_main'], nut]):
+                item[nut] = round(main_category_means.loc[item['category_main'], nut], 2)
+            else:
+                item[nut] = 0.0
+    return item
+
+
+def synthetic_items(base_items, mcd_names, size, seed=0):
+    """Enlarge the Wendy's/KFC items to `size` rows with random names and missing values"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(base_items).iloc[rng.integers(0, len(base_items), size)].reset_index(drop=True)
+    # A quarter of the rows reuse a McDonald's name so the name-match path is exercised
+    use_mcd_name = rng.random(size) < 0.25
+    df.loc[use_mcd_name, 'product_name'] = rng.choice(mcd_names, use_mcd_name.sum())
+    for nut in nutrients_cols:
+        values = rng.gamma(2.0, 50.0, size).round(1)
+        values[rng.random(size) < 0.3] = np.nan
+        values[rng.random(size) < 0.05] = 0.0
+        df[nut] = values
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized nutrient imputation")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 200000])
+    parser.add_argument('--check', type=int, default=500, help="Rows compared with the row-wise reference")
+    parser.add_argument('--raw-dir', default=RAW_DATA_DIR)
+    args = parser.parse_args()
+
+    mcd_data, kfc_data, wendys_data = load_raw_data(
+        os.path.join(args.raw_dir, 'mcdonalds_products_data.json'),
+        os.path.join(args.raw_dir, 'kfc_menu_mapped.json'),
+        os.path.join(args.raw_dir, 'wendys_menu_mapped.json'),
+    )
+    mcd_df = pd.DataFrame(process_data_source(mcd_data, "McDonald's"))
+    base_items = process_data_source(wendys_data, "Wendy's") + process_data_source(kfc_data, "KFC")
+    mcd_names = mcd_df['product_name'].str.upper().tolist()
+
+    started = time.perf_counter()
+    reference = build_imputation_reference(mcd_df)
+    print(f"Reference tables built in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    # Parity with the previous per-item implementation
+    sample = synthetic_items(base_items, mcd_names, args.check, seed=1)
+    vectorized = impute_missing(sample, reference)[nutrients_cols].astype(float)
+    _, sub_means, main_means = reference
+    rowwise = pd.DataFrame([impute_missing_rowwise(item, mcd_df, sub_means, main_means)
+                            for item in sample.to_dict('records')])[nutrients_cols].astype(float)
+    print(f"Parity on {args.check} rows: {'OK' if vectorized.equals(rowwise) else 'MISMATCH'}")
+
+    for size in args.sizes:
+        df = synthetic_items(base_items, mcd_names, size)
+        started = time.perf_counter()
+        impute_missing(df, reference)
+        elapsed = time.perf_counter() - started
+        print(f"{size:>8} items: {elapsed * 1000:8.1f} ms ({size / elapsed:,.0f} items/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import random
+import time
+import numpy as np
+from columnar_snapshot import default_menu, iter_documents
+from near_duplicates import NearDuplicateIndex, shingles
+
+SIZES = ['Small', 'Medium', 'Large', 'Regular', 'Jr.', 'Sharebox', 'Combo', '6 Pc', '10 Pc', '20 Pc']
+
+
+def synthetic_menu(base, size, edits=3, seed=0):
+    """`size` items made from the real ones: a size word in the name and a few words of the text replaced"""
+    rng = random.Random(seed)
+    vocabulary = [word for doc in base for word in doc['catch_all_text'].split()]
+    docs = []
+    for i in range(size):
+        doc = base[rng.randrange(len(base))]
+        words = doc['catch_all_text'].split()
+        for _ in range(edits):
+            words[rng.randrange(len(words))] = rng.choice(vocabulary)
+        docs.append({'id': i + 1, 'product_name': f"{rng.choice(SIZES)} {doc['product_name']} {i % 97}",
+                     'catch_all_text': ' '.join(words)})
+    return docs
+
+
+def brute_force(docs, threshold):
+    """Same leader clustering, but every document is compared with every leader (the O(n^2) baseline)"""
+    index = NearDuplicateIndex(threshold=threshold)
+    leader_ids, leader_signatures = [], []
+    cluster_ids = []
+    for doc in docs:
+        signature = index.signature(shingles(doc))
+        if leader_signatures:
+            matches = np.count_nonzero(np.vstack(leader_signatures) == signature, axis=1)
+            hits = np.flatnonzero(matches >= threshold * len(signature))
+            if len(hits):
+                cluster_ids.append(leader_ids[hits[0]])
+                continue
+        leader_ids.append(str(doc['id']))
+        leader_signatures.append(signature)
+        cluster_ids.append(str(doc['id']))
+    return cluster_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MinHash/LSH near-duplicate clustering on synthetic menus")
+    parser.add_argument('--input', default=default_menu())
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 10000, 100000])
+    parser.add_argument('--check', type=int, default=5000, help="Largest size also clustered by brute force")
+    parser.add_argument('--threshold', type=float, default=0.8)
+    args = parser.parse_args()
+
+    base = list(iter_documents(args.input, ['id', 'product_name', 'catch_all_text']))
+    print(f"{'docs':>8} {'clusters':>9} {'LSH s':>8} {'µs/doc':>7} {'comparisons':>12} {'all pairs':>14} "
+          f"{'brute s':>8} {'same cluster':>13}")
+    for size in args.sizes:
+        docs = synthetic_menu(base, size)
+        index = NearDuplicateIndex(threshold=args.threshold)
+        started = time.perf_counter()
+        cluster_ids = [index.add(doc['id'], doc) for doc in docs]
+        elapsed = time.perf_counter() - started
+
+        brute, agreement = '', ''
+        if size <= args.check:
+            started = time.perf_counter()
+            expected = brute_force(docs, args.threshold)
+            brute = f"{time.perf_counter() - started:.2f}"
+            agreement = f"{sum(a == b for a, b in zip(cluster_ids, expected)) / size:.1%}"
+        print(f"{size:>8} {len(set(cluster_ids)):>9} {elapsed:>8.2f} {elapsed / size * 1e6:>7.0f} "
+              f"{index.comparisons:>12} {size * (size - 1) // 2:>14} {brute:>8} {agreement:>13}")
+
+
+if __name__ == "__main__":
+    main()
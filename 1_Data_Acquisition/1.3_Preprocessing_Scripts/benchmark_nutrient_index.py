@@ -0,0 +1,85 @@
+import argparse
+import os
+import random
+import time
+import numpy as np
+import pandas as pd
+from columnar_snapshot import iter_documents
+from data_processing_en import nutrients_cols
+from nutrient_index import NutrientIndex
+from pipeline import PROCESSED_DATA_DIR
+
+# Slider ranges of the FilterBar: (nutrient, max, step)
+SLIDERS = [('calories_kcal', 2000, 50), ('fat_g', 100, 1), ('salt_g', 10, 0.1)]
+
+
+def load_records(filename):
+    """The processed menu as a list of documents (snapshot, JSON array or JSON Lines)"""
+    return list(iter_documents(filename))
+
+
+def synthetic_records(records, size, seed=0):
+    """Resample the real menu to `size` rows with jittered nutrient values"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(records).iloc[rng.integers(0, len(records), size)].reset_index(drop=True)
+    for nut in nutrients_cols:
+        df[nut] = (df[nut] * rng.uniform(0.8, 1.2, size)).round(2)
+    df['id'] = range(1, size + 1)
+    return df.to_dict('records')
+
+
+def random_filters(count, seed=0):
+    """Slider positions as the frontend sends them: [0 TO x] on calories / fat / salt"""
+    rng = random.Random(seed)
+    return [{nut: (0, round(rng.randint(1, maximum / step) * step, 6)) for nut, maximum, step in SLIDERS}
+            for _ in range(count)]
+
+
+def scan_ids(records, ranges):
+    """Baseline: test every document against every range"""
+    return [r['id'] for r in records
+            if all(r[nut] is not None and low <= r[nut] <= high for nut, (low, high) in ranges.items())]
+
+
+def mask_ids(df, ranges):
+    """Baseline: pandas boolean masks"""
+    mask = np.ones(len(df), dtype=bool)
+    for nut, (low, high) in ranges.items():
+        mask &= df[nut].between(low, high).to_numpy()
+    return df['id'][mask].tolist()
+
+
+def per_query_us(func, filters):
+    started = time.perf_counter()
+    for ranges in filters:
+        func(ranges)
+    return (time.perf_counter() - started) / len(filters) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark nutrient range filters: bitset index vs scans")
+    parser.add_argument('--input', default=os.path.join(PROCESSED_DATA_DIR, 'fast_food_menu_for_solr_V3.json'))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[491, 10000, 100000])
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    base = load_records(args.input)
+    filters = random_filters(args.queries)
+    print(f"{'docs':>8} {'build ms':>9} {'scan µs':>10} {'pandas µs':>10} {'bitset µs':>10} {'ids µs':>10}  parity")
+    for size in args.sizes:
+        records = base if size == len(base) else synthetic_records(base, size)
+        df = pd.DataFrame(records)
+        started = time.perf_counter()
+        index = NutrientIndex.build(records)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        parity = all(index.matching_ids(r) == scan_ids(records, r) for r in filters[:20])
+        scan = per_query_us(lambda r: scan_ids(records, r), filters[:20])
+        mask = per_query_us(lambda r: mask_ids(df, r), filters)
+        bitset = per_query_us(index.filter, filters)
+        ids = per_query_us(index.matching_ids, filters)
+        print(f"{size:>8} {build_ms:>9.1f} {scan:>10.0f} {mask:>10.0f} {bitset:>10.1f} {ids:>10.0f}  {'OK' if parity else 'MISMATCH'}")
+    print("\nbitset = filter() result (count via bit_count()); ids = filter() plus decoding the matching ids")
+
+if __name__ == "__main__":
+    main()
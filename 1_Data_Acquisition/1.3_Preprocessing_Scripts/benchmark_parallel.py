@@ -0,0 +1,66 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pipeline import RAW_DATA_DIR, RAW_SOURCES, iter_json_records, iter_pipeline_parallel
+from process_pool import CHUNK_SIZE, default_workers
+from stage_timing import StageTimer
+
+PARALLEL_STAGES = ('normalize', 'impute + clean')
+
+
+def enlarge_raw_files(raw_dir, target_dir, copies):
+    """Each raw file repeated `copies` times, names numbered so every copy is a distinct item"""
+    for _, filename in RAW_SOURCES:
+        items = list(iter_json_records(os.path.join(raw_dir, filename)))
+        enlarged = []
+        for copy in range(copies):
+            for item in items:
+                item = dict(item)
+                for key in ('name', 'marketing_name'):
+                    if item.get(key):
+                        item[key] = f"{item[key]} {copy}"
+                enlarged.append(item)
+        with open(os.path.join(target_dir, filename), 'w', encoding='utf-8') as f:
+            json.dump(enlarged, f, ensure_ascii=False)
+
+
+def run(raw_dir, workers, chunk_size):
+    """(documents, total seconds, StageTimer, digest of the output documents)"""
+    timer = StageTimer()
+    sha = hashlib.sha256()
+    count = 0
+    started = time.perf_counter()
+    for record in iter_pipeline_parallel(raw_dir, workers=workers, chunk_size=chunk_size, timer=timer):
+        sha.update(json.dumps(record, ensure_ascii=False).encode('utf-8'))
+        count += 1
+    return count, time.perf_counter() - started, timer, sha.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling of the chunked process-pool preprocessing over worker counts")
+    parser.add_argument('--raw-dir', default=RAW_DATA_DIR)
+    parser.add_argument('--copies', type=int, nargs='+', default=[10, 50, 200], help="Enlargement factors of the raw menus")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    print(f"{default_workers()} CPUs available")
+    print(f"{'docs':>8} {'workers':>8} {'total s':>8} {'parallel s':>11} {'speedup':>8} {'sequential s':>13} {'output':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for copies in args.copies:
+            enlarge_raw_files(args.raw_dir, tmp, copies)
+            baseline = None
+            for workers in args.workers:
+                docs, total, timer, digest = run(tmp, workers, args.chunk_size)
+                parallel = sum(timer.totals.get(stage, 0.0) for stage in PARALLEL_STAGES)
+                if baseline is None:
+                    baseline = (parallel, digest)
+                print(f"{docs:>8} {workers:>8} {total:>8.2f} {parallel:>11.2f} {baseline[0] / parallel:>7.2f}x "
+                      f"{total - parallel:>13.2f} {'same' if digest == baseline[1] else 'DIFFERS':>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import numpy as np
+from columnar_snapshot import Snapshot, write_snapshot
+from pipeline import PROCESSED_DATA_DIR, iter_json_records
+
+
+def best_ms(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def json_calories(filename):
+    with open(filename, 'r', encoding='utf-8') as f:
+        docs = json.load(f)
+    return np.array([doc['calories_kcal'] for doc in docs], dtype=float).mean()
+
+
+def snapshot_open(filename):
+    with Snapshot(filename) as snapshot:
+        return snapshot.rows
+
+
+def snapshot_calories(filename):
+    with Snapshot(filename) as snapshot:
+        values = np.frombuffer(snapshot.column('calories_kcal'), dtype=np.float64)  # no copy
+        mean = values.mean()
+        del values
+        return mean
+
+
+def snapshot_brands(filename):
+    with Snapshot(filename) as snapshot:
+        brands = snapshot.column('brand')
+        return len(brands.values())
+
+
+def snapshot_text(filename):
+    with Snapshot(filename) as snapshot:
+        return sum(len(text) for text in snapshot.column('catch_all_text'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load time of the processed menu: JSON vs memory-mapped snapshot")
+    parser.add_argument('--input', default=os.path.join(PROCESSED_DATA_DIR, 'fast_food_menu_for_solr_V3.json'))
+    parser.add_argument('--copies', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    base = list(iter_json_records(args.input))
+    print(f"{'docs':>7} {'JSON MB':>8} {'snap MB':>8} {'json.load ms':>13} {'open ms':>8} "
+          f"{'calories ms':>12} {'brands ms':>10} {'all text ms':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for copies in args.copies:
+            json_file = os.path.join(tmp, f'menu_{copies}.json')
+            snapshot_file = os.path.join(tmp, f'menu_{copies}.snapshot')
+            docs = [{**doc, 'id': copy * len(base) + doc['id']} for copy in range(copies) for doc in base]
+            with open(json_file, 'w', encoding='utf-8') as f:
+                json.dump(docs, f, ensure_ascii=False, indent=2)
+            write_snapshot(docs, snapshot_file)
+            assert json_calories(json_file) == snapshot_calories(snapshot_file)
+
+            print(f"{len(docs):>7} {os.path.getsize(json_file) / 1e6:>8.1f} {os.path.getsize(snapshot_file) / 1e6:>8.1f} "
+                  f"{best_ms(lambda: json_calories(json_file), args.repeat):>13.1f} "
+                  f"{best_ms(lambda: snapshot_open(snapshot_file), args.repeat):>8.2f} "
+                  f"{best_ms(lambda: snapshot_calories(snapshot_file), args.repeat):>12.2f} "
+                  f"{best_ms(lambda: snapshot_brands(snapshot_file), args.repeat):>10.2f} "
+                  f"{best_ms(lambda: snapshot_text(snapshot_file), args.repeat):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+import argparse
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from data_processing_en import nutrients_cols
+from pipeline import OUTPUT_FIELDS, PROCESSED_DATA_DIR, iter_json_records
+
+# ==========================================
+# Columnar Snapshot of the Processed Menu
+# One binary file, one block per field: numbers as typed arrays, text as
+# per-row codes into a string pool (offsets + UTF-8 bytes). Opened with mmap,
+# numeric columns are zero-copy views and text is decoded on access.
+# ==========================================
+
+DEFAULT_SNAPSHOT = os.path.join(PROCESSED_DATA_DIR, 'fast_food_menu_for_solr_V3.snapshot')
+DEFAULT_JSON = os.path.join(PROCESSED_DATA_DIR, 'fast_food_menu_for_solr_V3.json')
+
+MAGIC = b'FFMENUC1'
+ALIGN = 8
+NULL = -1  # string code of a missing value
+
+# Field -> column kind; every other field is a string column
+INT_FIELDS = ['id', 'popularity_score']
+FLOAT_FIELDS = list(nutrients_cols)
+LIST_FIELDS = ['components_list']
+
+
+def field_kind(field):
+    if field in INT_FIELDS:
+        return 'int64'
+    if field in FLOAT_FIELDS:
+        return 'float64'
+    if field in LIST_FIELDS:
+        return 'str_list'
+    return 'str'
+
+
+def _is_null(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+class StringPool:
+    """Distinct strings in first-seen order; each row stores the code of its value"""
+    def __init__(self):
+        self.codes = {}
+
+    def code(self, value):
+        if _is_null(value):
+            return NULL
+        value = str(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+        return code
+
+    def blocks(self):
+        offsets = array('q', [0])
+        data = bytearray()
+        for value in self.codes:
+            data += value.encode('utf-8')
+            offsets.append(len(data))
+        return offsets, bytes(data)
+
+
+class SnapshotWriter:
+    """Collects records column by column (no per-record dicts are kept) and writes the snapshot"""
+    def __init__(self, fields=OUTPUT_FIELDS):
+        self.fields = list(fields)
+        self.rows = 0
+        self.columns = {}
+        for field in self.fields:
+            kind = field_kind(field)
+            if kind == 'int64':
+                self.columns[field] = (array('q'), [])   # values, rows that are null
+            elif kind == 'float64':
+                self.columns[field] = array('d')         # null = NaN
+            elif kind == 'str':
+                self.columns[field] = (array('i'), StringPool())
+            else:
+                self.columns[field] = (array('q', [0]), array('i'), StringPool())  # row offsets, item codes
+
+    def add(self, record):
+        for field in self.fields:
+            value = record.get(field)
+            kind = field_kind(field)
+            column = self.columns[field]
+            if kind == 'int64':
+                column[0].append(0 if _is_null(value) else int(value))
+                if _is_null(value):
+                    column[1].append(self.rows)
+            elif kind == 'float64':
+                if isinstance(value, list):
+                    value = value[0] if value else None
+                column.append(math.nan if _is_null(value) else float(value))
+            elif kind == 'str':
+                column[0].append(column[1].code(value))
+            else:
+                row_offsets, item_codes, pool = column
+                for item in value or ():
+                    item_codes.append(pool.code(item))
+                row_offsets.append(len(item_codes))
+        self.rows += 1
+
+    def tee(self, records):
+        """Pass records through unchanged while adding them (e.g. on the way to write_jsonl)"""
+        for record in records:
+            self.add(record)
+            yield record
+
+    def write(self, filename):
+        """Layout: MAGIC, header length (uint32), JSON header, then 8-byte aligned blocks"""
+        blocks = []
+        header_columns = []
+        for field in self.fields:
+            kind = field_kind(field)
+            column = self.columns[field]
+            entry = {'name': field, 'kind': kind}
+            if kind == 'int64':
+                parts = {'values': column[0]}
+                entry['nulls'] = column[1]
+            elif kind == 'float64':
+                parts = {'values': column}
+            elif kind == 'str':
+                offsets, data = column[1].blocks()
+                parts = {'codes': column[0], 'offsets': offsets, 'data': data}
+            else:
+                offsets, data = column[2].blocks()
+                parts = {'rows': column[0], 'codes': column[1], 'offsets': offsets, 'data': data}
+            entry['blocks'] = {}
+            for name, block in parts.items():
+                entry['blocks'][name] = len(blocks)
+                blocks.append(block.tobytes() if isinstance(block, array) else block)
+            header_columns.append(entry)
+
+        # Block positions depend on the header size, which depends on the positions: settle it in two passes
+        spans = []
+        header = b''
+        for _ in range(2):
+            position = len(MAGIC) + 4 + len(header)
+            spans = []
+            for block in blocks:
+                position += -position % ALIGN
+                spans.append([position, len(block)])
+                position += len(block)
+            header = json.dumps({'rows': self.rows, 'byteorder': sys.byteorder, 'columns': header_columns,
+                                 'spans': spans}, separators=(',', ':')).encode('utf-8')
+            header += b' ' * (-(len(MAGIC) + 4 + len(header)) % ALIGN)
+
+        temp = filename + '.tmp'
+        with open(temp, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            for (position, _), block in zip(spans, blocks):
+                f.write(b'\0' * (position - f.tell()))
+                f.write(block)
+        os.replace(temp, filename)
+        return os.path.getsize(filename)
+
+
+def write_snapshot(records, filename, fields=OUTPUT_FIELDS):
+    writer = SnapshotWriter(fields)
+    for record in records:
+        writer.add(record)
+    writer.write(filename)
+    return writer.rows
+
+
+class StringColumn:
+    """Text field of a Snapshot: codes are a zero-copy view, strings are decoded (once) on access"""
+    def __init__(self, codes, offsets, data):
+        self.codes = codes
+        self.offsets = offsets
+        self.data = data
+        self.cache = {}
+
+    def value(self, code):
+        if code == NULL:
+            return None
+        text = self.cache.get(code)
+        if text is None:
+            text = self.cache[code] = str(self.data[self.offsets[code]:self.offsets[code + 1]], 'utf-8')
+        return text
+
+    def values(self):
+        """The distinct strings of the column (pool order)"""
+        return [self.value(code) for code in range(len(self.offsets) - 1)]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row):
+        return self.value(self.codes[row])
+
+    def __iter__(self):
+        return (self.value(code) for code in self.codes)
+
+
+class ListColumn:
+    """components_list-style field: per-row slices of string codes"""
+    def __init__(self, rows, strings):
+        self.rows = rows
+        self.strings = strings
+
+    def __len__(self):
+        return len(self.rows) - 1
+
+    def __getitem__(self, row):
+        codes = self.strings.codes[self.rows[row]:self.rows[row + 1]]
+        return [self.strings.value(code) for code in codes]
+
+    def __iter__(self):
+        return (self[row] for row in range(len(self)))
+
+
+class Snapshot:
+    """
+    Read-only, memory-mapped snapshot. column(name) returns a memoryview of
+    int64 / float64 values (np.frombuffer works on it without copying), or a
+    StringColumn / ListColumn. Missing floats are NaN; missing ints are listed
+    in nulls(name). Use as a context manager, or call close() once arrays
+    made from its columns are gone (a mapped file cannot close under them).
+    """
+    def __init__(self, filename=DEFAULT_SNAPSHOT):
+        self.file = open(filename, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        self._columns = {}
+        self._views = []
+        if self.map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{filename} is not a menu snapshot")
+        (length,) = struct.unpack_from('<I', self.map, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self.map[start:start + length])
+        if header['byteorder'] != sys.byteorder:
+            self.close()
+            raise ValueError(f"{filename} was written on a {header['byteorder']}-endian machine")
+        self.rows = header['rows']
+        self.spans = header['spans']
+        self.meta = {column['name']: column for column in header['columns']}
+        self.fields = list(self.meta)
+        self._nulls = {name: frozenset(column.get('nulls', ())) for name, column in self.meta.items()}
+
+    def _block(self, column, name, fmt=None):
+        position, length = self.spans[column['blocks'][name]]
+        block = self.view[position:position + length]
+        if fmt:
+            self._views.append(block)
+            block = block.cast(fmt)
+        self._views.append(block)
+        return block
+
+    def column(self, name):
+        column = self._columns.get(name)
+        if column is None:
+            meta = self.meta[name]
+            kind = meta['kind']
+            if kind in ('int64', 'float64'):
+                column = self._block(meta, 'values', 'q' if kind == 'int64' else 'd')
+            else:
+                strings = StringColumn(self._block(meta, 'codes', 'i'), self._block(meta, 'offsets', 'q'),
+                                       self._block(meta, 'data'))
+                column = strings if kind == 'str' else ListColumn(self._block(meta, 'rows', 'q'), strings)
+            self._columns[name] = column
+        return column
+
+    def nulls(self, name):
+        return self._nulls[name]
+
+    def records(self, fields=None):
+        """Documents in order; `fields` limits the columns read (text columns are decoded lazily)"""
+        return (self.record(row, fields) for row in range(self.rows))
+
+    def record(self, row, fields=None):
+        """One document as a dict, like the processed JSON"""
+        record = {}
+        for field in fields or self.fields:
+            value = self.column(field)[row]
+            kind = self.meta[field]['kind']
+            if kind == 'float64' and math.isnan(value):
+                value = None
+            elif kind == 'int64' and row in self._nulls[field]:
+                value = None
+            record[field] = value
+        return record
+
+    def __len__(self):
+        return self.rows
+
+    def __iter__(self):
+        return self.records()
+
+    def close(self):
+        # Every view handed out must be released before the map can close
+        self._columns.clear()
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def default_menu():
+    """The snapshot once a build has written it (it is not committed), else the processed JSON"""
+    return DEFAULT_SNAPSHOT if os.path.exists(DEFAULT_SNAPSHOT) else DEFAULT_JSON
+
+
+def iter_documents(filename, fields=None):
+    """Documents of a snapshot, JSON array or JSON Lines file (chosen by extension)"""
+    if filename.endswith('.snapshot'):
+        with Snapshot(filename) as snapshot:
+            yield from snapshot.records(fields)
+    else:
+        yield from iter_json_records(filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the processed menu JSON / JSON Lines into a columnar snapshot")
+    parser.add_argument('input', nargs='?', default=DEFAULT_JSON)
+    parser.add_argument('--output', default=DEFAULT_SNAPSHOT)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rows = write_snapshot(iter_json_records(args.input), args.output)
+    print(f"Snapshot of {rows} documents written to {args.output} "
+          f"({os.path.getsize(args.output) / 1024:.0f} KB, {(time.perf_counter() - started) * 1000:.0f} ms)")
+
+    # Round trip check against the source
+    with Snapshot(args.output) as snapshot:
+        for row, record in enumerate(iter_json_records(args.input)):
+            expected = {field: record.get(field) for field in snapshot.fields}
+            if snapshot.record(row) != expected:
+                raise SystemExit(f"Snapshot row {row} differs from the input")
+    print("✓ Every document reads back identical to the input")
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,101 @@
+import argparse
 import pandas as pd
 import json
-import re
+from columnar_snapshot import iter_documents, write_snapshot
+from near_duplicates import assign_clusters
+from process_pool import CHUNK_SIZE, default_workers, map_chunks, worker_pool
+from stage_timing import StageTimer
+# HTML cleaning (tags, entities, "{}" placeholders, whitespace) - used ONLY for building the search index field
+from text_cleaning import clean_column, collapse_whitespace
 
-# 1. Load JSON Data
-file_name = "fast_food_menu_final.json"
-try:
-    with open(file_name, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-except FileNotFoundError:
-    print(f"Error: File '{file_name}' not found. Please ensure the file is in the correct directory.")
-    # Exit if file is missing
-    exit()
+def clean_in_chunks(values, pool=None, chunk_size=CHUNK_SIZE):
+    """clean_column over a Series, chunk by chunk on the pool's workers (in order)"""
+    if pool is None:
+        return clean_column(values)
+    return pd.Series(map_chunks(clean_column, values.tolist(), pool, chunk_size), index=values.index)
 
-df = pd.DataFrame(data)
+def add_search_fields(df, timer=None, pool=None):
+    """
+    Add catch_all_text, popularity_score and cluster_id to the unified menu
+    DataFrame. With a process pool, the text cleaning runs in chunks on its workers.
+    """
+    timer = timer or StageTimer()
 
-# 2. HTML Cleaning Function - Used ONLY for building the search index field
-def clean_html_and_whitespace(text):
-    """Removes HTML tags and excessive whitespace from a string."""
-    if pd.isna(text) or text is None:
-        return ""
-    text = str(text)
-    # Remove HTML tags (e.g., <strong>, <br />, <span>)
-    text = re.sub(r'<[^>]+>', '', text)
-    # Remove excessive whitespace, newlines, and escape characters
-    text = re.sub(r'[\n\r]+', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
-    # Remove common placeholders like "{}" and trim spaces
-    text = text.replace('{}', '').strip()
-    return text
+    # Prepare cleaned text for the merged field
+    # Deep cleaning is applied primarily to the noisy ingredients text
+    with timer.stage('clean ingredients'):
+        cleaned_ingredients_text = clean_in_chunks(df['ingredients_text'], pool)
 
-# 3. Prepare cleaned text for the merged field
-# Deep cleaning is applied primarily to the noisy ingredients text
-cleaned_ingredients_text = df['ingredients_text'].apply(clean_html_and_whitespace)
+    # Clean and concatenate category fields to ensure clean indexing terms
+    with timer.stage('clean categories'):
+        cleaned_categories = clean_in_chunks(df['original_category'].fillna('') + ' ' +
+                                             df['category_main'].fillna('') + ' ' +
+                                             df['category_sub'].fillna(''), pool)
 
-# Clean and concatenate category fields to ensure clean indexing terms
-cleaned_categories = (df['original_category'].fillna('') + ' ' + 
-                      df['category_main'].fillna('') + ' ' + 
-                      df['category_sub'].fillna('')).apply(clean_html_and_whitespace)
+    # Create the "Catch-All" Search Field (catch_all_text)
+    # Concatenate fields: product_name (Original) + description (Original) + cleaned categories + cleaned ingredients text
+    # The cleaned parts are already collapsed; name and description are collapsed here, so the
+    # merged field needs no second whitespace pass
+    with timer.stage('build catch_all_text'):
+        df['catch_all_text'] = [
+            ' '.join(part for part in (collapse_whitespace(str(name)), collapse_whitespace(str(description)),
+                                       categories, ingredients) if part)
+            for name, description, categories, ingredients in zip(df['product_name'].fillna(''),
+                                                                  df['description'].fillna(''),
+                                                                  cleaned_categories.fillna(''),
+                                                                  cleaned_ingredients_text.fillna(''))
+        ]
 
+    # Add custom feature field (User Relevance Feedback)
+    # 'popularity_score' (Solr pint): Initialized to 0 for boosting/sorting
+    df['popularity_score'] = 0
 
-# 4. Create the "Catch-All" Search Field (catch_all_text)
-# Concatenate fields: product_name (Original) + description (Original) + cleaned categories + cleaned ingredients text
-df['catch_all_text'] = df['product_name'].fillna('') + ' ' + \
-                      df['description'].fillna('') + ' ' + \
-                      cleaned_categories.fillna('') + ' ' + \
-                      cleaned_ingredients_text.fillna('')
+    # Near-duplicate groups (sizes, combos, copies in several categories) for Solr result collapsing
+    with timer.stage('near-duplicate clusters'):
+        df['cluster_id'] = assign_clusters(df[['id', 'product_name', 'catch_all_text']].to_dict('records'))
+    return df
 
-# Final cleanup of excessive spaces in the merged field
-df['catch_all_text'] = df['catch_all_text'].str.replace(r'\s+', ' ', regex=True).str.strip()
+def main():
+    parser = argparse.ArgumentParser(description="Add catch_all_text / popularity_score and write the Solr import file")
+    parser.add_argument('--input', default="fast_food_menu_final.json")
+    parser.add_argument('--output', default="fast_food_menu_for_solr_V3.json")
+    parser.add_argument('--workers', type=int, default=1,
+                        help=f"Worker processes for the text cleaning (0: one per CPU, {default_workers()} here)")
+    args = parser.parse_args()
 
+    # 1. Load JSON Data
+    file_name = args.input
+    try:
+        with open(file_name, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        print(f"Error: File '{file_name}' not found. Please ensure the file is in the correct directory.")
+        # Exit if file is missing
+        exit()
 
-# 5. Add custom feature field (User Relevance Feedback)
-# 'popularity_score' (Solr pint): Initialized to 0 for boosting/sorting
-df['popularity_score'] = 0
+    timer = StageTimer()
+    with timer.stage('build DataFrame'):
+        df = pd.DataFrame(data)
+    with worker_pool(args.workers or default_workers()) as pool:
+        df = add_search_fields(df, timer, pool)
 
-# 6. Save the processed data to a new JSON file for Solr import
-processed_file_name = "fast_food_menu_for_solr_V3.json"
-# Use df.to_json to ensure proper JSON format for Solr
-df.to_json(processed_file_name, orient='records', force_ascii=False, indent=2)
+    # Save the processed data to a new JSON file for Solr import
+    processed_file_name = args.output
+    # Use df.to_json to ensure proper JSON format for Solr
+    with timer.stage('write JSON'):
+        df.to_json(processed_file_name, orient='records', force_ascii=False, indent=2)
+    # Columnar copy of the same documents for readers that only need some fields
+    snapshot_file_name = processed_file_name.replace('.json', '.snapshot')
+    with timer.stage('write snapshot'):
+        write_snapshot(iter_documents(processed_file_name), snapshot_file_name)
 
-print(f"Data cleaning and preprocessing completed.")
-print(f"The new Solr import file is: {processed_file_name}")
-print("\n--- Key Fields Preview (Using built-in method to avoid 'tabulate' dependency) ---")
-# Use to_string() to print the head to avoid the 'tabulate' dependency issue
-print(df[['id', 'product_name', 'description', 'catch_all_text', 'popularity_score']].head().to_string(index=False))
\ No newline at end of file
+    print(f"Data cleaning and preprocessing completed.")
+    print(f"The new Solr import file is: {processed_file_name}")
+    print(f"Columnar snapshot: {snapshot_file_name}")
+    print("\n--- Key Fields Preview (Using built-in method to avoid 'tabulate' dependency) ---")
+    # Use to_string() to print the head to avoid the 'tabulate' dependency issue
+    print(df[['id', 'product_name', 'description', 'catch_all_text', 'popularity_score']].head().to_string(index=False))
+    timer.report()
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,14 @@
+import argparse
 import json
+import os
+import sys
 import pandas as pd
-import re
 import numpy as np
+from functools import partial
+from process_pool import CHUNK_SIZE, default_workers, map_chunks, worker_pool
+# The nutrient parser is shared with the scrapers, which store values already parsed
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '1.1_Crawler_Scripts'))
+from nutrient_parsing import parse_nutrient
 
 # ==========================================
 # Category Mapping Definition
@@ -57,39 +64,10 @@ CATEGORY_MAP = {
     'World Menu Heist': ('Promotional', 'Limited Time'),
 }
 
-# ==========================================
-# Load Data
-# ==========================================
-
-with open('mcdonalds_products_data.json', 'r', encoding='utf-8') as f: 
-    mcd_data = json.load(f)
-with open('kfc_menu_mapped.json', 'r', encoding='utf-8') as f: 
-    kfc_data = json.load(f)
-with open('wendys_menu_mapped.json', 'r', encoding='utf-8') as f: 
-    wendys_data = json.load(f)
-
 # ==========================================
 # Helper Functions
 # ==========================================
 
-def clean_numeric(value):
-    """Extract numeric values, handle ranges"""
-    if pd.isna(value) or value == "" or value is None:
-        return None
-    value_str = str(value).lower().strip()
-    if '-' in value_str:
-        parts = value_str.split('-')
-        try:
-            nums = [float(re.sub(r'[^\d.]', '', p)) for p in parts]
-            return sum(nums) / len(nums)
-        except: 
-            pass
-    cleaned = re.sub(r'[^\d.]', '', value_str)
-    try:
-        return float(cleaned)
-    except ValueError:
-        return None
-
 def get_categories(original_category):
     """Return (Main Category, Sub Category)"""
     cleaned_category = str(original_category).strip()
@@ -99,13 +77,17 @@ def get_categories(original_category):
 # Core Data Processing Function
 # ==========================================
 
+# Handle categories that map to multiple subcategories
+MULTI_MAP_CATEGORIES = {
+    'Milkshakes & Cold Drinks': [('Drinks', 'Cold Drinks'), ('Drinks', 'Milkshakes')]
+}
+
 def process_data_source(data, brand_name):
-    processed_list = []
-    
-    # Handle categories that map to multiple subcategories
-    multi_map_categories = {
-        'Milkshakes & Cold Drinks': [('Drinks', 'Cold Drinks'), ('Drinks', 'Milkshakes')]
-    }
+    return list(iter_data_source(data, brand_name))
+
+def iter_data_source(data, brand_name):
+    """Generator version of process_data_source: yields one structured row at a time"""
+    multi_map_categories = MULTI_MAP_CATEGORIES
 
     for item in data:
         name = item.get('name') or item.get('marketing_name', '')
@@ -143,81 +125,134 @@ def process_data_source(data, brand_name):
                 'image_url': item.get('image_url'),
                 'components_list': components_list,
                 'ingredients_text': ingredients_text,
-                'calories_kcal': clean_numeric(item.get('calories')),
-                'protein_g': clean_numeric(item.get('protein')),
-                'fat_g': clean_numeric(item.get('fat')),
-                'carbs_g': clean_numeric(item.get('carbs')),
-                'sugar_g': clean_numeric(item.get('sugar')),
-                'salt_g': clean_numeric(item.get('salt')),
+                'calories_kcal': parse_nutrient(item.get('calories'), 'calories'),
+                'protein_g': parse_nutrient(item.get('protein'), 'protein'),
+                'fat_g': parse_nutrient(item.get('fat'), 'fat'),
+                'carbs_g': parse_nutrient(item.get('carbs'), 'carbs'),
+                'sugar_g': parse_nutrient(item.get('sugar'), 'sugar'),
+                'salt_g': parse_nutrient(item.get('salt'), 'salt'),
             }
-            processed_list.append(processed)
-    return processed_list
+            yield processed
 
 # ==========================================
-# Execute Processing
+# Missing Nutrient Imputation (vectorized)
 # ==========================================
 
-print("Starting data processing...")
-
-mcd_processed = process_data_source(mcd_data, 'McDonald\'s')
-mcd_df = pd.DataFrame(mcd_processed)
-
 nutrients_cols = ['calories_kcal', 'protein_g', 'fat_g', 'carbs_g', 'sugar_g', 'salt_g']
-sub_category_means = mcd_df.groupby('category_sub')[nutrients_cols].mean()
-main_category_means = mcd_df.groupby('category_main')[nutrients_cols].mean()
-
-def impute_missing(item):
-    nutrients = nutrients_cols
-    name = item['product_name']
-    sub_cat = item['category_sub']
-    main_cat = item['category_main']
-    
-    for nut in nutrients:
-        if pd.isna(item[nut]) or item[nut] == 0.0: 
-            match = mcd_df[mcd_df['product_name'].str.lower() == name.lower()]
-            if not match.empty:
-                imputed_value = match.iloc[0][nut]
-                if not pd.isna(imputed_value):
-                    item[nut] = round(imputed_value, 2)
-                    continue
-
-            if sub_cat in sub_category_means.index and not pd.isna(sub_category_means.loc[sub_cat, nut]):
-                item[nut] = round(sub_category_means.loc[sub_cat, nut], 2)
-            elif main_cat in main_category_means.index and not pd.isna(main_category_means.loc[main_cat, nut]):
-                item[nut] = round(main_category_means.loc[main_cat, nut], 2)
-            else:
-                item[nut] = 0.0
-    return item
 
-wendys_processed = process_data_source(wendys_data, "Wendy's")
-kfc_processed = process_data_source(kfc_data, "KFC")
+def build_imputation_reference(mcd_df):
+    """
+    Precompute the McDonald's reference tables used for imputation:
+    nutrients of the first product per lowercase name, and mean nutrients
+    per sub category and per main category.
+    """
+    by_name = mcd_df[nutrients_cols].copy()
+    by_name['name_key'] = mcd_df['product_name'].str.lower()
+    by_name = by_name.drop_duplicates('name_key', keep='first').set_index('name_key')
+    sub_category_means = mcd_df.groupby('category_sub')[nutrients_cols].mean()
+    main_category_means = mcd_df.groupby('category_main')[nutrients_cols].mean()
+    return by_name, sub_category_means, main_category_means
 
-wendys_imputed = [impute_missing(item) for item in wendys_processed]
-kfc_imputed = [impute_missing(item) for item in kfc_processed]
+def impute_missing(df, reference):
+    """
+    Fill missing or zero nutrients for a whole DataFrame at once.
+    Priority per nutrient: same product name at McDonald's -> sub category
+    mean -> main category mean -> 0.0 (values rounded to 2 decimals).
+    """
+    by_name, sub_category_means, main_category_means = reference
+    if df.empty:
+        return df
 
-# Combine all data
-all_data = mcd_processed + wendys_imputed + kfc_imputed
-final_df = pd.DataFrame(all_data)
+    def lookup(table, keys):
+        return table.reindex(keys.values)[nutrients_cols].set_axis(df.index).round(2)
 
-# Reindex IDs
-final_df['id'] = range(1, len(final_df) + 1)
-final_df = final_df[['id'] + [col for col in final_df.columns if col != 'id']]
+    candidates = (lookup(by_name, df['product_name'].str.lower())
+                  .fillna(lookup(sub_category_means, df['category_sub']))
+                  .fillna(lookup(main_category_means, df['category_main']))
+                  .fillna(0.0))
+
+    df = df.copy()
+    for nut in nutrients_cols:
+        values = df[nut]
+        missing = values.isna() | (values == 0.0)
+        df[nut] = values.astype(object).where(~missing, candidates[nut])
+    return df
 
 # ==========================================
-# Export JSON File
+# Execute Processing
 # ==========================================
 
-json_file_name = 'fast_food_menu_final.json'
-json_output = final_df.to_dict('records')
-with open(json_file_name, 'w', encoding='utf-8') as f:
-    json.dump(json_output, f, indent=2, ensure_ascii=False)
+def load_raw_data(mcd_file='mcdonalds_products_data.json', kfc_file='kfc_menu_mapped.json',
+                  wendys_file='wendys_menu_mapped.json'):
+    """Load the three raw scraper outputs"""
+    with open(mcd_file, 'r', encoding='utf-8') as f: 
+        mcd_data = json.load(f)
+    with open(kfc_file, 'r', encoding='utf-8') as f: 
+        kfc_data = json.load(f)
+    with open(wendys_file, 'r', encoding='utf-8') as f: 
+        wendys_data = json.load(f)
+    return mcd_data, kfc_data, wendys_data
+
+def process_all(mcd_data, kfc_data, wendys_data, pool=None, chunk_size=CHUNK_SIZE):
+    """
+    Structure, map and impute all brands; returns the final DataFrame with IDs.
+    With a process pool (process_pool.worker_pool), items are structured in
+    chunks on the workers; the result is the same as without one.
+    """
+    def structure(data, brand_name):
+        return map_chunks(partial(process_data_source, brand_name=brand_name), data, pool, chunk_size)
+
+    mcd_processed = structure(mcd_data, 'McDonald\'s')
+    mcd_df = pd.DataFrame(mcd_processed)
+    reference = build_imputation_reference(mcd_df)
+
+    wendys_df = impute_missing(pd.DataFrame(structure(wendys_data, "Wendy's")), reference)
+    kfc_df = impute_missing(pd.DataFrame(structure(kfc_data, "KFC")), reference)
+
+    # Combine all data
+    all_data = mcd_processed + wendys_df.to_dict('records') + kfc_df.to_dict('records')
+    final_df = pd.DataFrame(all_data)
+
+    # Reindex IDs
+    final_df['id'] = range(1, len(final_df) + 1)
+    final_df = final_df[['id'] + [col for col in final_df.columns if col != 'id']]
+    return final_df
+
+def main():
+    parser = argparse.ArgumentParser(description="Unify, map and impute the raw scraper JSON files")
+    parser.add_argument('--raw-dir', default='.', help="Directory with the three raw JSON files")
+    parser.add_argument('--output', default='fast_food_menu_final.json')
+    parser.add_argument('--workers', type=int, default=1,
+                        help=f"Worker processes for structuring the items (0: one per CPU, {default_workers()} here)")
+    args = parser.parse_args()
+    print("Starting data processing...")
+
+    mcd_data, kfc_data, wendys_data = load_raw_data(
+        os.path.join(args.raw_dir, 'mcdonalds_products_data.json'),
+        os.path.join(args.raw_dir, 'kfc_menu_mapped.json'),
+        os.path.join(args.raw_dir, 'wendys_menu_mapped.json'),
+    )
+    with worker_pool(args.workers or default_workers()) as pool:
+        final_df = process_all(mcd_data, kfc_data, wendys_data, pool)
+
+    # ==========================================
+    # Export JSON File
+    # ==========================================
+
+    json_file_name = args.output
+    json_output = final_df.to_dict('records')
+    with open(json_file_name, 'w', encoding='utf-8') as f:
+        json.dump(json_output, f, indent=2, ensure_ascii=False)
+
+    print(f"Data processing completed!")
+    print(f"Total products: {len(final_df)}")
+    print(f"File exported: {json_file_name}")
 
-print(f"Data processing completed!")
-print(f"Total products: {len(final_df)}")
-print(f"File exported: {json_file_name}")
+    # Display category statistics
+    print("\n Category Statistics:")
+    print(final_df['category_main'].value_counts())
+    print("\n ubcategory Statistics:")
+    print(final_df['category_sub'].value_counts().head(10))
 
-# Display category statistics
-print("\n Category Statistics:")
-print(final_df['category_main'].value_counts())
-print("\n ubcategory Statistics:")
-print(final_df['category_sub'].value_counts().head(10))
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+from itertools import product
+from columnar_snapshot import default_menu, iter_documents
+from pipeline import PROCESSED_DATA_DIR
+
+# ==========================================
+# Facet Count Cube
+# Document counts for brand x category_main x category_sub with every
+# roll-up precomputed, so any drill-down is a single dict lookup
+# ==========================================
+
+DIMENSIONS = ('brand', 'category_main', 'category_sub')
+ALL = None  # wildcard: the dimension is rolled up
+
+
+def cell_of(doc):
+    return tuple(doc.get(dim) or '' for dim in DIMENSIONS)
+
+
+class FacetCube:
+    """
+    counts[(brand, main, sub)] holds the number of documents in that cell, with
+    ALL in any position for the roll-ups (8 entries per leaf cell).
+    facets[(key, dim)] holds {value: count} of dimension `dim` among the
+    documents matching `key` (key has ALL at `dim`), which is what the FilterBar
+    drop-downs need. Both are maintained on add / remove, so queries never scan.
+    """
+    def __init__(self):
+        self.counts = {}
+        self.facets = {}
+        self.cells = {}  # doc id -> leaf cell, so an update only needs the new document
+
+    def _bump(self, cell, delta):
+        for mask in product((False, True), repeat=len(DIMENSIONS)):
+            key = tuple(ALL if rolled else value for value, rolled in zip(cell, mask))
+            count = self.counts.get(key, 0) + delta
+            if count:
+                self.counts[key] = count
+            else:
+                del self.counts[key]
+            for dim, rolled in enumerate(mask):
+                if rolled:
+                    values = self.facets.setdefault((key, dim), {})
+                    count = values.get(cell[dim], 0) + delta
+                    if count:
+                        values[cell[dim]] = count
+                    else:
+                        del values[cell[dim]]
+                        if not values:
+                            del self.facets[(key, dim)]
+
+    # --- Incremental Updates ---
+    def add(self, doc):
+        """Add or re-categorize a document (a known id is moved to its new cell)"""
+        cell = cell_of(doc)
+        old = self.cells.get(doc['id'])
+        if old == cell:
+            return
+        if old is not None:
+            self._bump(old, -1)
+        self.cells[doc['id']] = cell
+        self._bump(cell, 1)
+
+    def remove(self, doc_id):
+        cell = self.cells.pop(doc_id, None)
+        if cell is not None:
+            self._bump(cell, -1)
+
+    @classmethod
+    def from_documents(cls, docs):
+        cube = cls()
+        for doc in docs:
+            cube.add(doc)
+        return cube
+
+    # --- Queries (O(1)) ---
+    def count(self, brand=ALL, category_main=ALL, category_sub=ALL):
+        return self.counts.get((brand, category_main, category_sub), 0)
+
+    def facet(self, dimension, brand=ALL, category_main=ALL, category_sub=ALL):
+        """
+        {value: count} of `dimension` among documents matching the other filters,
+        e.g. facet('category_sub', brand='KFC', category_main='Main').
+        A filter on `dimension` itself is ignored, as with Solr's tagged/excluded fq.
+        """
+        dim = DIMENSIONS.index(dimension)
+        key = [brand, category_main, category_sub]
+        key[dim] = ALL
+        return self.facets.get((tuple(key), dim), {})
+
+    # --- Persistence (leaf cells only; roll-ups are rebuilt on load) ---
+    def save(self, filename):
+        cells = sorted(set(self.cells.values()))
+        index = {cell: i for i, cell in enumerate(cells)}
+        data = {'dimensions': DIMENSIONS, 'cells': cells,
+                'docs': {str(doc_id): index[cell] for doc_id, cell in self.cells.items()}}
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        cube = cls()
+        cells = [tuple(cell) for cell in data['cells']]
+        for doc_id, i in data['docs'].items():
+            cube.cells[int(doc_id) if doc_id.isdigit() else doc_id] = cells[i]
+            cube._bump(cells[i], 1)
+        return cube
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the brand x category facet count cube")
+    parser.add_argument('--input', default=default_menu(),
+                        help="Processed menu (snapshot, JSON array or JSON Lines)")
+    parser.add_argument('--output', default=os.path.join(PROCESSED_DATA_DIR, 'facet_cube.json'))
+    args = parser.parse_args()
+
+    cube = FacetCube.from_documents(iter_documents(args.input, ['id', *DIMENSIONS]))
+    cube.save(args.output)
+    print(f"Facet cube: {len(cube.cells)} documents in {len(set(cube.cells.values()))} cells, "
+          f"{len(cube.counts)} counts, written to {args.output}")
+    for brand, count in sorted(cube.facet('brand').items()):
+        print(f"  {brand:<12} {count:>4}  {cube.facet('category_main', brand=brand)}")
+
+if __name__ == "__main__":
+    main()
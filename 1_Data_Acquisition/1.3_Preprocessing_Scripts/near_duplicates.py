@@ -0,0 +1,117 @@
+import argparse
+import re
+import zlib
+import numpy as np
+
+# ==========================================
+# Near-Duplicate Clusters (MinHash + LSH)
+# Each document gets a MinHash signature of its product_name tokens and
+# catch_all_text word pairs. Signatures are cut into bands; documents that
+# share a band bucket are candidates, and a candidate whose estimated
+# Jaccard similarity reaches the threshold joins that cluster. No pair of
+# documents is compared unless they collide in a bucket.
+# ==========================================
+
+NUM_PERM = 64
+BANDS = 8              # 8 bands x 8 rows: pairs above ~0.77 Jaccard collide with high probability
+THRESHOLD = 0.8        # estimated Jaccard similarity to join a cluster
+PRIME = 4294967311     # smallest prime above 2**32; a * x + b stays below 2**64
+
+TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def shingles(doc):
+    """Name tokens (marked, so the name weighs in on its own) + adjacent word pairs of catch_all_text"""
+    name = TOKEN.findall(str(doc.get('product_name') or '').lower())
+    words = TOKEN.findall(str(doc.get('catch_all_text') or '').lower())
+    features = {'name:' + token for token in name}
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    if len(words) == 1:
+        features.add(words[0])
+    return features
+
+
+class NearDuplicateIndex:
+    """
+    Streaming leader clustering: a document joins the cluster of the first
+    earlier leader it collides with (in any band) and matches at THRESHOLD,
+    otherwise it leads a new cluster named after its own id. Buckets only
+    hold leaders, so a cluster of many copies costs one comparison per band.
+    Assignments never change afterwards, so the batch and streaming paths agree.
+    """
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, threshold=THRESHOLD, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, 2 ** 32, num_perm, dtype=np.uint64)[:, None]
+        self.b = rng.randint(0, 2 ** 32, num_perm, dtype=np.uint64)[:, None]
+        self.rows = num_perm // bands
+        self.bands = bands
+        self.threshold = threshold
+        self.buckets = {}       # (band, signature slice) -> leader numbers
+        self.leaders = []       # (cluster_id, signature)
+        self.comparisons = 0
+
+    def signature(self, features):
+        if not features:
+            return None
+        x = np.fromiter((zlib.crc32(feature.encode('utf-8')) for feature in features),
+                        dtype=np.uint64, count=len(features))
+        return ((self.a * x + self.b) % PRIME).min(axis=1)
+
+    def add(self, doc_id, doc):
+        """cluster_id of the document (its own id when it starts a new cluster)"""
+        signature = self.signature(shingles(doc))
+        if signature is None:
+            return str(doc_id)
+        keys = [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+        seen = set()
+        for key in keys:
+            for leader in self.buckets.get(key, ()):
+                if leader in seen:
+                    continue
+                seen.add(leader)
+                self.comparisons += 1
+                cluster_id, leader_signature = self.leaders[leader]
+                if np.count_nonzero(signature == leader_signature) >= self.threshold * len(signature):
+                    return cluster_id
+        leader = len(self.leaders)
+        self.leaders.append((str(doc_id), signature))
+        for key in keys:
+            self.buckets.setdefault(key, []).append(leader)
+        return str(doc_id)
+
+
+def assign_clusters(docs, **options):
+    """cluster_id per document, in order (documents need 'id', 'product_name' and 'catch_all_text')"""
+    index = NearDuplicateIndex(**options)
+    return [index.add(doc['id'], doc) for doc in docs]
+
+
+def cluster_summary(docs, cluster_ids):
+    clusters = {}
+    for doc, cluster_id in zip(docs, cluster_ids):
+        clusters.setdefault(cluster_id, []).append(doc)
+    return sorted((members for members in clusters.values() if len(members) > 1), key=len, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Group near-duplicate menu items with MinHash + LSH")
+    parser.add_argument('--input', default=None, help="Processed menu (snapshot, JSON array or JSON Lines)")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--show', type=int, default=10, help="Largest clusters to print")
+    args = parser.parse_args()
+    # pipeline.py imports this module and columnar_snapshot imports pipeline: load it here
+    from columnar_snapshot import default_menu, iter_documents
+
+    docs = list(iter_documents(args.input or default_menu(), ['id', 'product_name', 'brand', 'catch_all_text']))
+    cluster_ids = assign_clusters(docs, threshold=args.threshold)
+    clusters = cluster_summary(docs, cluster_ids)
+    print(f"{len(docs)} documents -> {len(set(cluster_ids))} clusters "
+          f"({len(clusters)} with near-duplicates, {sum(map(len, clusters)) - len(clusters)} documents collapsible)")
+    for members in clusters[:args.show]:
+        names = sorted({f"{doc['product_name']} ({doc['brand']})" for doc in members})
+        print(f"  {len(members):>3} x {'; '.join(names[:4])}{' ...' if len(names) > 4 else ''}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import argparse
+import json
+import math
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from columnar_snapshot import default_menu, iter_documents
+from data_processing_en import nutrients_cols
+from pipeline import PROCESSED_DATA_DIR
+
+# ==========================================
+# Nutrient Range Index
+# Sorted values per nutrient + document bitsets at quantized thresholds,
+# so any combination of [low TO high] filters is a few big-int ANDs
+# ==========================================
+
+
+# Threshold spacing; calories / fat / salt follow the FilterBar slider steps
+THRESHOLD_STEPS = {
+    'calories_kcal': 50,
+    'protein_g': 1,
+    'fat_g': 1,
+    'carbs_g': 5,
+    'sugar_g': 1,
+    'salt_g': 0.1,
+}
+
+
+class NutrientColumn:
+    """
+    One nutrient: values sorted ascending with the matching doc numbers, and
+    prefix bitsets where bitsets[k] holds the first counts[k] docs of that order
+    (all docs up to a multiple of `step`; only thresholds that add docs are kept).
+    Docs without a value are in no range.
+    """
+    def __init__(self, values, order, counts, bitsets):
+        self.values = values
+        self.order = order
+        self.counts = counts
+        self.bitsets = bitsets
+        self.present = self._prefix(len(values))
+
+    @classmethod
+    def build(cls, column, step):
+        present = sorted((value, doc) for doc, value in enumerate(column) if value is not None)
+        values = array('d', (value for value, _ in present))
+        order = array('i', (doc for _, doc in present))
+        counts = array('i')
+        bitsets = []
+        # Bits are set in a byte buffer and converted once per threshold (int |= is a full copy)
+        buffer = bytearray((len(column) + 7) // 8)
+        i = 0
+        while i < len(values):
+            # Next threshold that adds docs (empty thresholds are not stored)
+            threshold = round(math.ceil(round(values[i] / step, 6)) * step, 6)
+            while i < len(values) and values[i] <= threshold:
+                buffer[order[i] >> 3] |= 1 << (order[i] & 7)
+                i += 1
+            counts.append(i)
+            bitsets.append(int.from_bytes(buffer, 'little'))
+        return cls(values, order, counts, bitsets)
+
+    def _prefix(self, end):
+        """Bitset of the first `end` docs in value order: nearest stored prefix plus the few docs after it"""
+        k = bisect_right(self.counts, end) - 1
+        bits, start = (self.bitsets[k], self.counts[k]) if k >= 0 else (0, 0)
+        for doc in self.order[start:end]:
+            bits |= 1 << doc
+        return bits
+
+    def at_most(self, value):
+        return self._prefix(bisect_right(self.values, value))
+
+    def less_than(self, value):
+        return self._prefix(bisect_left(self.values, value))
+
+    def range(self, low=None, high=None):
+        """Docs with low <= value <= high (inclusive, like Solr's [low TO high])"""
+        bits = self.present if high is None else self.at_most(high)
+        if low is not None:
+            bits &= ~self.less_than(low)
+        return bits
+
+
+class NutrientIndex:
+    """Range filters over the six nutrient columns; doc numbers are row positions of `ids`"""
+    def __init__(self, ids, columns):
+        self.ids = ids
+        self.columns = columns
+
+    @classmethod
+    def build(cls, records, steps=THRESHOLD_STEPS):
+        records = list(records)
+        ids = [record['id'] for record in records]
+        columns = {nut: NutrientColumn.build([_scalar(record.get(nut)) for record in records], steps[nut])
+                   for nut in nutrients_cols}
+        return cls(ids, columns)
+
+    def filter(self, ranges):
+        """ranges: {nutrient: (low, high)}, either bound may be None -> bitset of matching docs"""
+        bits = (1 << len(self.ids)) - 1
+        for nut, (low, high) in ranges.items():
+            bits &= self.columns[nut].range(low, high)
+            if not bits:
+                break
+        return bits
+
+    def doc_numbers(self, bits):
+        """Set bits in ascending order"""
+        digits = format(bits, 'b')[::-1]
+        docs = []
+        doc = digits.find('1')
+        while doc != -1:
+            docs.append(doc)
+            doc = digits.find('1', doc + 1)
+        return docs
+
+    def matching_ids(self, ranges):
+        return [self.ids[doc] for doc in self.doc_numbers(self.filter(ranges))]
+
+    # --- Persistence ---
+    def save(self, filename):
+        data = {'ids': self.ids, 'columns': {
+            nut: {'values': list(col.values), 'order': list(col.order), 'counts': list(col.counts),
+                  'bitsets': [format(bits, 'x') for bits in col.bitsets]}
+            for nut, col in self.columns.items()}}
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        columns = {nut: NutrientColumn(array('d', col['values']), array('i', col['order']), array('i', col['counts']),
+                                       [int(bits, 16) for bits in col['bitsets']])
+                   for nut, col in data['columns'].items()}
+        return cls(data['ids'], columns)
+
+
+def _scalar(value):
+    """calories_kcal / protein_g are multiValued in the schema; the processed data holds one value"""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    return None if value is None else float(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the nutrient range index from the processed menu")
+    parser.add_argument('--input', default=default_menu(), help="Processed menu (snapshot, JSON array or JSON Lines)")
+    parser.add_argument('--output', default=os.path.join(PROCESSED_DATA_DIR, 'nutrient_index.json'))
+    args = parser.parse_args()
+
+    index = NutrientIndex.build(iter_documents(args.input, ['id'] + nutrients_cols))
+    index.save(args.output)
+    print(f"Nutrient index for {len(index.ids)} products written to {args.output}")
+    for nut, col in index.columns.items():
+        print(f"  {nut:<14} {len(col.values):>5} values, {len(col.bitsets):>4} bitsets (step {THRESHOLD_STEPS[nut]})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+import argparse
+import json
+import os
+import time
+from functools import partial
+from data_processing_en import iter_data_source, nutrients_cols, process_data_source
+from near_duplicates import NearDuplicateIndex
+from process_pool import CHUNK_SIZE, default_workers, map_chunks, worker_pool
+from stage_timing import StageTimer
+from text_cleaning import clean_html_and_whitespace, collapse_whitespace
+
+# ==========================================
+# Unified Streaming Pipeline
+# raw JSON -> normalize -> category map -> impute -> clean -> catch-all -> near-duplicates -> JSON Lines
+# ==========================================
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RAW_DATA_DIR = os.path.join(SCRIPT_DIR, '..', '1.2_Raw_Data')
+PROCESSED_DATA_DIR = os.path.join(SCRIPT_DIR, '..', '1.4_Processed_Data')
+
+# (brand, raw file); McDonald's comes first because it is the imputation reference
+RAW_SOURCES = [
+    ("McDonald's", 'mcdonalds_products_data.json'),
+    ("Wendy's", 'wendys_menu_mapped.json'),
+    ("KFC", 'kfc_menu_mapped.json'),
+]
+REFERENCE_BRAND = "McDonald's"
+
+# Field order of the Solr import file
+OUTPUT_FIELDS = [
+    'id', 'url', 'product_name', 'brand', 'original_category', 'category_main', 'category_sub',
+    'description', 'image_url', 'components_list', 'ingredients_text',
+    'calories_kcal', 'protein_g', 'fat_g', 'carbs_g', 'sugar_g', 'salt_g',
+    'catch_all_text', 'popularity_score', 'cluster_id',
+]
+
+# ==========================================
+# Stage 0: Streaming Readers
+# ==========================================
+
+def iter_json_records(filename, chunk_size=1 << 16):
+    """
+    Yield the objects of a JSON array file (or a JSON Lines file) one at a time,
+    without loading the whole document.
+    """
+    decoder = json.JSONDecoder()
+    with open(filename, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size)
+        pos = 0
+        eof = not buffer
+        while True:
+            # Skip separators between records: whitespace, '[' / ']' and ','
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,[]':
+                pos += 1
+            if pos >= len(buffer):
+                if eof:
+                    return
+                buffer, pos = f.read(chunk_size), 0
+                eof = not buffer
+                continue
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Record spans the chunk boundary: keep the tail and read more
+                more = f.read(chunk_size)
+                eof = not more
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            yield record
+            pos = end
+
+# ==========================================
+# Stage 1: Streaming Imputation
+# ==========================================
+
+def round_like_numpy(value, decimals=2):
+    """Round the way np.round / pandas do (scale, round half to even, unscale) so results match"""
+    scale = 10 ** decimals
+    return round(value * scale) / scale
+
+class StreamingImputer:
+    """
+    Same rules as data_processing_en.impute_missing, built incrementally:
+    reference rows are observed as they stream past (first row per lowercase
+    name, running per-category sums), then used to fill the other brands.
+    """
+    def __init__(self):
+        self.by_name = {}
+        self.sub_sums = {}
+        self.main_sums = {}
+
+    @staticmethod
+    def _accumulate(table, key, record):
+        # Per nutrient: [sum, compensation, count] (Neumaier summation, like pandas' mean)
+        sums = table.setdefault(key, {nut: [0.0, 0.0, 0] for nut in nutrients_cols})
+        for nut in nutrients_cols:
+            value = record[nut]
+            if value is None:
+                continue
+            acc = sums[nut]
+            total = acc[0] + value
+            if abs(acc[0]) >= abs(value):
+                acc[1] += (acc[0] - total) + value
+            else:
+                acc[1] += (value - total) + acc[0]
+            acc[0] = total
+            acc[2] += 1
+
+    @staticmethod
+    def _mean(table, key, nut):
+        acc = table.get(key, {}).get(nut)
+        if not acc or not acc[2]:
+            return None
+        return (acc[0] + acc[1]) / acc[2]
+
+    def observe(self, record):
+        name_key = str(record['product_name']).lower()
+        if name_key not in self.by_name:
+            self.by_name[name_key] = {nut: record[nut] for nut in nutrients_cols}
+        self._accumulate(self.sub_sums, record['category_sub'], record)
+        self._accumulate(self.main_sums, record['category_main'], record)
+
+    def impute(self, record):
+        name_match = self.by_name.get(str(record['product_name']).lower(), {})
+        for nut in nutrients_cols:
+            if record[nut] is not None and record[nut] != 0.0:
+                continue
+            for value in (name_match.get(nut),
+                          self._mean(self.sub_sums, record['category_sub'], nut),
+                          self._mean(self.main_sums, record['category_main'], nut)):
+                if value is not None:
+                    record[nut] = round_like_numpy(value)
+                    break
+            else:
+                record[nut] = 0.0
+        return record
+
+# ==========================================
+# Stage 2: Cleaning and Catch-All Field
+# ==========================================
+
+def add_search_fields(record):
+    """Per-record version of data_processing02_en.add_search_fields"""
+    cleaned_categories = clean_html_and_whitespace(
+        f"{record['original_category'] or ''} {record['category_main'] or ''} {record['category_sub'] or ''}"
+    )
+    cleaned_ingredients_text = clean_html_and_whitespace(record['ingredients_text'])
+    catch_all = f"{record['product_name'] or ''} {record['description'] or ''} {cleaned_categories} {cleaned_ingredients_text}"
+    record['catch_all_text'] = collapse_whitespace(catch_all)
+    record['popularity_score'] = 0
+    return record
+
+# ==========================================
+# Pipeline Assembly
+# ==========================================
+
+def iter_pipeline(raw_dir=RAW_DATA_DIR, sources=RAW_SOURCES, timer=None):
+    """
+    Yield Solr-ready documents, one at a time, with sequential IDs.
+    With a StageTimer, time spent in reading/normalizing, imputation and
+    cleaning is accumulated per stage (the consumer's time is not counted).
+    """
+    clock = time.perf_counter
+    imputer = StreamingImputer()
+    clusters = NearDuplicateIndex()
+    next_id = 1
+    for brand, filename in sources:
+        records = iter_data_source(iter_json_records(os.path.join(raw_dir, filename)), brand)
+        while True:
+            started = clock()
+            record = next(records, None)
+            if record is None:
+                break
+            read_done = clock()
+            if brand == REFERENCE_BRAND:
+                imputer.observe(record)
+            else:
+                imputer.impute(record)
+            impute_done = clock()
+            record = add_search_fields(record)
+            clean_done = clock()
+            record['id'] = next_id
+            next_id += 1
+            # Only needs the earlier documents, so the stream is not held back
+            record['cluster_id'] = clusters.add(record['id'], record)
+            if timer is not None:
+                timer.add('read + normalize', read_done - started)
+                timer.add('impute', impute_done - read_done)
+                timer.add('clean + catch_all', clean_done - impute_done)
+                timer.add('near-duplicates', clock() - clean_done)
+            yield {field: record.get(field) for field in OUTPUT_FIELDS}
+
+def finish_chunk(records, imputer=None):
+    """Impute (given the reference) and add the search fields to a chunk of normalized records"""
+    if imputer is not None:
+        records = [imputer.impute(record) for record in records]
+    return [add_search_fields(record) for record in records]
+
+def iter_pipeline_parallel(raw_dir=RAW_DATA_DIR, sources=RAW_SOURCES, workers=1, chunk_size=CHUNK_SIZE, timer=None):
+    """
+    Same documents as iter_pipeline, with normalize and impute/clean/catch-all
+    run chunk by chunk on `workers` processes. Raw files are loaded whole;
+    the imputation reference, ids and near-duplicate clusters are still
+    built in order in this process, so the output does not depend on `workers`.
+    """
+    timer = timer or StageTimer()
+    imputer = StreamingImputer()
+    finished = []
+    with worker_pool(workers) as pool:
+        for brand, filename in sources:
+            with timer.stage('read'):
+                items = list(iter_json_records(os.path.join(raw_dir, filename)))
+            with timer.stage('normalize'):
+                records = map_chunks(partial(process_data_source, brand_name=brand), items, pool, chunk_size)
+            if brand == REFERENCE_BRAND:
+                with timer.stage('imputation reference'):
+                    for record in records:
+                        imputer.observe(record)
+                reference = None
+            else:
+                reference = imputer
+            with timer.stage('impute + clean'):
+                finished += map_chunks(partial(finish_chunk, imputer=reference), records, pool, chunk_size)
+
+    clusters = NearDuplicateIndex()
+    for next_id, record in enumerate(finished, start=1):
+        started = time.perf_counter()
+        record['id'] = next_id
+        record['cluster_id'] = clusters.add(record['id'], record)
+        timer.add('near-duplicates', time.perf_counter() - started)
+        yield {field: record.get(field) for field in OUTPUT_FIELDS}
+
+def write_jsonl(records, filename):
+    """Write one JSON document per line (accepted directly by Solr's /update/json/docs)"""
+    count = 0
+    with open(filename, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Raw scraper JSON -> Solr-ready JSON Lines in one streaming pass")
+    parser.add_argument('--raw-dir', default=RAW_DATA_DIR, help="Directory with the raw scraper JSON files")
+    parser.add_argument('--output', default=os.path.join(PROCESSED_DATA_DIR, 'fast_food_menu_for_solr.jsonl'))
+    parser.add_argument('--snapshot', default=None,
+                        help="Columnar snapshot written alongside (default: the output path with .snapshot)")
+    parser.add_argument('--no-snapshot', action='store_true', help="Only write the JSON Lines file")
+    parser.add_argument('--workers', type=int, default=1,
+                        help=f"Worker processes for normalize/clean (0: one per CPU, {default_workers()} here); "
+                             f"1 keeps the single streaming pass")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Raw items per worker task")
+    args = parser.parse_args()
+    # columnar_snapshot imports this module, so it is loaded here rather than at the top
+    from columnar_snapshot import SnapshotWriter
+
+    timer = StageTimer()
+    started = time.perf_counter()
+    workers = args.workers or default_workers()
+    if workers > 1:
+        records = iter_pipeline_parallel(args.raw_dir, workers=workers, chunk_size=args.chunk_size, timer=timer)
+    else:
+        records = iter_pipeline(args.raw_dir, timer=timer)
+    snapshot = None if args.no_snapshot else SnapshotWriter()
+    if snapshot is not None:
+        records = snapshot.tee(records)
+    count = write_jsonl(records, args.output)
+    timer.add('write JSONL', time.perf_counter() - started - sum(timer.totals.values()))
+    print(f"Pipeline completed: {count} documents written to {args.output}")
+    if snapshot is not None:
+        snapshot_file = args.snapshot or os.path.splitext(args.output)[0] + '.snapshot'
+        with timer.stage('write snapshot'):
+            snapshot.write(snapshot_file)
+        print(f"Columnar snapshot written to {snapshot_file}")
+    timer.report()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+# ==========================================
+# Chunked Process Pool
+# A list is cut into fixed-size chunks, each chunk is handled by one worker
+# process, and the results are joined back in chunk order. The output is
+# therefore the same for any number of workers; anything order-dependent
+# (ids, imputation reference, near-duplicate leaders) stays in the parent.
+# ==========================================
+
+CHUNK_SIZE = 2000
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+@contextmanager
+def worker_pool(workers):
+    """A ProcessPoolExecutor for workers > 1, None (run in-process) otherwise"""
+    if workers <= 1:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield pool
+
+
+def chunked(items, chunk_size=CHUNK_SIZE):
+    return [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+
+def map_chunks(fn, items, pool=None, chunk_size=CHUNK_SIZE):
+    """
+    fn(chunk) -> list for every chunk of `items`, concatenated in input order.
+    `fn` must be picklable (a module-level function or a functools.partial of one).
+    """
+    chunks = chunked(list(items), chunk_size)
+    if pool is None or len(chunks) <= 1:
+        results = map(fn, chunks)
+    else:
+        results = pool.map(fn, chunks)
+    return [item for result in results for item in result]
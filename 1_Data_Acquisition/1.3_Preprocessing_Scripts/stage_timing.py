@@ -0,0 +1,25 @@
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """Accumulates wall time per named pipeline stage and prints a small report"""
+    def __init__(self):
+        self.totals = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name, seconds):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+    def report(self, title="Stage timings"):
+        total = sum(self.totals.values()) or 1.0
+        print(f"\n--- {title} ---")
+        for name, seconds in self.totals.items():
+            print(f"  {name:<24} {seconds * 1000:10.1f} ms  {seconds / total:6.1%}")
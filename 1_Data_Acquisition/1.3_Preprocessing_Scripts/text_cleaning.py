@@ -0,0 +1,79 @@
+import html
+import math
+import re
+
+# One combined pattern: every token the cleaner has to act on, in a single scan
+TOKEN_PATTERN = re.compile(
+    r'(?P<tag><[^>]+>)'                                        # HTML tag -> dropped
+    r'|(?P<entity>&(?:#\d+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);)'  # HTML entity -> decoded
+    r'|(?P<placeholder>\{\})'                                   # "{}" placeholder -> dropped
+    r'|(?P<space>\s+)'                                          # whitespace run -> one space
+)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def clean_html_and_whitespace(text):
+    """
+    Remove HTML tags and "{}" placeholders, decode HTML entities and collapse
+    whitespace in a single pass over the string.
+    Whitespace is emitted lazily, so removed tokens never leave double spaces.
+    """
+    if text is None or (isinstance(text, float) and math.isnan(text)):
+        return ""
+    text = str(text)
+
+    parts = []
+    pending_space = False
+    pos = 0
+    for match in TOKEN_PATTERN.finditer(text):
+        start = match.start()
+        if start > pos:
+            if pending_space and parts:
+                parts.append(' ')
+            parts.append(text[pos:start])
+            pending_space = False
+        kind = match.lastgroup
+        if kind == 'space':
+            pending_space = True
+        elif kind == 'entity':
+            decoded = html.unescape(match.group())
+            if decoded.isspace():
+                pending_space = True
+            else:
+                if pending_space and parts:
+                    parts.append(' ')
+                parts.append(decoded)
+                pending_space = False
+        pos = match.end()
+    if pos < len(text):
+        if pending_space and parts:
+            parts.append(' ')
+        parts.append(text[pos:])
+    return ''.join(parts)
+
+
+def clean_column(values):
+    """
+    Clean a whole column (pandas Series or any iterable of strings).
+    Each distinct value is cleaned once, which matters for repetitive
+    fields such as categories and shared ingredient statements.
+    """
+    cache = {}
+
+    def clean(value):
+        try:
+            return cache[value]
+        except KeyError:
+            cache[value] = result = clean_html_and_whitespace(value)
+            return result
+        except TypeError:  # unhashable value
+            return clean_html_and_whitespace(value)
+
+    if hasattr(values, 'map'):
+        return values.map(clean)
+    return [clean(value) for value in values]
+
+
+def collapse_whitespace(text):
+    """Collapse whitespace runs to one space and trim"""
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
@@ -0,0 +1,68 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_times(code):
+    """`python -X importtime -c code` -> {module: cumulative microseconds}"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=SCRIPT_DIR,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def wall_time(args, runs):
+    """Median wall time (ms) of a fresh interpreter running `args`"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=SCRIPT_DIR, capture_output=True, check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time of the synonym tool (python -X importtime)")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=5, help="Heaviest imports to list")
+    args = parser.parse_args()
+
+    # Warm the bytecode cache so the first run does not count compilation
+    import_times('import filter_wordnet')
+    times = import_times('import filter_wordnet')
+    # Modules the interpreter imports anyway (site, .pth hooks) are not the tool's cost
+    startup = import_times('pass')
+    own = {module: us for module, us in times.items() if module not in startup and module != 'filter_wordnet'}
+    print(f"import filter_wordnet: {times['filter_wordnet'] / 1000:.1f} ms cumulative")
+    for module, us in sorted(own.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {module:<24} {us / 1000:>7.1f} ms")
+
+    try:
+        # What the module-level `from nltk.corpus import stopwords` used to cost on every run
+        eager = import_times('import nltk.corpus, nltk.stem')
+        nltk_ms = max(eager.get('nltk.corpus', 0), eager.get('nltk', 0)) / 1000
+        print(f"import nltk.corpus + nltk.stem (previous eager import): {nltk_ms:.1f} ms")
+    except subprocess.CalledProcessError:
+        print("NLTK is not installed (strict mode does not need it)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'synonyms.txt')
+        baseline = wall_time(['-c', 'pass'], args.runs)
+        strict = wall_time(['filter_wordnet.py', '--output', output], args.runs)
+    print(f"\nmedian of {args.runs} runs: interpreter {baseline:.1f} ms, "
+          f"strict mode end to end {strict:.1f} ms (+{strict - baseline:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import json
+import random
+import time
+from filter_wordnet import DEFAULT_INPUT, generate_strict_synonyms, mine_candidates
+
+
+def generate_synonyms_dfs(initial_rules):
+    """Previous dict-of-sets + DFS implementation, kept as the reference for the parity check"""
+    synonym_network = {}
+    for standard_word, synonyms in initial_rules.items():
+        group = {standard_word} | set(synonyms)
+        for term in group:
+            if term not in synonym_network:
+                synonym_network[term] = set()
+            synonym_network[term].update(group)
+
+    final_rules = []
+    processed_words_in_groups = set()
+    for word in sorted(synonym_network.keys()):
+        if word in processed_words_in_groups:
+            continue
+        current_group = set()
+        stack = [word]
+        while stack:
+            current = stack.pop()
+            if current not in current_group:
+                current_group.add(current)
+                if current in synonym_network:
+                    stack.extend(synonym_network[current] - current_group)
+        if len(current_group) > 1:
+            clean_synonyms = sorted({s.replace('_', ' ').replace("'", "") for s in current_group if len(s) > 1})
+            if len(clean_synonyms) > 1:
+                terms_string = ', '.join(clean_synonyms)
+                final_rules.append(f"{terms_string} => {terms_string}")
+                processed_words_in_groups.update(current_group)
+    return sorted(set(final_rules))
+
+
+def synthetic_rules(n_terms, rule_size=8, overlap=0.3, seed=0):
+    """`n_terms` distinct terms in rules of `rule_size`; a share of rules reuses an earlier term, chaining groups"""
+    rng = random.Random(seed)
+    rules = {}
+    terms = [f"term{i}" for i in range(n_terms)]
+    for start in range(0, n_terms, rule_size):
+        head, *synonyms = terms[start:start + rule_size]
+        if start and rng.random() < overlap:
+            synonyms.append(terms[rng.randrange(start)])
+        rules[head] = synonyms
+    return rules
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark union-find synonym groups and corpus mining")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 20000, 40000])
+    parser.add_argument('--copies', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="Corpus sizes for mining, as copies of the processed JSON")
+    parser.add_argument('--input', default=DEFAULT_INPUT)
+    args = parser.parse_args()
+
+    print(f"\n{'terms':>8} {'rules':>8} {'dfs s':>9} {'union-find s':>13} {'speedup':>8}  parity")
+    for size in args.sizes:
+        rules = synthetic_rules(size)
+        expected, dfs_time = timed(generate_synonyms_dfs, rules)
+        result, uf_time = timed(generate_strict_synonyms, rules)
+        print(f"{size:>8} {len(result):>8} {dfs_time:>9.3f} {uf_time:>13.3f} {dfs_time / uf_time:>7.1f}x  "
+              f"{'ok' if result == expected else 'MISMATCH'}")
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        docs = json.load(f)
+    print(f"\n{'docs':>8} {'terms':>8} {'mining s':>9} {'us/doc':>8}")
+    for copies in args.copies:
+        # Copies keep the vocabulary but multiply occurrences; suffixes grow it like new products would
+        corpus = [{'catch_all_text': f"{doc.get('catch_all_text', '')} variant{copy}x{i % 50}"}
+                  for copy in range(copies) for i, doc in enumerate(docs)]
+        neighbours, elapsed = timed(mine_candidates, corpus)
+        print(f"{len(corpus):>8} {len(neighbours):>8} {elapsed:>9.2f} {elapsed / len(corpus) * 1e6:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,50 @@
 #!/usr/bin/env python3
 # save as generate_fastfood_synonyms_V3.py
 
+import argparse
+import functools
+import heapq
 import json
+import math
 import re
-from typing import Dict, List, Set
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 from collections import Counter
-import string
 import os
 
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INPUT = os.path.join(SCRIPT_DIR, '..', '1.4_Processed_Data', 'fast_food_menu_for_solr_V3.json')
+STOPWORDS_FILE = os.path.join(SCRIPT_DIR, '..', '..', '2_Solr_Configuration', 'fastfood_menu', 'conf',
+                              'lang', 'stopwords_en.txt')
+
 # ==============================================================================
-# Dependency Library (NLTK)
+# Dependency Library (NLTK, only loaded by the modes that use it)
 # ==============================================================================
-try:
-    from nltk.corpus import stopwords
-    from nltk.stem import WordNetLemmatizer
-    lemmatizer = WordNetLemmatizer()
-except ImportError:
-    print("\n Error: NLTK library not found. Please install it first.")
-    exit()
+_lemmatize = None
+
+def get_lemmatizer():
+    """WordNet lemmatizer (memoized per word), imported on first use so strict mode never loads NLTK"""
+    global _lemmatize
+    if _lemmatize is None:
+        try:
+            from nltk.stem import WordNetLemmatizer
+        except ImportError:
+            print("\n Error: NLTK library not found. Please install it first (needed for --lemmatize).")
+            exit(1)
+        lemmatizer = WordNetLemmatizer()
+        try:
+            lemmatizer.lemmatize('burgers')
+        except LookupError:
+            print("\n Error: WordNet data not found. Run: python -m nltk.downloader wordnet")
+            exit(1)
+        _lemmatize = functools.lru_cache(maxsize=None)(lemmatizer.lemmatize)
+    return _lemmatize
 
 # Predefined custom rules (manually set semantic synonyms)
 PREDEFINED_RULES: Dict[str, List[str]] = {
     'mcdonalds': ['mcd', "mcdonald's"],
     'kfc': ['kentucky_fried_chicken'],
     'wendys': ["wendy's"],
-    'burger': ['hamburger', 'beefburger', 'cheeseburger', 'baconator', 'mac', 'stack'], 
+    'burger': ['hamburger', 'beefburger', 'cheeseburger', 'baconator', 'mac', 'stack'],
     'fries': ['chips', 'french_fries', 'potato_sides', 'hash_browns'],
     'ketchup': ['tomato_ketchup', 'heinz_ketchup'],
     'wrap': ['tortilla', 'flatbread', 'bap', 'butty', 'twister'],
@@ -35,84 +55,282 @@ PREDEFINED_RULES: Dict[str, List[str]] = {
 }
 
 # ==============================================================================
-# Core synonym generation logic (based on predefined rules only)
+# Union-Find over terms
+# ==============================================================================
+
+class UnionFind:
+    """Disjoint sets of terms (path halving + union by size): near-linear in terms + links"""
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+        self.size: Dict[str, int] = {}
+
+    def add(self, term: str) -> None:
+        if term not in self.parent:
+            self.parent[term] = term
+            self.size[term] = 1
+
+    def find(self, term: str) -> str:
+        parent = self.parent
+        while parent[term] != term:
+            parent[term] = parent[parent[term]]
+            term = parent[term]
+        return term
+
+    def union(self, a: str, b: str) -> str:
+        self.add(a)
+        self.add(b)
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+    def groups(self) -> Dict[str, List[str]]:
+        groups: Dict[str, List[str]] = {}
+        for term in self.parent:
+            groups.setdefault(self.find(term), []).append(term)
+        return groups
+
+
+def clean_term(term: str) -> str:
+    """Term as written to synonyms.txt: '_' joins words, apostrophes are dropped"""
+    return term.replace('_', ' ').replace("'", "")
+
+
+def curated_union_find(initial_rules: Dict[str, List[str]]) -> UnionFind:
+    """One set per predefined rule; rules sharing a term end up in the same set"""
+    uf = UnionFind()
+    for standard_word, synonyms in initial_rules.items():
+        uf.add(clean_term(standard_word))
+        for synonym in synonyms:
+            uf.union(clean_term(standard_word), clean_term(synonym))
+    return uf
+
+# ==============================================================================
+# Core synonym generation logic
 # ==============================================================================
 
-def generate_strict_synonyms(initial_rules: Dict[str, List[str]]) -> List[str]:
+def generate_strict_synonyms(initial_rules: Dict[str, List[str]],
+                             extra_pairs: Iterable[Tuple[str, str]] = ()) -> List[str]:
     """
-    Generate Solr-compatible multi-valued bidirectional synonym rules (A, B, C => A, B, C) based only on manually defined rules.
+    Generate Solr-compatible multi-valued bidirectional synonym rules (A, B, C => A, B, C)
+    from the manually defined rules, plus optional validated (term, term) links.
     """
-    print("\nStarting strict synonym generation (disabling WordNet expansion)...")
-    
-    synonym_network = {} 
-    
-    # 1. Initialize and integrate predefined rules (forced connection)
-    for standard_word, synonyms in initial_rules.items():
-        group = {standard_word} | set(synonyms)
-        for term in group:
-            if term not in synonym_network:
-                synonym_network[term] = set()
-            synonym_network[term].update(group)
-    
-    # 2. Calculate transitive closures and generate final rules (logic remains unchanged, but the data source is clean).
+    print("\nStarting strict synonym generation (union-find over the predefined rules)...")
+
+    uf = curated_union_find(initial_rules)
+    for a, b in extra_pairs:
+        uf.union(a, b)
+
     final_rules = []
-    processed_words_in_groups = set()
-    
-    for word in sorted(synonym_network.keys()):
-        if word in processed_words_in_groups:
-            continue
-        
-        current_group = set()
-        stack = [word]
-        
-        # Find all connected synonyms
-        while stack:
-            current = stack.pop()
-            if current not in current_group:
-                current_group.add(current)
-                if current in synonym_network:
-                    stack.extend(synonym_network[current] - current_group)
-        
-        if len(current_group) > 1:
-            # Ensure vocabulary is cleaned and sorted
-            clean_synonyms = sorted([s.replace('_', ' ').replace("'", "") for s in current_group if len(s) > 1])
-            
-            if len(clean_synonyms) > 1:
-                # Solr's recommended multi-valued bidirectional format: A, B, C => A, B, C
-                terms_string = ', '.join(clean_synonyms)
-                rule_string = f"{terms_string} => {terms_string}"
-                final_rules.append(rule_string)
-                
-                processed_words_in_groups.update(current_group) 
-
-
-    final_output = sorted(list(set(final_rules)))
-    
+    for group in uf.groups().values():
+        # Ensure vocabulary is cleaned, de-duplicated and sorted
+        clean_synonyms = sorted({term for term in group if len(term) > 1})
+        if len(clean_synonyms) > 1:
+            # Solr's recommended multi-valued bidirectional format: A, B, C => A, B, C
+            terms_string = ', '.join(clean_synonyms)
+            final_rules.append(f"{terms_string} => {terms_string}")
+
+    final_output = sorted(final_rules)
+
     print(f"✓ Final Solr-compatible synonym generation completed: {len(final_output)} rules created.")
     return final_output
 
+# ==============================================================================
+# Data-driven candidates (co-occurrence contexts in catch_all_text)
+# ==============================================================================
+
+def load_stopwords(filename: str = STOPWORDS_FILE) -> Set[str]:
+    """The stop words of the Solr analyzer, so mined terms match what gets indexed"""
+    words = set()
+    if os.path.exists(filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    words.add(line)
+    return words
+
+
+def tokenize(text: str, stop: Set[str], lemmatize: Optional[Callable[[str], str]] = None) -> List[str]:
+    text = str(text or '').lower().replace("'", '').replace('’', '')
+    tokens = [t for t in re.findall(r'[a-z0-9]+', text) if len(t) > 1 and not t.isdigit() and t not in stop]
+    return [lemmatize(t) for t in tokens] if lemmatize else tokens
+
+
+def mine_candidates(docs: List[dict], window: int = 2, min_df: int = 3, fan_out: int = 50,
+                    top_k: int = 10, lemmatize: Optional[Callable[[str], str]] = None
+                    ) -> Dict[str, List[Tuple[float, str]]]:
+    """
+    Terms used in similar contexts (second-order co-occurrence) are synonym candidates.
+    - Terms are the unigrams of catch_all_text found in >= min_df documents, plus the
+      bigrams that occur together in at least half the documents of their rarer word.
+    - A term's context vector holds the words within `window` tokens of it, weighted by PPMI.
+    - Pairs are only scored when they share a context, and each context only pairs its
+      `fan_out` strongest terms, so the work grows linearly with the vocabulary.
+    - With `lemmatize`, inflections share a term ("nuggets" -> "nugget").
+    Returns each term's `top_k` neighbours as (cosine similarity, term), most similar first.
+    """
+    stop = load_stopwords()
+    documents = [tokenize(doc.get('catch_all_text'), stop, lemmatize) for doc in docs]
+
+    df: Counter = Counter()
+    for tokens in documents:
+        df.update(set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:]) if a != b})
+    vocabulary = set()
+    for term, count in df.items():
+        if count < min_df:
+            continue
+        words = term.split()
+        if len(words) == 1 or count >= 0.5 * min(df[word] for word in words):
+            vocabulary.add(term)
+
+    # Context counts per occurrence (the words inside a bigram are not its context)
+    contexts: Dict[str, Counter] = {}
+    for tokens in documents:
+        for n in (1, 2):
+            for i in range(len(tokens) - n + 1):
+                term = ' '.join(tokens[i:i + n])
+                if term not in vocabulary:
+                    continue
+                counts = contexts.setdefault(term, Counter())
+                counts.update(tokens[max(0, i - window):i])
+                counts.update(tokens[i + n:i + n + window])
+
+    # PPMI weights
+    term_totals = {term: sum(counts.values()) for term, counts in contexts.items()}
+    context_totals: Counter = Counter()
+    for counts in contexts.values():
+        context_totals.update(counts)
+    total = sum(context_totals.values())
+    weights: Dict[str, Dict[str, float]] = {}
+    for term, counts in contexts.items():
+        vector = {}
+        for context, count in counts.items():
+            pmi = math.log(count * total / (term_totals[term] * context_totals[context]))
+            if pmi > 0:
+                vector[context] = pmi
+        weights[term] = vector
+    norms = {term: math.sqrt(sum(w * w for w in vector.values())) for term, vector in weights.items()}
+
+    # Blocking through an inverted index of contexts instead of comparing all pairs
+    postings: Dict[str, List[Tuple[str, float]]] = {}
+    for term, vector in weights.items():
+        for context, weight in vector.items():
+            postings.setdefault(context, []).append((term, weight))
+    dots: Dict[Tuple[str, str], float] = {}
+    for posting in postings.values():
+        posting = heapq.nlargest(fan_out, posting, key=lambda item: item[1])
+        for i, (a, weight_a) in enumerate(posting):
+            for b, weight_b in posting[i + 1:]:
+                pair = (a, b) if a < b else (b, a)
+                dots[pair] = dots.get(pair, 0.0) + weight_a * weight_b
+
+    neighbours: Dict[str, List[Tuple[float, str]]] = {}
+    for (a, b), dot in dots.items():
+        # "chicken" / "chicken burger" share contexts only because one contains the other
+        if set(a.split()) & set(b.split()):
+            continue
+        similarity = dot / (norms[a] * norms[b])
+        neighbours.setdefault(a, []).append((similarity, b))
+        neighbours.setdefault(b, []).append((similarity, a))
+    return {term: heapq.nlargest(top_k, pairs) for term, pairs in neighbours.items()}
+
+
+def validate_candidates(neighbours: Dict[str, List[Tuple[float, str]]], initial_rules: Dict[str, List[str]],
+                        min_similarity: float = 0.3) -> Tuple[dict, List[Tuple[str, str]]]:
+    """
+    Check the mined neighbours against the curated rules and pick the expansions to keep.
+    - Hold-out check: a curated term whose nearest curated neighbour is in its own rule
+      group counts as a hit (how often the mining agrees with the hand-written rules).
+    - A new term joins a curated group only through a curated term it is a mutual
+      neighbour of, with similarity >= min_similarity, and only if none of its curated
+      neighbours belongs to another group (cannot-link). Mined terms are never chained
+      to each other, so every expansion stays one step from a curated rule.
+    """
+    uf = curated_union_find(initial_rules)
+    curated_group = {term: uf.find(term) for term in list(uf.parent)}
+
+    stats = {'curated_terms': 0, 'curated_hits': 0, 'accepted': 0, 'rejected_conflict': 0}
+    for term in curated_group:
+        nearest = [other for _, other in neighbours.get(term, ()) if other in curated_group]
+        if nearest:
+            stats['curated_terms'] += 1
+            stats['curated_hits'] += curated_group[nearest[0]] == curated_group[term]
+    stats['hit_rate'] = round(stats['curated_hits'] / stats['curated_terms'], 3) if stats['curated_terms'] else None
+
+    accepted = []
+    for term, pairs in sorted(neighbours.items()):
+        if term in curated_group:
+            continue
+        groups = {curated_group[other] for _, other in pairs if other in curated_group}
+        if len(groups) > 1:
+            stats['rejected_conflict'] += 1
+            continue
+        for similarity, other in pairs:
+            if other in curated_group and similarity >= min_similarity \
+                    and term in {mutual for _, mutual in neighbours.get(other, ())}:
+                accepted.append((term, other))
+                stats['accepted'] += 1
+                break
+    return stats, accepted
+
 # ==============================================================================
 # 3. Main Function
 # ==============================================================================
 
 def main():
     """The main function generates synonyms and exports them to a file."""
+    parser = argparse.ArgumentParser(description="Generate synonyms.txt from the curated rules (and mined expansions)")
+    parser.add_argument('--input', default=DEFAULT_INPUT, help="Processed menu JSON with catch_all_text")
+    parser.add_argument('--output', default='synonyms.txt')
+    parser.add_argument('--mine', action='store_true',
+                        help="Also write corpus-mined terms that validate against the curated rules")
+    parser.add_argument('--report', action='store_true',
+                        help="Mine and print the validation report, but write the curated rules only")
+    parser.add_argument('--lemmatize', action='store_true',
+                        help="Merge inflections with the WordNet lemmatizer while mining (needs NLTK)")
+    parser.add_argument('--min-similarity', type=float, default=0.6, help="Context similarity of a mined pair")
+    parser.add_argument('--min-df', type=int, default=3, help="Documents a mined term must appear in")
+    args = parser.parse_args()
+
     print("Starting: Data-driven Solr Synonym Generation (V3.0 - Strict Domain Only)...")
-    
-    final_rules = generate_strict_synonyms(PREDEFINED_RULES)
-    
-    output_filename = 'synonyms.txt'
-    with open(output_filename, 'w', encoding='utf-8') as f:
+
+    # Strict mode reads nothing but the predefined rules
+    accepted: List[Tuple[str, str]] = []
+    if args.mine or args.report or args.lemmatize:
+        lemmatize = get_lemmatizer() if args.lemmatize else None
+        with open(args.input, 'r', encoding='utf-8') as f:
+            docs = json.load(f)
+        neighbours = mine_candidates(docs, min_df=args.min_df, lemmatize=lemmatize)
+        stats, accepted = validate_candidates(neighbours, PREDEFINED_RULES, args.min_similarity)
+        print(f"Mined context neighbours for {len(neighbours)} terms from {len(docs)} documents")
+        print(f"✓ Agreement with the curated rules: {stats['curated_hits']}/{stats['curated_terms']} curated terms "
+              f"(hit rate {stats['hit_rate']}) have their nearest curated neighbour in their own group")
+        print(f"✓ {stats['accepted']} expansions validated, {stats['rejected_conflict']} terms rejected "
+              f"for being close to two curated groups")
+        for term, other in accepted:
+            print(f"  {term} ~ {other}")
+
+    final_rules = generate_strict_synonyms(PREDEFINED_RULES, accepted if args.mine else ())
+
+    with open(args.output, 'w', encoding='utf-8') as f:
         f.write("# Fast Food Domain Synonyms - FINAL Solr-Compatible Mapping (V3.0)\n")
         f.write("# NOTE: WordNet semantic expansion has been removed to prevent noise.\n")
-        f.write("# This file only contains manually defined domain synonyms (e.g., burger <-> hamburger).\n\n")
-        
+        if args.mine:
+            f.write("# Manually defined domain synonyms plus corpus-mined terms validated against them.\n\n")
+        else:
+            f.write("# This file only contains manually defined domain synonyms (e.g., burger <-> hamburger).\n\n")
+
         for rule in final_rules:
             f.write(rule + '\n')
-    
+
     total_rules = len(final_rules)
-    print(f"\n✓ Final synonym file generation completed: {output_filename}")
+    print(f"\n✓ Final synonym file generation completed: {args.output}")
     print(f"✓ Total rule count: {total_rules}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,264 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+# ==========================================
+# Content-Hash Stage Runner
+# Each stage declares its command, inputs and outputs. A stage's key hashes
+# the command, the code it runs (the script and the sibling modules it
+# imports) and its input files; when the key is unchanged and the outputs
+# are still the ones it produced, the stage is skipped. Outputs are stored
+# by content, so returning to an earlier key restores them without a rerun.
+# Byte-identical outputs leave downstream keys unchanged (early cut-off).
+# ==========================================
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CRAWLER_DIR = os.path.join(ROOT, '1.1_Crawler_Scripts')
+RAW_DATA_DIR = os.path.join(ROOT, '1.2_Raw_Data')
+SCRIPTS_DIR = os.path.join(ROOT, '1.3_Preprocessing_Scripts')
+PROCESSED_DATA_DIR = os.path.join(ROOT, '1.4_Processed_Data')
+SYNONYMS_DIR = os.path.join(ROOT, '1.5_synonyms_generation')
+SOLR_CONF_DIR = os.path.join(ROOT, '..', '2_Solr_Configuration', 'fastfood_menu', 'conf')
+BUILD_DIR = os.path.join(ROOT, '.build')
+
+RAW_FILES = [os.path.join(RAW_DATA_DIR, name) for name in
+             ('mcdonalds_products_data.json', 'kfc_menu_mapped.json', 'wendys_menu_mapped.json')]
+MENU_FINAL = os.path.join(BUILD_DIR, 'fast_food_menu_final.json')
+MENU_V3 = os.path.join(PROCESSED_DATA_DIR, 'fast_food_menu_for_solr_V3.json')
+MENU_SNAPSHOT = os.path.join(PROCESSED_DATA_DIR, 'fast_food_menu_for_solr_V3.snapshot')
+SYNONYMS = os.path.join(SYNONYMS_DIR, 'synonyms.txt')
+
+
+class Stage:
+    """
+    One build step: `command` runs with `python` in the directory of its
+    script. `manual` stages (the crawl, whose real input is the websites)
+    only run when named on the command line, and then always run.
+    """
+    def __init__(self, name, command, inputs=(), outputs=(), manual=False):
+        self.name = name
+        self.command = command
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.manual = manual
+
+    @property
+    def script(self):
+        return self.command[0]
+
+
+STAGES = [
+    Stage('crawl', [os.path.join(CRAWLER_DIR, 'run_all_scrapers.py'), '--delta-dir', RAW_DATA_DIR,
+                    '--output-dir', RAW_DATA_DIR],
+          outputs=RAW_FILES, manual=True),
+    Stage('process', [os.path.join(SCRIPTS_DIR, 'data_processing_en.py'), '--raw-dir', RAW_DATA_DIR,
+                      '--output', MENU_FINAL],
+          inputs=RAW_FILES, outputs=[MENU_FINAL]),
+    Stage('search_fields', [os.path.join(SCRIPTS_DIR, 'data_processing02_en.py'), '--input', MENU_FINAL,
+                            '--output', MENU_V3],
+          inputs=[MENU_FINAL], outputs=[MENU_V3, MENU_SNAPSHOT]),
+    Stage('facet_cube', [os.path.join(SCRIPTS_DIR, 'facet_cube.py'), '--input', MENU_SNAPSHOT,
+                         '--output', os.path.join(PROCESSED_DATA_DIR, 'facet_cube.json')],
+          inputs=[MENU_SNAPSHOT], outputs=[os.path.join(PROCESSED_DATA_DIR, 'facet_cube.json')]),
+    # Strict mode only reads PREDEFINED_RULES: a menu change does not rebuild it, a rule change rebuilds only this
+    Stage('synonyms', [os.path.join(SYNONYMS_DIR, 'filter_wordnet.py'), '--output', SYNONYMS],
+          outputs=[SYNONYMS]),
+    Stage('solr_synonyms', [os.path.join(ROOT, 'build_pipeline.py'), '--copy', SYNONYMS,
+                            os.path.join(SOLR_CONF_DIR, 'synonyms.txt')],
+          inputs=[SYNONYMS], outputs=[os.path.join(SOLR_CONF_DIR, 'synonyms.txt')]),
+]
+
+
+_hashes = {}  # (path, size, mtime) -> sha256, so each file is read once per run
+
+
+def file_hash(path):
+    """sha256 of a file's content"""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _hashes.get(memo_key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        digest = _hashes[memo_key] = sha.hexdigest()
+    return digest
+
+
+def output_mtimes(paths):
+    return {path: os.stat(path).st_mtime_ns if os.path.exists(path) else None for path in paths}
+
+
+def code_files(script, shared_dirs=(CRAWLER_DIR,)):
+    """The script plus the sibling modules it imports, transitively (also shared modules such as nutrient_parsing)"""
+    directories = [os.path.dirname(script)] + [path for path in shared_dirs if path != os.path.dirname(script)]
+    seen = []
+    pending = [script]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.append(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            names = ([alias.name for alias in node.names] if isinstance(node, ast.Import) else
+                     [node.module] if isinstance(node, ast.ImportFrom) and node.module and not node.level else [])
+            for name in names:
+                for directory in directories:
+                    module = os.path.join(directory, name.split('.')[0] + '.py')
+                    if os.path.exists(module):
+                        pending.append(module)
+                        break
+    return sorted(seen)
+
+
+def stage_key(stage):
+    sha = hashlib.sha256()
+    sha.update(json.dumps([stage.name, [os.path.relpath(arg, ROOT) if os.path.isabs(arg) else arg
+                                        for arg in stage.command]]).encode('utf-8'))
+    for path in code_files(stage.script) + stage.inputs:
+        sha.update(os.path.relpath(path, ROOT).encode('utf-8'))
+        sha.update(file_hash(path).encode('ascii'))
+    return sha.hexdigest()
+
+
+class BuildCache:
+    """State of the last build per stage, plus a content-addressed store of stage outputs"""
+    def __init__(self, directory=BUILD_DIR):
+        self.directory = directory
+        self.state_file = os.path.join(directory, 'state.json')
+        self.objects = os.path.join(directory, 'objects')
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        except FileNotFoundError:
+            self.state = {'stages': {}, 'keys': {}}
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        temp = self.state_file + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(temp, self.state_file)
+
+    @staticmethod
+    def _current(outputs):
+        return {os.path.relpath(path, ROOT): file_hash(path) if os.path.exists(path) else None for path in outputs}
+
+    def up_to_date(self, stage, key):
+        """Same key as the last build and the outputs it wrote are untouched"""
+        last = self.state['stages'].get(stage.name)
+        return last is not None and last['key'] == key and last['outputs'] == self._current(stage.outputs)
+
+    def restore(self, stage, key):
+        """Outputs of an earlier build with this key, copied back from the store"""
+        stored = self.state['keys'].get(f"{stage.name}:{key}")
+        if stored is None or not all(os.path.exists(os.path.join(self.objects, digest)) for digest in stored.values()):
+            return False
+        for path, digest in stored.items():
+            target = os.path.join(ROOT, path)
+            if self._current([target])[path] != digest:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(os.path.join(self.objects, digest), target)
+        self.record(stage, key)
+        return True
+
+    def record(self, stage, key, before=None):
+        """`before`: output mtimes taken before the stage ran; outputs it did not rewrite are an error"""
+        outputs = self._current(stage.outputs)
+        missing = [path for path, digest in outputs.items() if digest is None]
+        if missing:
+            raise RuntimeError(f"stage {stage.name} did not produce {', '.join(missing)}")
+        if before is not None:
+            unchanged = [os.path.relpath(path, ROOT) for path, mtime in output_mtimes(stage.outputs).items()
+                         if mtime == before[path]]
+            if unchanged:
+                raise RuntimeError(f"stage {stage.name} did not rewrite {', '.join(unchanged)}")
+        os.makedirs(self.objects, exist_ok=True)
+        for path, digest in outputs.items():
+            stored = os.path.join(self.objects, digest)
+            if not os.path.exists(stored):
+                shutil.copyfile(os.path.join(ROOT, path), stored)
+        self.state['stages'][stage.name] = {'key': key, 'outputs': outputs}
+        self.state['keys'][f"{stage.name}:{key}"] = outputs
+        self.save()
+
+
+def run_stage(stage):
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    result = subprocess.run([sys.executable] + stage.command, cwd=os.path.dirname(stage.script),
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.stdout.write(result.stdout)
+        sys.stderr.write(result.stderr)
+        raise RuntimeError(f"stage {stage.name} failed (exit code {result.returncode})")
+
+
+def build(names=None, force=False, dry_run=False, cache=None):
+    """Run the stages in order; returns {stage name: 'skipped' | 'restored' | 'ran' | 'stale'}"""
+    cache = cache or BuildCache()
+    selected = [stage for stage in STAGES if (stage.name in names if names else not stage.manual)]
+    results = {}
+    for stage in selected:
+        started = time.perf_counter()
+        missing = [path for path in stage.inputs if not os.path.exists(path)]
+        if missing:
+            raise RuntimeError(f"stage {stage.name} is missing inputs: {', '.join(missing)}")
+        key = stage_key(stage)
+        if not (force or stage.manual) and cache.up_to_date(stage, key):
+            status = 'skipped'
+        elif dry_run:
+            status = 'stale'
+        elif not (force or stage.manual) and cache.restore(stage, key):
+            status = 'restored'
+        else:
+            # A manual stage always runs; its outputs must be fresh, not left over from the last run
+            before = output_mtimes(stage.outputs) if stage.manual else None
+            run_stage(stage)
+            cache.record(stage, key, before)
+            status = 'ran'
+        results[stage.name] = status
+        print(f"  {stage.name:<14} {status:<9} {(time.perf_counter() - started) * 1000:8.0f} ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the data pipeline stages whose code or inputs changed")
+    parser.add_argument('stages', nargs='*', help=f"Stages to run (default: all but crawl): "
+                                                  f"{', '.join(stage.name for stage in STAGES)}")
+    parser.add_argument('--force', action='store_true', help="Run the selected stages even if up to date")
+    parser.add_argument('--dry-run', action='store_true', help="Only report which stages are stale")
+    parser.add_argument('--clean', action='store_true', help="Forget all build state and stored outputs")
+    parser.add_argument('--copy', nargs=2, metavar=('SRC', 'DST'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.copy:
+        shutil.copyfile(*args.copy)
+        return
+    if args.clean:
+        shutil.rmtree(BUILD_DIR, ignore_errors=True)
+        print(f"Removed {BUILD_DIR}")
+        return
+    unknown = set(args.stages) - {stage.name for stage in STAGES}
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    print("Building data pipeline stages...")
+    try:
+        results = build(args.stages, args.force, args.dry_run)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    ran = sum(status in ('ran', 'restored') for status in results.values())
+    print(f"✓ {ran} of {len(results)} stages rebuilt")
+
+if __name__ == "__main__":
+    main()
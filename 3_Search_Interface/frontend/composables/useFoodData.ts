@@ -72,6 +72,16 @@ export interface RangeFilters {
   calories: { min: number; max: number }
 }
 
+// Fields needed by the result list (ProductCard); the large ingredient fields
+// are loaded per product on the detail page (see loadProductDetails)
+const LIST_FIELDS = [
+  'id', 'product_name', 'brand', 'category_main', 'category_sub', 'description', 'image_url',
+  'calories_kcal', 'protein_g', 'fat_g', 'carbs_g', 'sugar_g', 'salt_g', 'likes', 'dislikes'
+]
+
+// Results are fetched a page at a time (same size as the search gateway's default page)
+const PAGE_SIZE = 24
+
 // Normalize food data - Convert from Solr data structure
 function normalizeFoodItem(item: any): NormalizedFoodItem {
   // Helper function: Safely extract array or single value
@@ -144,9 +154,79 @@ export const useFoodData = () => {
     fat: 100,
     calories: 2000
   }))
+  // Lower ends of the range sliders (the upper ends are the filters above)
+  const currentMinimums = useState<Record<string, number>>('current-minimums', () => ({ salt: 0, fat: 0, calories: 0 }))
+  // Paging state of the current search: cursorMark of the next page, total hits
+  const nextCursor = useState<string>('food-next-cursor', () => '*')
+  const hasMoreResults = useState<boolean>('food-has-more', () => false)
+  const totalResults = useState<number>('food-total', () => 0)
+  const isLoadingMore = useState<boolean>('food-loading-more', () => false)
+  // Sliders search on every move: only the newest search may fill the cache
+  const searchSequence = useState<number>('food-search-sequence', () => 0)
+
+  // One page of the current search, starting at `cursor`
+  const fetchPage = async (cursor: string) => {
+    const params = new URLSearchParams({
+      q: currentSearchQuery.value || '*:*',
+      wt: 'json',
+      rows: String(PAGE_SIZE),
+      fl: LIST_FIELDS.join(','),
+      // cursorMark needs the uniqueKey as tie-break; it also keeps pages stable while likes change scores
+      sort: 'score desc,id asc',
+      cursorMark: cursor
+    })
+
+    // Use saved filters
+    if (currentFilters.value.calories) {
+      params.append('fq', `calories_kcal:[${currentMinimums.value.calories || 0} TO ${currentFilters.value.calories}]`)
+    }
+    if (currentFilters.value.fat) {
+      params.append('fq', `fat_g:[${currentMinimums.value.fat || 0} TO ${currentFilters.value.fat}]`)
+    }
+    if (currentFilters.value.salt) {
+      params.append('fq', `salt_g:[${currentMinimums.value.salt || 0} TO ${currentFilters.value.salt}]`)
+    }
+    // Add company filter condition
+    if (currentFilters.value.company && currentFilters.value.company !== 'All') {
+      params.append('fq', `brand:"${currentFilters.value.company}"`)
+    }
+    
+    // Add category filter condition
+    if (currentFilters.value.category && currentFilters.value.category !== 'All') {
+      if (currentFilters.value.category.includes(' > ')) {
+        // Format: 'Main Category > Subcategory'
+        const [mainCat, subCat] = currentFilters.value.category.split(' > ')
+        params.append('fq', `category_main:"${mainCat}" AND category_sub:"${subCat}"`)
+      } else {
+        // Format: 'Main Category'
+        params.append('fq', `category_main:"${currentFilters.value.category}"`)
+      }
+    }
+
+    console.log('Solr Request Parameters:', params.toString())
+
+    const response = await fetch(`/solr/solr/fastfood_menu/fastfood_search?${params}`)
+
+    if (!response.ok) {
+      throw new Error(`Solr request failed: ${response.status}`)
+    }
 
-  // Function to fetch data from Solr
-  const fetchFoodData = async (searchQuery: string = '', filters: Filters = {} as Filters): Promise<NormalizedFoodItem[]> => {
+    const data = await response.json()
+    const solrItems = data.response?.docs || []
+    return {
+      items: solrItems.map((item: any) => normalizeFoodItem(item)) as NormalizedFoodItem[],
+      numFound: data.response?.numFound || 0,
+      nextCursor: data.nextCursorMark || cursor
+    }
+  }
+
+  // Function to fetch the first page of a search from Solr
+  const fetchFoodData = async (
+    searchQuery: string = '',
+    filters: Filters = {} as Filters,
+    rangeFilters?: RangeFilters
+  ): Promise<NormalizedFoodItem[]> => {
+    const sequence = ++searchSequence.value
     try {
       isLoading.value = true
       
@@ -157,63 +237,73 @@ export const useFoodData = () => {
       if (Object.keys(filters).length > 0) {
         currentFilters.value = { ...currentFilters.value, ...filters }
       }
-      
-      const params = new URLSearchParams({
-        q: currentSearchQuery.value || '*:*',
-        wt: 'json',
-        rows: '500'
-      })
-
-      // Use saved filters
-      if (currentFilters.value.calories) {
-        params.append('fq', `calories_kcal:[0 TO ${currentFilters.value.calories}]`)
-      }
-      if (currentFilters.value.fat) {
-        params.append('fq', `fat_g:[0 TO ${currentFilters.value.fat}]`)
-      }
-      if (currentFilters.value.salt) {
-        params.append('fq', `salt_g:[0 TO ${currentFilters.value.salt}]`)
-      }
-      // Add company filter condition
-      if (currentFilters.value.company && currentFilters.value.company !== 'All') {
-        params.append('fq', `brand:"${currentFilters.value.company}"`)
-      }
-      
-      // Add category filter condition
-      if (currentFilters.value.category && currentFilters.value.category !== 'All') {
-        if (currentFilters.value.category.includes(' > ')) {
-          // Format: 'Main Category > Subcategory'
-          const [mainCat, subCat] = currentFilters.value.category.split(' > ')
-          params.append('fq', `category_main:"${mainCat}" AND category_sub:"${subCat}"`)
-        } else {
-          // Format: 'Main Category'
-          params.append('fq', `category_main:"${currentFilters.value.category}"`)
+      if (rangeFilters) {
+        currentMinimums.value = {
+          salt: rangeFilters.salt.min,
+          fat: rangeFilters.fat.min,
+          calories: rangeFilters.calories.min
         }
       }
 
-      console.log('Solr Request Parameters:', params.toString())
-
-      const response = await fetch(`/solr/solr/fastfood_menu/fastfood_search?${params}`)
-      
-      if (!response.ok) {
-        throw new Error(`Solr request failed: ${response.status}`)
+      const page = await fetchPage('*')
+      if (sequence !== searchSequence.value) {
+        return foodItemsCache.value
       }
-
-      const data = await response.json()
-      console.log('Solr Response Data:', data)
-      
-      const solrItems = data.response?.docs || []
-      const normalizedData = solrItems.map((item: any) => normalizeFoodItem(item))
-      
-      foodItemsCache.value = normalizedData
-      return normalizedData
+      foodItemsCache.value = page.items
+      totalResults.value = page.numFound
+      nextCursor.value = page.nextCursor
+      // Solr returns the same cursor once the results are exhausted
+      hasMoreResults.value = page.nextCursor !== '*' && page.items.length < page.numFound
+      return page.items
 
     } catch (error) {
       console.error('Search error:', error)
-      foodItemsCache.value = []
+      if (sequence === searchSequence.value) {
+        foodItemsCache.value = []
+        totalResults.value = 0
+        hasMoreResults.value = false
+      }
       return []
     } finally {
-      isLoading.value = false
+      if (sequence === searchSequence.value) {
+        isLoading.value = false
+      }
+    }
+  }
+
+  // Append the next page of the current search
+  const loadMoreFoodData = async (): Promise<NormalizedFoodItem[]> => {
+    if (!hasMoreResults.value || isLoadingMore.value) {
+      return []
+    }
+    const sequence = searchSequence.value
+    const cursor = nextCursor.value
+    try {
+      isLoadingMore.value = true
+      const page = await fetchPage(cursor)
+      if (sequence !== searchSequence.value) {
+        return []
+      }
+      // A product whose score changed between pages is not shown twice
+      const shown = new Set(foodItemsCache.value.map(item => item.product_id))
+      foodItemsCache.value = [...foodItemsCache.value, ...page.items.filter(item => !shown.has(item.product_id))]
+      nextCursor.value = page.nextCursor
+      totalResults.value = page.numFound
+      hasMoreResults.value = page.nextCursor !== cursor && foodItemsCache.value.length < page.numFound
+      return page.items
+    } catch (error) {
+      console.error('Load more error:', error)
+      return []
+    } finally {
+      isLoadingMore.value = false
+    }
+  }
+
+  // Increment a like/dislike counter of a cached result in place
+  const bumpFeedbackCount = (productId: string, field: 'likes' | 'dislikes') => {
+    const item = foodItemsCache.value.find(food => food.product_id === productId)
+    if (item) {
+      item[field] += 1
     }
   }
 
@@ -238,8 +328,9 @@ export const useFoodData = () => {
       const result = await response.json()
       
       if (result.success) {
-        // Re-fetch data using the saved search state
-        await fetchFoodData(currentSearchQuery.value, currentFilters.value)
+        // Count the click locally: the update becomes searchable after Solr's commitWithin,
+        // so re-fetching right away would still return the old value
+        bumpFeedbackCount(productId, 'likes')
         return { success: true }
       } else {
         throw new Error('Like action failed')
@@ -272,8 +363,9 @@ export const useFoodData = () => {
       const result = await response.json()
       
       if (result.success) {
-        // Re-fetch data using the saved search state
-        await fetchFoodData(currentSearchQuery.value, currentFilters.value)
+        // Count the click locally: the update becomes searchable after Solr's commitWithin,
+        // so re-fetching right away would still return the old value
+        bumpFeedbackCount(productId, 'dislikes')
         return { success: true }
       } else {
         throw new Error('Dislike action failed')
@@ -332,6 +424,32 @@ export const useFoodData = () => {
     return allFoodItems.value.find(item => item.product_id === id)
   }
 
+  // Load the full product (ingredients, URL) for the detail page and merge it into the cache
+  const productDetails = useState<Record<string, NormalizedFoodItem>>('product-details', () => ({}))
+  const loadProductDetails = async (productId: string): Promise<NormalizedFoodItem | undefined> => {
+    if (productDetails.value[productId]) {
+      return productDetails.value[productId]
+    }
+    try {
+      const response = await fetch(`/api/product/${encodeURIComponent(productId)}`)
+      if (!response.ok) {
+        throw new Error(`Product request failed: ${response.status}`)
+      }
+      const doc = await response.json()
+      const details = normalizeFoodItem(doc)
+      productDetails.value = { ...productDetails.value, [productId]: details }
+      const item = foodItemsCache.value.find(food => food.product_id === productId)
+      if (item) {
+        // Keep the counters of the cached result, which may include local clicks
+        Object.assign(item, { ...details, likes: item.likes, dislikes: item.dislikes })
+      }
+      return details
+    } catch (error) {
+      console.error('Error loading product details:', error)
+      return undefined
+    }
+  }
+
   // Filter food data
   const filterFoods = (
     items: NormalizedFoodItem[],
@@ -385,8 +503,13 @@ export const useFoodData = () => {
     categories,
     categoryStructure,
     getFoodById,
+    loadProductDetails,
     filterFoods,
     fetchFoodData,
+    loadMoreFoodData,
+    totalResults: readonly(totalResults),
+    hasMoreResults: readonly(hasMoreResults),
+    isLoadingMore: readonly(isLoadingMore),
     likeProduct,
     dislikeProduct,
     isProductLiked,
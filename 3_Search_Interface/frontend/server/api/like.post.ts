@@ -10,17 +10,27 @@ export default defineEventHandler(async (event) => {
   }
 
   try {
-    // Update the likes field in Solr - only supports increment
-    const updateResponse = await $fetch('http://localhost:8983/solr/fastfood_menu/update?commit=true', {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json'
-      },
-      body: JSON.stringify([{
-        id: productId,
-        likes: { inc: 1 } // Only supports increment
-      }])
-    });
+    const feedbackService = process.env.FEEDBACK_SERVICE_URL;
+    if (feedbackService) {
+      // Buffered by the feedback aggregator, which flushes merged increments to Solr in batches
+      await $fetch(`${feedbackService}/like`, {
+        method: 'POST',
+        body: { productId }
+      });
+    } else {
+      // Update the likes field in Solr - only supports increment
+      // commitWithin instead of commit=true: no hard commit / new searcher per click
+      await $fetch('http://localhost:8983/solr/fastfood_menu/update?commitWithin=5000', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json'
+        },
+        body: JSON.stringify([{
+          id: productId,
+          likes: { inc: 1 } // Only supports increment
+        }])
+      });
+    }
 
     return { 
       success: true, 
@@ -0,0 +1,55 @@
+// Product details for pages/product/[id].vue, including the large ingredient
+// fields that the search results no longer carry
+const DETAIL_FIELDS = [
+  'id', 'product_name', 'brand', 'category_main', 'category_sub', 'description', 'image_url',
+  'calories_kcal', 'protein_g', 'fat_g', 'carbs_g', 'sugar_g', 'salt_g', 'likes', 'dislikes',
+  'url', 'original_category', 'ingredients_text', 'components_list'
+];
+
+export default defineEventHandler(async (event) => {
+  const productId = getRouterParam(event, 'id');
+
+  if (!productId) {
+    throw createError({
+      statusCode: 400,
+      statusMessage: 'Product ID is required'
+    });
+  }
+
+  let doc: any = null;
+  try {
+    const searchGateway = process.env.SEARCH_GATEWAY_URL;
+    if (searchGateway) {
+      doc = await $fetch(`${searchGateway}/product/${encodeURIComponent(productId)}`, {
+        params: { ingredients: 'true' },
+        ignoreResponseError: true
+      });
+      if (doc?.error) doc = null;
+    } else {
+      const solrResponse: any = await $fetch('http://localhost:8983/solr/fastfood_menu/select', {
+        method: 'GET',
+        params: {
+          q: `id:"${productId.replace(/["\\]/g, '\\$&')}"`,
+          fl: DETAIL_FIELDS.join(','),
+          rows: 1,
+          wt: 'json'
+        }
+      });
+      doc = solrResponse.response?.docs?.[0] || null;
+    }
+  } catch (error) {
+    console.error('Solr product lookup error:', error);
+    throw createError({
+      statusCode: 500,
+      statusMessage: 'Product lookup failed'
+    });
+  }
+
+  if (!doc) {
+    throw createError({
+      statusCode: 404,
+      statusMessage: 'Product not found'
+    });
+  }
+  return doc;
+});
@@ -1,16 +1,57 @@
+// One page of results per call, as in the search gateway (DEFAULT_ROWS / MAX_ROWS)
+const DEFAULT_ROWS = 24;
+const MAX_ROWS = 200;
+
+// Returns { items, numFound, nextCursor, done }; pass nextCursor back as `cursor` for the next page
 export default defineEventHandler(async (event) => {
   const body = await readBody(event);
-  const { query = '', filters = {} } = body;
+  // filters: { category, company, salt, fat, calories } plus optional salt_min / fat_min / calories_min
+  const { query = '', filters = {}, cursor = '*' } = body;
+  const rows = Math.max(1, Math.min(Number(body.rows) || DEFAULT_ROWS, MAX_ROWS));
 
   try {
+    const searchGateway = process.env.SEARCH_GATEWAY_URL;
+    if (searchGateway) {
+      // Through the gateway: pooled Solr connections, identical concurrent searches share one request
+      const page: any = await $fetch(`${searchGateway}/search`, {
+        params: {
+          q: query,
+          category: filters.category,
+          company: filters.company,
+          salt: filters.salt,
+          fat: filters.fat,
+          calories: filters.calories,
+          // Slider minimums ([min TO max], as in useFoodData)
+          salt_min: filters.salt_min,
+          fat_min: filters.fat_min,
+          calories_min: filters.calories_min,
+          cursor,
+          rows
+        }
+      });
+      return {
+        items: normalizeSolrResponse({ response: { docs: page.docs } }),
+        numFound: page.numFound,
+        nextCursor: page.nextCursor,
+        done: page.done
+      };
+    }
+
     // Solr Query Logic
-    const solrQuery = buildSolrQuery(query, filters);
-    const solrResponse = await $fetch('http://localhost:8983/solr/food/select', {
+    const solrQuery = buildSolrQuery(query, filters, cursor, rows);
+    const solrResponse: any = await $fetch('http://localhost:8983/solr/food/select', {
       method: 'GET',
       params: solrQuery
     });
 
-    return normalizeSolrResponse(solrResponse);
+    const nextCursor = solrResponse.nextCursorMark || cursor;
+    return {
+      items: normalizeSolrResponse(solrResponse),
+      numFound: solrResponse.response?.numFound || 0,
+      nextCursor,
+      // Solr returns the same cursor once the results are exhausted
+      done: nextCursor === cursor
+    };
   } catch (error) {
     console.error('Solr search error:', error);
     throw createError({
@@ -20,11 +61,16 @@ export default defineEventHandler(async (event) => {
   }
 });
 
-function buildSolrQuery(query: string, filters: any) {
+function buildSolrQuery(query: string, filters: any, cursor: string, rows: number) {
   const params: any = {
     q: query || '*:*',
     wt: 'json',
-    rows: 1000
+    rows,
+    // cursorMark needs the uniqueKey as tie-break (same sort as the gateway)
+    sort: 'score desc,id asc',
+    cursorMark: cursor,
+    // The gateway's LIST_FIELDS: url, ingredients_text and components_list are loaded by /api/product/[id]
+    fl: 'id,product_name,brand,category_main,category_sub,description,image_url,calories_kcal,protein_g,fat_g,carbs_g,sugar_g,salt_g,likes,dislikes'
   };
 
   // Add filter conditions
@@ -44,15 +90,15 @@ function buildSolrQuery(query: string, filters: any) {
   }
   
   if (filters.salt) {
-    fq.push(`salt_g:[0 TO ${filters.salt}]`);
+    fq.push(`salt_g:[${filters.salt_min || 0} TO ${filters.salt}]`);
   }
   
   if (filters.fat) {
-    fq.push(`fat_g:[0 TO ${filters.fat}]`);
+    fq.push(`fat_g:[${filters.fat_min || 0} TO ${filters.fat}]`);
   }
   
   if (filters.calories) {
-    fq.push(`calories_kcal:[0 TO ${filters.calories}]`);
+    fq.push(`calories_kcal:[${filters.calories_min || 0} TO ${filters.calories}]`);
   }
 
   if (fq.length > 0) {
@@ -97,7 +143,6 @@ function normalizeSolrResponse(solrResponse: any) {
       allergens_may_contain: [],
       allergy_advice: '',
       preparation_notes: ''
-    },
-    url: doc.url
+    }
   }));
 }
\ No newline at end of file
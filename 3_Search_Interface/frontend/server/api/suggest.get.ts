@@ -0,0 +1,21 @@
+// Suggest-as-you-type: completions come from the search gateway's in-memory
+// index (product names, categories, synonyms), so typing never queries Solr
+export default defineEventHandler(async (event) => {
+  const { q = '', k = 8 } = getQuery(event);
+  const searchGateway = process.env.SEARCH_GATEWAY_URL;
+
+  if (!searchGateway || !String(q).trim()) {
+    return { suggestions: [] };
+  }
+
+  try {
+    return await $fetch(`${searchGateway}/suggest`, {
+      params: { q, k },
+      // Suggestions are optional: a slow answer is dropped instead of holding up typing
+      timeout: 500
+    });
+  } catch (error) {
+    console.error('Suggest error:', error);
+    return { suggestions: [] };
+  }
+});
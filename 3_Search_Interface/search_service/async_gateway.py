@@ -0,0 +1,231 @@
+import argparse
+import asyncio
+import json
+import aiohttp
+from aiohttp import web
+from autocomplete import Autocomplete
+from query_cache import QueryCache
+from search_gateway import (DEFAULT_ROWS, DETAIL_FIELDS, INGREDIENT_FIELDS, SEARCH_HANDLER,
+                            lookup_params, search_key, search_page, search_params)
+from solr_client import DEFAULT_CORE, DEFAULT_SOLR_URL, SolrError
+
+DEFAULT_DEADLINE = 2.0    # seconds a caller waits unless it asks for less
+UPSTREAM_TIMEOUT = 10.0   # a shared upstream request is not tied to any one caller's deadline
+
+
+class DeadlineExceeded(Exception):
+    """The answer did not arrive within the request's deadline"""
+
+
+def query_pairs(params):
+    """Solr params (list values = repeated keys, e.g. fq) as (key, str) pairs for aiohttp"""
+    return [(key, str(value)) for key, values in params.items()
+            for value in (values if isinstance(values, list) else [values])]
+
+
+class AsyncSearchGateway:
+    """
+    asyncio counterpart of SearchGateway for the Nuxt server routes.
+    One aiohttp session keeps a pool of keep-alive connections to Solr.
+    Identical requests that arrive while the first is still in flight wait for
+    that upstream call instead of sending their own (single-flight); every
+    caller only waits until its own deadline, while the shared call runs on.
+    """
+    def __init__(self, base_url=DEFAULT_SOLR_URL, core=DEFAULT_CORE, handler=SEARCH_HANDLER,
+                 pool_size=32, deadline=DEFAULT_DEADLINE, cache=None, autocomplete=None):
+        self.base_url = base_url.rstrip('/')
+        self.core = core
+        self.handler = handler
+        self.pool_size = pool_size
+        self.deadline = deadline
+        self.cache = cache
+        self.autocomplete = autocomplete
+        self.session = None
+        self.inflight = {}
+        self.stats = {'requests': 0, 'upstream': 0, 'coalesced': 0, 'deadline_exceeded': 0, 'upstream_errors': 0}
+
+    async def start(self):
+        connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(connector=connector,
+                                             timeout=aiohttp.ClientTimeout(total=UPSTREAM_TIMEOUT))
+        return self
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+    # --- I. Upstream ---
+    async def _select(self, params, handler='select'):
+        url = f"{self.base_url}/{self.core}/{handler}"
+        self.stats['upstream'] += 1
+        try:
+            async with self.session.get(url, params=query_pairs(params)) as response:
+                if response.status != 200:
+                    raise SolrError(f"GET {url} failed: HTTP {response.status}")
+                return await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise SolrError(f"GET {url} failed: {e!r}") from e
+
+    # --- II. Single-Flight with Deadlines ---
+    async def _load(self, key, load, epoch):
+        try:
+            value = await load()
+            if self.cache is not None:
+                self.cache.put(key, value, epoch)
+            return value
+        except SolrError:
+            self.stats['upstream_errors'] += 1
+            raise
+        finally:
+            del self.inflight[key]
+
+    async def _shared(self, key, load, timeout=None):
+        """Result for `key`: from the cache, an identical in-flight call, or a new upstream call"""
+        self.stats['requests'] += 1
+        if self.cache is not None:
+            value = self.cache.get(key)
+            if value is not None:
+                return value
+        task = self.inflight.get(key)
+        if task is None:
+            epoch = self.cache.epoch if self.cache is not None else None
+            task = self.inflight[key] = asyncio.ensure_future(self._load(key, load, epoch))
+            # Nobody may be waiting any more when it fails; mark the error as seen
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        else:
+            self.stats['coalesced'] += 1
+        timeout = self.deadline if timeout is None else min(timeout, self.deadline)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            self.stats['deadline_exceeded'] += 1
+            raise DeadlineExceeded(f"no answer within {timeout:.3f}s") from None
+
+    async def search(self, query='', filters=None, cursor='*', rows=DEFAULT_ROWS, timeout=None):
+        filters, rows, key = search_key(query, filters, cursor, rows)
+        params = search_params(query, filters, cursor, rows)
+
+        async def load():
+            return search_page(await self._select(params, self.handler), params['cursorMark'])
+        return await self._shared(key, load, timeout)
+
+    async def _get(self, key, product_id, fields, timeout):
+        async def load():
+            docs = (await self._select(lookup_params(product_id, fields)))['response']['docs']
+            return docs[0] if docs else None
+        return await self._shared(key, load, timeout)
+
+    async def product(self, product_id, ingredients=False, timeout=None):
+        fields = DETAIL_FIELDS + (INGREDIENT_FIELDS if ingredients else [])
+        return await self._get(('product', str(product_id), ingredients), product_id, fields, timeout)
+
+    async def ingredients(self, product_id, timeout=None):
+        return await self._get(('ingredients', str(product_id)), product_id, ['id'] + INGREDIENT_FIELDS, timeout)
+
+
+def make_app(gateway):
+    """
+    Same routes as search_gateway.make_server, plus GET /stats.
+    A caller can shorten its deadline with `X-Deadline-Ms` (or ?deadline_ms=).
+    """
+    def send(payload, status=200):
+        return web.json_response(payload, status=status,
+                                 dumps=lambda data: json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+
+    def deadline(request):
+        value = request.headers.get('X-Deadline-Ms') or request.query.get('deadline_ms')
+        return float(value) / 1000 if value else None
+
+    async def guarded(request, call):
+        try:
+            result = await call(deadline(request))
+        except ValueError as e:
+            return send({'error': str(e)}, 400)
+        except DeadlineExceeded as e:
+            return send({'error': str(e)}, 504)
+        except SolrError as e:
+            return send({'error': str(e)}, 502)
+        return send(result) if result is not None else send({'error': 'Product not found'}, 404)
+
+    async def search(request):
+        params = request.query
+        return await guarded(request, lambda timeout: gateway.search(
+            params.get('q', ''), params, params.get('cursor', '*'), params.get('rows', DEFAULT_ROWS), timeout))
+
+    async def product(request):
+        return await guarded(request, lambda timeout: gateway.product(
+            request.match_info['id'], request.query.get('ingredients') == 'true', timeout))
+
+    async def ingredients(request):
+        return await guarded(request, lambda timeout: gateway.ingredients(request.match_info['id'], timeout))
+
+    async def suggest(request):
+        if gateway.autocomplete is None:
+            return send({'error': 'not found'}, 404)
+        k = request.query.get('k', '')
+        # A trie lookup takes microseconds: answered inline, not in an executor
+        return send({'suggestions': gateway.autocomplete.complete(request.query.get('q', ''),
+                                                                  int(k) if k.isdigit() else None)})
+
+    async def stats(request):
+        payload = {**gateway.stats, 'inflight': len(gateway.inflight)}
+        if gateway.cache is not None:
+            payload['cache'] = gateway.cache.metrics()
+        return send(payload)
+
+    async def invalidate(request):
+        if gateway.cache is None:
+            return send({'error': 'not found'}, 404)
+        try:
+            body = await request.json()
+            delay = float(body.get('delay', 0))
+        except ValueError:
+            return send({'error': 'invalid JSON'}, 400)
+        if body.get('all'):
+            gateway.cache.clear(delay)
+            return send({'cleared': True})
+        return send({'invalidated': gateway.cache.invalidate(body.get('ids', []), delay)})
+
+    async def on_startup(app):
+        await gateway.start()
+
+    async def on_cleanup(app):
+        await gateway.close()
+
+    app = web.Application()
+    app.add_routes([
+        web.get('/search', search),
+        web.get('/product/{id}', product),
+        web.get('/product/{id}/ingredients', ingredients),
+        web.get('/suggest', suggest),
+        web.get('/stats', stats),
+        web.get('/cache/stats', stats),
+        web.post('/cache/invalidate', invalidate),
+    ])
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="asyncio search gateway: pooled Solr connections, single-flight, deadlines")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8091)
+    parser.add_argument('--solr-url', default=DEFAULT_SOLR_URL)
+    parser.add_argument('--core', default=DEFAULT_CORE)
+    parser.add_argument('--pool-size', type=int, default=32, help="Keep-alive connections to Solr")
+    parser.add_argument('--deadline', type=float, default=DEFAULT_DEADLINE, help="Longest wait per request (s)")
+    parser.add_argument('--cache-size', type=int, default=1000, help="Cached pages/documents (0 disables the cache)")
+    parser.add_argument('--cache-ttl', type=float, default=60.0, help="Seconds a cached result is served")
+    parser.add_argument('--suggest', action='store_true', help="Serve /suggest from the processed JSON and synonyms.txt")
+    args = parser.parse_args()
+
+    cache = QueryCache(args.cache_size, args.cache_ttl) if args.cache_size > 0 else None
+    autocomplete = Autocomplete.from_files().watch() if args.suggest else None
+    gateway = AsyncSearchGateway(args.solr_url, args.core, pool_size=args.pool_size,
+                                 deadline=args.deadline, cache=cache, autocomplete=autocomplete)
+    print(f"Async search gateway listening on http://{args.host}:{args.port} (Ctrl+C to stop)")
+    web.run_app(make_app(gateway), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+import argparse
+import heapq
+import os
+import random
+import re
+import threading
+import time
+from solr_indexer import DEFAULT_INPUT, iter_documents
+from text_analysis import SOLR_CONF_DIR, ascii_fold, load_synonyms
+
+SYNONYMS_FILE = os.path.join(SOLR_CONF_DIR, 'synonyms.txt')
+
+# Completion kinds, in tie-break order
+CATEGORY, PRODUCT, SYNONYM = 0, 1, 2
+KIND_NAMES = {CATEGORY: 'category', PRODUCT: 'product', SYNONYM: 'term'}
+
+TOP_K = 10
+WATCH_INTERVAL = 5.0  # seconds between checks of the source files
+MAX_WORD_STARTS = 4  # "Big Mac Meal" is also found from "mac..." and "meal..."
+NON_WORD = re.compile(r'[^\w\s]+')
+
+
+def normalize(text):
+    """Case, accents, ® / ™ and punctuation do not matter while typing"""
+    return ' '.join(NON_WORD.sub(' ', ascii_fold(str(text).lower())).split())
+
+
+def word_starts(key):
+    """The key from each of its first few word starts"""
+    keys = [key]
+    position = key.find(' ')
+    while position != -1 and len(keys) < MAX_WORD_STARTS:
+        keys.append(key[position + 1:])
+        position = key.find(' ', position + 1)
+    return keys
+
+
+class Suggestion:
+    __slots__ = ('text', 'kind', 'keys', 'docs', 'weight', 'indexed')
+
+    def __init__(self, text, kind):
+        self.text = ' '.join(text.split())
+        self.kind = kind
+        self.keys = word_starts(normalize(text))
+        self.docs = {}   # doc id -> weight contributed
+        self.weight = 0
+        self.indexed = False
+
+    def rank(self):
+        return (-self.weight, self.kind, len(self.text), self.text)
+
+
+class _Node:
+    """Radix trie node: edges map first char -> [label, child]; `top` caches the best suggestions below"""
+    __slots__ = ('edges', 'terminal', 'top')
+
+    def __init__(self):
+        self.edges = {}
+        self.terminal = set()
+        self.top = ()
+
+
+class Autocomplete:
+    """
+    Prefix completion over product names, category_sub values and the terms of
+    synonyms.txt. Keys live in a radix trie whose nodes keep the top-k
+    suggestions of their subtree, so a lookup is a walk down the prefix plus
+    reading one precomputed list. Suggestions are ranked by likes +
+    popularity_score of their documents (summed for categories), then
+    category > product > synonym term, then shorter text.
+
+    update_documents() diffs a new document set against the current one and
+    only touches the suggestions whose documents changed; refresh() does that
+    when the processed JSON (or synonyms.txt) changed on disk.
+    """
+    def __init__(self, k=TOP_K):
+        self.k = k
+        self.root = _Node()
+        self.suggestions = {}   # (kind, normalized text) -> Suggestion
+        self.doc_state = {}     # doc id -> (product key, category key, weight)
+        self.synonym_terms = set()
+        self.docs_path = DEFAULT_INPUT
+        self.synonyms_path = SYNONYMS_FILE
+        self.sources = {}       # path -> (mtime_ns, size) when last loaded
+        self._lock = threading.Lock()
+
+    # --- I. Radix Trie ---
+    def _insert(self, key, suggestion):
+        """Add `suggestion` under `key`; returns the nodes from the root to the key's node"""
+        node, path, i = self.root, [self.root], 0
+        while i < len(key):
+            edge = node.edges.get(key[i])
+            if edge is None:
+                child = _Node()
+                node.edges[key[i]] = [key[i:], child]
+                node, i = child, len(key)
+                path.append(node)
+                break
+            label, child = edge
+            common = 0
+            while common < len(label) and i + common < len(key) and label[common] == key[i + common]:
+                common += 1
+            if common < len(label):
+                # Split the edge: node -label[:common]-> middle -label[common:]-> child
+                middle = _Node()
+                middle.edges[label[common]] = [label[common:], child]
+                middle.top = child.top
+                edge[0], edge[1] = label[:common], middle
+                child = middle
+            node, i = child, i + common
+            path.append(node)
+        node.terminal.add(suggestion)
+        return path
+
+    def _find(self, key):
+        """Nodes from the root to the node of `key` (exact), or None"""
+        node, path, i = self.root, [self.root], 0
+        while i < len(key):
+            edge = node.edges.get(key[i])
+            if edge is None or not key.startswith(edge[0], i):
+                return None
+            node, i = edge[1], i + len(edge[0])
+            path.append(node)
+        return path
+
+    def _remove(self, key, suggestion):
+        path = self._find(key)
+        if path is None:
+            return []
+        path[-1].terminal.discard(suggestion)
+        # Prune nodes left without suggestions or children
+        for depth in range(len(path) - 1, 0, -1):
+            node = path[depth]
+            if node.terminal or node.edges:
+                break
+            parent = path[depth - 1]
+            for first, (label, child) in list(parent.edges.items()):
+                if child is node:
+                    del parent.edges[first]
+            path.pop()
+        # A node left with one edge and no suggestions is folded into its parent edge
+        node = path[-1]
+        if len(path) > 1 and not node.terminal and len(node.edges) == 1:
+            (label, child), = node.edges.values()
+            for edge in path[-2].edges.values():
+                if edge[1] is node:
+                    edge[0], edge[1] = edge[0] + label, child
+            path[-1] = child
+        return path
+
+    def _locate(self, prefix):
+        """Node whose subtree holds every key starting with `prefix`"""
+        node, i = self.root, 0
+        while i < len(prefix):
+            edge = node.edges.get(prefix[i])
+            if edge is None:
+                return None
+            label, child = edge
+            if prefix.startswith(label, i):
+                node, i = child, i + len(label)
+            elif label.startswith(prefix[i:]):
+                return child
+            else:
+                return None
+        return node
+
+    def _recompute(self, paths):
+        """
+        Rebuild the top-k lists along `paths` (root-to-node lists), children
+        before parents. Walks down from the root through the touched nodes, so
+        edges split by later inserts of the same batch are followed correctly.
+        """
+        dirty = {id(node) for path in paths for node in path}
+
+        def visit(node):
+            candidates = set(node.terminal)
+            for _, child in node.edges.values():
+                if id(child) in dirty:
+                    visit(child)
+                candidates.update(child.top)
+            node.top = tuple(heapq.nsmallest(self.k, candidates, key=Suggestion.rank))
+        if dirty:
+            visit(self.root)
+
+    # --- II. Incremental Updates ---
+    def _suggestion(self, kind, text):
+        key = (kind, normalize(text))
+        suggestion = self.suggestions.get(key)
+        if suggestion is None:
+            suggestion = self.suggestions[key] = Suggestion(text, kind)
+        return suggestion
+
+    def _reindex(self, suggestion, keep):
+        """(Re-)index or drop one suggestion; returns the trie paths whose top lists need rebuilding"""
+        if keep and not suggestion.indexed:
+            paths = [self._insert(key, suggestion) for key in suggestion.keys]
+        elif keep:
+            paths = [self._find(key) for key in suggestion.keys]
+        elif suggestion.indexed:
+            paths = [self._remove(key, suggestion) for key in suggestion.keys]
+        else:
+            paths = []
+        if not keep:
+            self.suggestions.pop((suggestion.kind, normalize(suggestion.text)), None)
+        suggestion.indexed = keep
+        return [path for path in paths if path]
+
+    def _contribute(self, touched, doc_id, entry, remove=False):
+        name, category, weight = entry
+        for kind, text in ((PRODUCT, name), (CATEGORY, category)):
+            if not normalize(text):
+                continue
+            suggestion = self._suggestion(kind, text)
+            if remove:
+                suggestion.docs.pop(doc_id, None)
+            else:
+                suggestion.docs[doc_id] = weight
+            touched[suggestion] = True
+
+    def update_documents(self, docs):
+        """Bring the index in line with `docs` (the full processed menu); returns (added, changed, removed)"""
+        state = {}
+        for doc in docs:
+            weight = int(doc.get('likes') or 0) + int(doc.get('popularity_score') or 0)
+            state[str(doc['id'])] = (doc.get('product_name') or '', doc.get('category_sub') or '', weight)
+        with self._lock:
+            touched = {}
+            removed = self.doc_state.keys() - state.keys()
+            added = changed = 0
+            for doc_id in removed:
+                self._contribute(touched, doc_id, self.doc_state.pop(doc_id), remove=True)
+            for doc_id, entry in state.items():
+                old = self.doc_state.get(doc_id)
+                if old == entry:
+                    continue
+                if old is None:
+                    added += 1
+                else:
+                    changed += 1
+                    self._contribute(touched, doc_id, old, remove=True)
+                self._contribute(touched, doc_id, entry)
+                self.doc_state[doc_id] = entry
+            paths = []
+            for suggestion in touched:
+                suggestion.weight = sum(suggestion.docs.values())
+                paths += self._reindex(suggestion, bool(suggestion.docs))
+            self._recompute(paths)
+        return added, changed, len(removed)
+
+    def update_synonyms(self, terms):
+        """Index the given synonym terms (weight 0) and drop the ones no longer listed"""
+        terms = {term for term in terms if normalize(term)}
+        with self._lock:
+            paths = []
+            for term in self.synonym_terms - terms:
+                paths += self._reindex(self._suggestion(SYNONYM, term), False)
+            for term in terms - self.synonym_terms:
+                paths += self._reindex(self._suggestion(SYNONYM, term), True)
+            self.synonym_terms = terms
+            self._recompute(paths)
+
+    # --- III. Files ---
+    @staticmethod
+    def _signature(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def refresh(self):
+        """Reload whichever source file changed since the last call; returns True if anything was reloaded"""
+        docs_path, synonyms_path = self.docs_path, self.synonyms_path
+        reloaded = False
+        signature = self._signature(docs_path)
+        if signature is not None and self.sources.get(docs_path) != signature:
+            self.update_documents(iter_documents(docs_path))
+            self.sources[docs_path] = signature
+            reloaded = True
+        signature = self._signature(synonyms_path)
+        if signature is not None and self.sources.get(synonyms_path) != signature:
+            self.update_synonyms(' '.join(source) for source in load_synonyms(synonyms_path))
+            self.sources[synonyms_path] = signature
+            reloaded = True
+        return reloaded
+
+    @classmethod
+    def from_files(cls, docs_path=DEFAULT_INPUT, synonyms_path=SYNONYMS_FILE, k=TOP_K):
+        autocomplete = cls(k)
+        autocomplete.docs_path, autocomplete.synonyms_path = docs_path, synonyms_path
+        autocomplete.refresh()
+        return autocomplete
+
+    def watch(self, interval=WATCH_INTERVAL):
+        """Check the source files every `interval` seconds in a daemon thread"""
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh()
+                except (OSError, ValueError) as e:
+                    # A file caught mid-write: keep serving the current index, retry next time
+                    print(f"Autocomplete refresh failed: {e}")
+        threading.Thread(target=run, daemon=True).start()
+        return self
+
+    # --- IV. Queries ---
+    def complete(self, prefix, k=None):
+        """Top-k completions of what has been typed so far: [{'text', 'kind', 'weight'}]"""
+        key = normalize(prefix)
+        if not key:
+            return []
+        k = min(k or self.k, self.k)
+        with self._lock:
+            node = self._locate(key)
+            top = node.top if node is not None else ()
+        results, seen = [], set()
+        for suggestion in top:
+            # The same words can be a product name, a category and a synonym term
+            if suggestion.keys[0] in seen:
+                continue
+            seen.add(suggestion.keys[0])
+            results.append({'text': suggestion.text, 'kind': KIND_NAMES[suggestion.kind], 'weight': suggestion.weight})
+            if len(results) == k:
+                break
+        return results
+
+    def node_count(self):
+        count, stack = 0, [self.root]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(child for _, child in node.edges.values())
+        return count
+
+
+def benchmark(autocomplete, lookups, seed=7):
+    """Average lookup time (µs) over prefixes of 1-6 characters taken from the indexed keys"""
+    rng = random.Random(seed)
+    keys = [key for suggestion in autocomplete.suggestions.values() for key in suggestion.keys]
+    prefixes = [key[:rng.randint(1, 6)] for key in rng.choices(keys, k=lookups)]
+    started = time.perf_counter()
+    for prefix in prefixes:
+        autocomplete.complete(prefix)
+    return (time.perf_counter() - started) / lookups * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prefix completions over product names, categories and synonyms")
+    parser.add_argument('prefixes', nargs='*', default=['bi', 'chi', 'mac', 'fr', 'mcf', 'beef b'])
+    parser.add_argument('--input', default=DEFAULT_INPUT, help="Processed menu (JSON or JSON Lines)")
+    parser.add_argument('--synonyms', default=SYNONYMS_FILE)
+    parser.add_argument('-k', type=int, default=TOP_K)
+    parser.add_argument('--benchmark', type=int, default=20000, help="Random lookups to time (0 to skip)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    autocomplete = Autocomplete.from_files(args.input, args.synonyms, args.k)
+    print(f"{len(autocomplete.suggestions)} suggestions, {autocomplete.node_count()} trie nodes, "
+          f"built in {(time.perf_counter() - started) * 1000:.1f} ms")
+    for prefix in args.prefixes:
+        print(f"  {prefix!r:<10} " + ', '.join(item['text'] for item in autocomplete.complete(prefix)))
+    if args.benchmark:
+        print(f"{benchmark(autocomplete, args.benchmark):.1f} µs per lookup ({args.benchmark} random prefixes)")
+
+if __name__ == "__main__":
+    main()
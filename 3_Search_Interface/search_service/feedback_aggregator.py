@@ -0,0 +1,335 @@
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from query_cache import notify_invalidation
+from solr_client import DEFAULT_CORE, DEFAULT_SOLR_URL, SolrClient
+
+FEEDBACK_FIELDS = {'like': 'likes', 'dislike': 'dislikes'}
+# Id of the last feedback batch applied to a product (makes resending a batch harmless)
+FEEDBACK_BATCH_FIELD = 'feedback_batch'
+GET_BATCH = 100  # ids per real-time get request
+
+
+class FeedbackAggregator:
+    """
+    Coalesces like/dislike clicks into batched, idempotent Solr updates.
+
+    Every event is appended to a log segment and fsynced before it is
+    acknowledged (concurrent clicks share one fsync), and counted in memory per product ID. A flush (every
+    `flush_interval` seconds, or as soon as `flush_size` events are pending)
+    rotates the segment and turns the closed segments into one batch file
+    with a unique id. The batch is sent as absolute totals: each product's
+    current counts are read with real-time get, and `set` to count + increment
+    together with the batch id (FEEDBACK_BATCH_FIELD), guarded by the
+    `_version_` that was read. A product that already holds this batch's id
+    was updated by an earlier attempt and is skipped, so a batch
+    whose answer was lost (timeout, 5xx after Solr applied it, crash before
+    the batch file was deleted) can be resent any number of times without
+    counting a click twice; a concurrent writer makes the update fail with 409
+    and the batch is simply retried. A failed batch is resent unchanged before
+    any newer clicks. Batch files and segments of a crashed run are picked up
+    on start-up, so no acknowledged click is lost.
+    `on_flush(product_ids, delay)` is called after each successful flush, e.g.
+    to invalidate cached results; delay is commitWithin in seconds.
+    """
+    def __init__(self, client, log_dir, flush_interval=2.0, flush_size=500, commit_within=5000, fsync=True,
+                 on_flush=None):
+        self.client = client
+        self.log_dir = log_dir
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.commit_within = commit_within
+        self.fsync = fsync
+        self.on_flush = on_flush
+        self.pending = {}
+        self.pending_events = 0
+        self.stats = {'events': 0, 'flushes': 0, 'updates_sent': 0, 'failed_flushes': 0, 'failed_notifications': 0}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._written = 0
+        self._synced = 0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._segment = 0
+        self._closed = []   # closed segments whose events are in `pending` but not yet in a batch
+        self._batches = []  # (batch id, path, counts) written but not yet accepted by Solr, oldest first
+
+        os.makedirs(log_dir, exist_ok=True)
+        self._recover()
+        self._log = self._open_segment()
+
+    # --- I. Durable Log ---
+    def _segment_path(self, number):
+        return os.path.join(self.log_dir, f"feedback.{number:08d}.log")
+
+    @staticmethod
+    def _number(path):
+        return int(os.path.basename(path).split('.')[1])
+
+    def _open_segment(self):
+        self._segment += 1
+        return open(self._segment_path(self._segment), 'a', encoding='utf-8')
+
+    def _rotate(self):
+        """Close the current segment (called with _lock held) and start a new one"""
+        with self._sync_lock:
+            if self.fsync and self._synced < self._written:
+                os.fsync(self._log.fileno())
+            self._log.close()
+            closed = self._log.name
+            self._written = self._synced = 0
+            self._log = self._open_segment()
+        return closed
+
+    def _sync(self, log, seq):
+        """
+        Group commit: one fsync covers every event written before it, so
+        threads that find their event already synced return immediately.
+        Holding _sync_lock also keeps the segment from being rotated.
+        """
+        with self._sync_lock:
+            if log.closed or self._synced >= seq:
+                return
+            target = self._written
+            os.fsync(log.fileno())
+            self._synced = target
+
+    def _recover(self):
+        """Load the batch files and segments left by a previous run; they are flushed first"""
+        covered = set()
+        for path in sorted(glob.glob(os.path.join(self.log_dir, 'feedback.*.batch'))):
+            with open(path, 'r', encoding='utf-8') as f:
+                batch = json.load(f)
+            self._batches.append((batch['id'], path, batch['counts']))
+            covered.update(batch['segments'])
+            self._segment = max(self._segment, self._number(path))
+        events = 0
+        for path in sorted(glob.glob(os.path.join(self.log_dir, 'feedback.*.log'))):
+            self._segment = max(self._segment, self._number(path))
+            if os.path.basename(path) in covered:
+                os.remove(path)  # crashed after writing its batch file
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        break  # partially written last line: that click was never acknowledged
+                    self._merge(self.pending, event['id'], event['field'], event.get('n', 1))
+                    events += 1
+            self._closed.append(path)
+        self.pending_events = events
+        if self._batches or self._closed:
+            print(f"Recovered {len(self._batches)} unsent batches and {events} unflushed events "
+                  f"from {len(self._closed)} log segments")
+
+    @staticmethod
+    def _merge(counts, product_id, field, n):
+        fields = counts.setdefault(product_id, {})
+        fields[field] = fields.get(field, 0) + n
+
+    # --- II. Events ---
+    def record(self, product_id, action):
+        """Durably record one click; returns once it is safe to acknowledge"""
+        field = FEEDBACK_FIELDS[action]
+        line = json.dumps({'id': product_id, 'field': field, 'n': 1, 'ts': time.time()}) + '\n'
+        with self._lock:
+            self._log.write(line)
+            self._log.flush()
+            self._written += 1
+            log, seq = self._log, self._written
+            self._merge(self.pending, product_id, field, 1)
+            self.pending_events += 1
+            self.stats['events'] += 1
+            if self.pending_events >= self.flush_size:
+                self._wakeup.set()
+        if self.fsync:
+            self._sync(log, seq)
+
+    # --- III. Flushing ---
+    def _new_batch(self):
+        """Move the pending events into a batch file, numbered like its newest segment"""
+        with self._lock:
+            if not self.pending:
+                return None
+            segments = self._closed + [self._rotate()]
+            counts = self.pending
+            self._closed, self.pending, self.pending_events = [], {}, 0
+        batch_id = uuid.uuid4().hex
+        path = os.path.join(self.log_dir, f"feedback.{self._number(segments[-1]):08d}.batch")
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'id': batch_id, 'segments': [os.path.basename(p) for p in segments], 'counts': counts}, f)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+        for segment in segments:
+            os.remove(segment)
+        return batch_id, path, counts
+
+    def _send(self, batch_id, counts):
+        """Apply one batch as absolute totals; products it already reached are skipped"""
+        ids = list(counts)
+        current = {}
+        for i in range(0, len(ids), GET_BATCH):
+            for doc in self.client.get(ids[i:i + GET_BATCH], ['id', FEEDBACK_BATCH_FIELD, '_version_',
+                                                              *FEEDBACK_FIELDS.values()]):
+                current[str(doc['id'])] = doc
+        updates = []
+        for product_id, fields in counts.items():
+            doc = current.get(str(product_id))
+            if doc is not None and doc.get(FEEDBACK_BATCH_FIELD) == batch_id:
+                continue
+            update = {'id': product_id, FEEDBACK_BATCH_FIELD: {'set': batch_id},
+                      '_version_': doc['_version_'] if doc is not None else -1}
+            for field, n in fields.items():
+                update[field] = {'set': ((doc or {}).get(field) or 0) + n}
+            updates.append(update)
+        if updates:
+            self.client.atomic_update(updates, self.commit_within)
+        return len(updates)
+
+    def flush(self):
+        """Send unsent batches, then the pending events; on failure they stay on disk and are resent"""
+        with self._flush_lock:
+            sent = 0
+            formed = False
+            while True:
+                if not self._batches:
+                    # Newer clicks only after every older batch went through: one new batch per flush
+                    batch = None if formed else self._new_batch()
+                    if batch is None:
+                        return sent
+                    self._batches.append(batch)
+                    formed = True
+                batch_id, path, counts = self._batches[0]
+                try:
+                    updates = self._send(batch_id, counts)
+                except Exception as e:
+                    # SolrError (also a 409 from a concurrent writer), but also anything unexpected:
+                    # the batch stays on disk and is resent unchanged
+                    self.stats['failed_flushes'] += 1
+                    print(f"Feedback flush failed, will retry: {type(e).__name__}: {e}")
+                    return sent
+                os.remove(path)
+                self._batches.pop(0)
+                sent += updates
+                self.stats['flushes'] += 1
+                self.stats['updates_sent'] += updates
+                if self.on_flush is not None:
+                    # The flush itself succeeded; a failed notification must not be counted or retried as one
+                    try:
+                        self.on_flush(list(counts), (self.commit_within or 0) / 1000)
+                    except Exception as e:
+                        self.stats['failed_notifications'] += 1
+                        print(f"Feedback flush notification failed: {type(e).__name__}: {e}")
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # e.g. a segment that cannot be rotated or removed: keep the thread alive, retry next interval
+                self.stats['failed_flushes'] += 1
+                print(f"Feedback flusher error, will retry: {type(e).__name__}: {e}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the flusher and send whatever is still pending"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        self._log.close()
+        # An empty trailing segment is not needed for recovery
+        if os.path.exists(self._log.name) and os.path.getsize(self._log.name) == 0:
+            os.remove(self._log.name)
+
+
+def make_server(aggregator, host='127.0.0.1', port=8090):
+    """HTTP front end: POST /like and /dislike with {"productId": ...}, GET /stats"""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive
+        disable_nagle_algorithm = True
+
+        def _send(self, status, payload):
+            data = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            action = self.path.strip('/').split('?')[0]
+            if action not in FEEDBACK_FIELDS:
+                return self._send(404, {'error': 'unknown action'})
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            except ValueError:
+                return self._send(400, {'error': 'invalid JSON'})
+            product_id = body.get('productId')
+            if not product_id:
+                return self._send(400, {'error': 'Product ID is required'})
+            aggregator.record(str(product_id), action)
+            self._send(200, {'success': True, 'productId': product_id})
+
+        def do_GET(self):
+            if self.path.rstrip('/') != '/stats':
+                return self._send(404, {'error': 'not found'})
+            self._send(200, {**aggregator.stats, 'pending_events': aggregator.pending_events})
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Buffer like/dislike clicks and flush merged increments to Solr")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--solr-url', default=DEFAULT_SOLR_URL)
+    parser.add_argument('--core', default=DEFAULT_CORE)
+    parser.add_argument('--log-dir', default='feedback_log')
+    parser.add_argument('--flush-interval', type=float, default=2.0, help="Seconds between flushes")
+    parser.add_argument('--flush-size', type=int, default=500, help="Flush early at this many pending events")
+    parser.add_argument('--commit-within', type=int, default=5000, help="commitWithin in ms")
+    parser.add_argument('--invalidate-url', help="Search gateway whose cache is invalidated after each flush")
+    args = parser.parse_args()
+
+    on_flush = None
+    if args.invalidate_url:
+        on_flush = lambda product_ids, delay: notify_invalidation(args.invalidate_url, product_ids, delay)
+    aggregator = FeedbackAggregator(SolrClient(args.solr_url, args.core), args.log_dir,
+                                    args.flush_interval, args.flush_size, args.commit_within,
+                                    on_flush=on_flush).start()
+    server = make_server(aggregator, args.host, args.port)
+    print(f"Feedback aggregator listening on http://{args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        aggregator.stop()
+        print(f"Stopped after {aggregator.stats['events']} events, {aggregator.stats['flushes']} flushes")
+
+if __name__ == "__main__":
+    main()
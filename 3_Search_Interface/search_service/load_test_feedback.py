@@ -0,0 +1,87 @@
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from feedback_aggregator import FEEDBACK_FIELDS, FeedbackAggregator, make_server
+from solr_client import SolrClient
+from stub_solr import StubSolr
+
+
+def send_clicks(url, events, threads):
+    """POST every (product id, action) event over `threads` keep-alive connections"""
+    def worker(chunk):
+        with requests.Session() as session:
+            for product_id, action in chunk:
+                session.post(f"{url}/{action}", json={'productId': product_id}, timeout=10).raise_for_status()
+    chunks = [events[i::threads] for i in range(threads)]
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, chunks))
+
+
+def expected_counts(events):
+    counts = Counter()
+    for product_id, action in events:
+        counts[(product_id, FEEDBACK_FIELDS[action])] += 1
+    return counts
+
+
+def stored_counts(stub):
+    counts = Counter()
+    for doc in stub.docs.values():
+        for field in FEEDBACK_FIELDS.values():
+            if doc.get(field):
+                counts[(str(doc['id']), field)] = doc[field]
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent like/dislike load against the aggregator and a stub Solr")
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--products', type=int, default=50)
+    parser.add_argument('--flush-size', type=int, default=200)
+    parser.add_argument('--fail-flushes', type=int, default=2, help="Solr errors injected during the run")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    events = [(str(rng.randint(1, args.products)), rng.choice(list(FEEDBACK_FIELDS))) for _ in range(args.events)]
+    log_dir = tempfile.mkdtemp(prefix='feedback_log_')
+    stub = StubSolr(fail_next=args.fail_flushes).start()
+    client = SolrClient(stub.base_url, retries=0)
+    try:
+        # 1. Concurrent clicks, with size/time-triggered flushes and injected Solr failures
+        aggregator = FeedbackAggregator(client, log_dir, flush_interval=0.2, flush_size=args.flush_size).start()
+        server = make_server(aggregator, port=0)
+        ThreadPoolExecutor(max_workers=1).submit(server.serve_forever)
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        started = time.perf_counter()
+        send_clicks(url, events, args.threads)
+        elapsed = time.perf_counter() - started
+        server.shutdown()
+        aggregator.stop()
+
+        exact = stored_counts(stub) == expected_counts(events)
+        print(f"{args.events} clicks from {args.threads} threads in {elapsed:.2f}s ({args.events / elapsed:,.0f}/s)")
+        print(f"Solr update requests: {len(stub.batches)} instead of {args.events} "
+              f"({aggregator.stats['failed_flushes']} failed flushes retried)")
+        print(f"Counts in Solr match the clicks sent: {'OK' if exact else 'MISMATCH'}")
+
+        # 2. Crash recovery: events logged but never flushed are replayed by the next instance
+        crashed = FeedbackAggregator(client, log_dir, flush_size=10 ** 9)
+        extra = events[:100]
+        for product_id, action in extra:
+            crashed.record(product_id, action)
+        crashed._log.close()  # simulated crash: no flush, no stop()
+        FeedbackAggregator(client, log_dir).stop()
+        exact = stored_counts(stub) == expected_counts(events + extra)
+        print(f"Counts after crash recovery: {'OK' if exact else 'MISMATCH'}")
+    finally:
+        stub.stop()
+        shutil.rmtree(log_dir)
+
+if __name__ == "__main__":
+    main()
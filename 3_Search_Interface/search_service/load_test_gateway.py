@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import aiohttp
+from aiohttp import web
+from async_gateway import AsyncSearchGateway, make_app, query_pairs
+from search_gateway import search_params
+from solr_indexer import DEFAULT_INPUT
+from stub_solr import StubSolr
+
+# Popular searches (what the home page and FilterBar defaults send most), weighted Zipf-like
+QUERIES = ['', 'burger', 'chicken', 'fries', 'coffee', 'salad', 'wrap', 'nuggets', 'milkshake', 'breakfast',
+           'big mac', 'ice cream', 'vegan', 'fish', 'apple pie', 'hash browns']
+FILTERS = [{}, {'company': "McDonald's"}, {'company': 'KFC'}, {'category': 'Main > Beef Burgers'}, {'salt': 2}]
+
+
+def workload(n, seed):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(QUERIES))]
+    return [(rng.choices(QUERIES, weights)[0], rng.choice(FILTERS)) for _ in range(n)]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+async def run_clients(requests, concurrency, send):
+    """Replay `requests` from `concurrency` clients; returns per-request latencies (s) and the wall time"""
+    queue = list(reversed(requests))
+    latencies = []
+    errors = []
+
+    async def client():
+        while queue:
+            q, filters = queue.pop()
+            started = time.perf_counter()
+            try:
+                await send(q, filters)
+                latencies.append(time.perf_counter() - started)
+            except aiohttp.ClientResponseError as e:
+                errors.append(f"HTTP {e.status}")
+            except Exception as e:
+                errors.append(repr(e))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def direct(stub, requests, concurrency):
+    """Baseline: every request opens its own connection to Solr, identical queries all go upstream"""
+    url = f"{stub.base_url}/{stub.core}/fastfood_search"
+
+    async def send(q, filters):
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(force_close=True)) as session:
+            params = search_params(q, filters, '*', 24)
+            async with session.get(url, params=query_pairs(params)) as response:
+                response.raise_for_status()
+                await response.json(content_type=None)
+    return await run_clients(requests, concurrency, send)
+
+
+async def via_gateway(stub, requests, concurrency, pool_size, deadline):
+    gateway = AsyncSearchGateway(stub.base_url, stub.core, pool_size=pool_size, deadline=deadline)
+    runner = web.AppRunner(make_app(gateway))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+            async def send(q, filters):
+                params = {'q': q, **filters}
+                async with session.get(f"http://127.0.0.1:{port}/search", params=query_pairs(params)) as response:
+                    response.raise_for_status()
+                    await response.json()
+            result = await run_clients(requests, concurrency, send)
+        # Calls whose callers all gave up are still running; let them finish before shutting down
+        while gateway.inflight:
+            await asyncio.sleep(0.01)
+        return result + (dict(gateway.stats),)
+    finally:
+        await runner.cleanup()
+
+
+def report(name, latencies, errors, elapsed, upstream):
+    ms = [latency * 1000 for latency in latencies]
+    print(f"{name:<10} {len(ms):>6} {len(errors):>6} {statistics.median(ms):>9.1f} {percentile(ms, 95):>9.1f} "
+          f"{percentile(ms, 99):>9.1f} {len(ms) / elapsed:>9.0f} {upstream:>9}")
+
+
+async def main_async(args):
+    stub = StubSolr(latency=args.latency, workers=args.solr_workers).start()
+    with open(DEFAULT_INPUT, 'r', encoding='utf-8') as f:
+        for doc in json.load(f):
+            stub.docs[str(doc['id'])] = doc
+    requests = workload(args.requests, args.seed)
+    print(f"{args.requests} searches from {args.concurrency} clients; stub Solr: {args.latency * 1000:.0f} ms "
+          f"per query, {args.solr_workers} at a time")
+    print(f"{'':<10} {'ok':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'upstream':>9}")
+    try:
+        before = stub.queries
+        latencies, errors, elapsed = await direct(stub, requests, args.concurrency)
+        report('direct', latencies, errors, elapsed, stub.queries - before)
+
+        before = stub.queries
+        latencies, errors, elapsed, stats = await via_gateway(stub, requests, args.concurrency,
+                                                              args.pool_size, args.deadline)
+        report('gateway', latencies, errors, elapsed, stub.queries - before)
+        print(f"gateway: {stats['coalesced']} requests coalesced, {stats['deadline_exceeded']} over the "
+              f"{args.deadline:g}s deadline, {stats['upstream_errors']} upstream errors")
+        for error in sorted(set(errors)):
+            print(f"  {errors.count(error)} x {error}")
+    finally:
+        stub.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare direct Solr requests with the async gateway (stub Solr)")
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--latency', type=float, default=0.02, help="Stub query time in seconds")
+    parser.add_argument('--solr-workers', type=int, default=8, help="Queries the stub serves at once")
+    parser.add_argument('--pool-size', type=int, default=16, help="Gateway connections to Solr")
+    parser.add_argument('--deadline', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
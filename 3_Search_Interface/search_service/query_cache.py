@@ -0,0 +1,158 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+import requests
+
+
+def normalize_query(q):
+    """Collapse whitespace only: qf includes case-sensitive string fields (category_main, category_sub)"""
+    q = ' '.join((q or '').split())
+    return q if q else '*:*'
+
+
+def normalize_filters(filters):
+    """FilterBar state as a hashable key; 'All' and empty values are the same as no filter"""
+    key = []
+    for name, value in sorted((filters or {}).items()):
+        if value in (None, '', 'All'):
+            continue
+        if isinstance(value, (int, float)) or (isinstance(value, str) and re.fullmatch(r'\d+(\.\d+)?', value)):
+            value = float(value)
+        key.append((name, value))
+    return tuple(key)
+
+
+def result_ids(result):
+    """Document IDs held by a cached value (a search page or a single document)"""
+    if not result:
+        return ()
+    docs = result.get('docs') if 'docs' in result else [result]
+    return {str(doc['id']) for doc in docs if 'id' in doc}
+
+
+class QueryCache:
+    """
+    LRU of search results with a TTL and a maximum number of entries.
+    Each entry is indexed by the document IDs it contains, so an update to a
+    product only drops the pages and details that show it. A doc that is not on
+    a cached page can still move onto it after a like; that staleness is bounded
+    by the TTL. Updates sent with commitWithin become visible later than they
+    are acknowledged: invalidate(..., delay) also caps the lifetime of entries
+    cached during that window, so a result read before the commit does not stick.
+    """
+    def __init__(self, max_entries=1000, ttl=60.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (value, expires, ids)
+        self.by_doc = {}              # doc id -> keys of the entries that contain it
+        self.pending = {}             # doc id -> time its latest update becomes visible
+        self.all_visible = 0.0        # time a full reindex becomes searchable
+        self.epoch = 0                # bumped by every invalidation
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+        self._lock = threading.Lock()
+
+    def _drop(self, key):
+        _, _, ids = self.entries.pop(key)
+        for doc_id in ids:
+            keys = self.by_doc.get(doc_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.by_doc[doc_id]
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] <= self.clock():
+                self._drop(key)
+                self.stats['expirations'] += 1
+                entry = None
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def put(self, key, value, epoch=None):
+        """Store a result; with the epoch read before loading it, a result that raced an invalidation is skipped"""
+        ids = result_ids(value)
+        with self._lock:
+            if epoch is not None and epoch != self.epoch:
+                return
+            now = self.clock()
+            expires = now + self.ttl
+            if self.all_visible > now:
+                expires = min(expires, self.all_visible)
+            for doc_id in ids:
+                visible = self.pending.get(doc_id)
+                if visible is not None:
+                    if visible > now:
+                        expires = min(expires, visible)
+                    else:
+                        del self.pending[doc_id]
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (value, expires, ids)
+            for doc_id in ids:
+                self.by_doc.setdefault(doc_id, set()).add(key)
+            while len(self.entries) > self.max_entries:
+                self._drop(next(iter(self.entries)))
+                self.stats['evictions'] += 1
+
+    def get_or_load(self, key, load):
+        value = self.get(key)
+        if value is None:
+            epoch = self.epoch
+            value = load()
+            self.put(key, value, epoch)
+        return value
+
+    def invalidate(self, doc_ids, delay=0.0):
+        """Drop the entries showing any of `doc_ids`; `delay` = seconds until the update is searchable"""
+        with self._lock:
+            visible = self.clock() + delay
+            self.epoch += 1
+            dropped = 0
+            for doc_id in map(str, doc_ids):
+                for key in list(self.by_doc.get(doc_id, ())):
+                    self._drop(key)
+                    dropped += 1
+                if delay > 0:
+                    self.pending[doc_id] = max(self.pending.get(doc_id, 0), visible)
+            self.stats['invalidations'] += dropped
+            return dropped
+
+    def clear(self, delay=0.0):
+        """Full reindex: nothing cached is trustworthy (until `delay` seconds from now)"""
+        with self._lock:
+            self.all_visible = max(self.all_visible, self.clock() + delay)
+            self.epoch += 1
+            self.stats['invalidations'] += len(self.entries)
+            self.entries.clear()
+            self.by_doc.clear()
+            self.pending.clear()
+
+    def metrics(self):
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {**self.stats, 'entries': len(self.entries),
+                    'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else 0.0}
+
+
+def notify_invalidation(url, doc_ids=None, delay=0.0, timeout=5):
+    """
+    Tell a search gateway (POST <url>/cache/invalidate) which documents changed;
+    doc_ids=None clears the whole cache. `delay` is the commitWithin of the
+    update in seconds. Failures are reported, not raised:
+    the cache TTL bounds the staleness anyway.
+    """
+    payload = {'all': True, 'delay': delay} if doc_ids is None else {'ids': [str(i) for i in doc_ids], 'delay': delay}
+    try:
+        requests.post(f"{url.rstrip('/')}/cache/invalidate", json=payload, timeout=timeout).raise_for_status()
+        return True
+    except requests.exceptions.RequestException as e:
+        print(f"Cache invalidation at {url} failed: {e}")
+        return False
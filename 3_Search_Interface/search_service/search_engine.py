@@ -0,0 +1,524 @@
+import argparse
+import heapq
+import math
+import time
+from array import array
+from functools import lru_cache
+from itertools import product
+from solr_indexer import DEFAULT_INPUT, iter_documents
+from text_analysis import Analyzers
+
+# In-process approximation of the /fastfood_search handler (solrconfig.xml),
+# written from its parameters: edismax over qf with tie 0.1 and mm "2<-1 5<80%",
+# pf phrase boosts with ps=2, the like/dislike bf, and BM25 term scores.
+# Its results have not been compared with a running Solr (search_parity.py check).
+# Offline only: neither gateway serves from it. It models plain-text queries
+# (and *:*); anything using query syntax raises UnsupportedQuery.
+
+QF = (('product_name', 4.0), ('category_main', 5.0), ('category_sub', 4.5),
+      ('description', 2.0), ('ingredients_text', 1.0), ('catch_all_text', 0.2))
+PF = (('product_name', 5.0), ('category_main', 6.0), ('category_sub', 5.0))
+PHRASE_SLOP = 2
+TIE = 0.1
+MM = ((2, -1, False), (5, 80, True))  # (clause count above which it applies, value, is percentage)
+
+FIELD_TYPES = {
+    'product_name': 'text_general', 'description': 'text_general', 'ingredients_text': 'text_general',
+    'category_main': 'string', 'category_sub': 'string', 'catch_all_text': 'text_enhanced_strong',
+}
+K1 = 1.2
+B = 0.75
+MAX_BOOLEAN_CLAUSES = 1024
+
+# Lucene / edismax query syntax, none of which the engine models: operator words,
+# +/- prefixes, and characters that start groups, phrases, ranges, boosts,
+# fuzzy/wildcard terms, fields or regexes ("-" and "+" inside a word are plain text)
+OPERATOR_WORDS = {'AND', 'OR', 'NOT'}
+OPERATORS = ('&&', '||')
+PREFIX_OPERATORS = ('+', '-')
+SYNTAX_CHARACTERS = frozenset('!(){}[]^"~*?:\\/')
+# Inside a word they are plain text and split it, as the tokenizer would ("coca-cola")
+WORD_SEPARATORS = str.maketrans({c: ' ' for c in '+-|'})
+
+
+class UnsupportedQuery(ValueError):
+    """A query using syntax the engine does not model; Solr has to answer it"""
+
+
+def query_syntax(text):
+    """The first word of `text` that is query syntax rather than plain text, or None"""
+    for word in text.split():
+        if (word in OPERATOR_WORDS or word.startswith(PREFIX_OPERATORS)
+                or any(operator in word for operator in OPERATORS) or not SYNTAX_CHARACTERS.isdisjoint(word)):
+            return word
+    return None
+
+
+# --- I. Lucene Encodings ---
+
+def _long_to_int4(i):
+    num_bits = i.bit_length()
+    if num_bits < 4:
+        return i
+    shift = num_bits - 4
+    return ((i >> shift) & 0x07) | ((shift + 1) << 3)
+
+
+def _int4_to_long(i):
+    bits = i & 0x07
+    shift = (i >> 3) - 1
+    return bits if shift == -1 else (bits | 0x08) << shift
+
+
+NUM_FREE_VALUES = 255 - _long_to_int4(2 ** 31 - 1)
+
+
+def int_to_byte4(i):
+    """SmallFloat.intToByte4: the lossy one-byte field length stored as the norm"""
+    return i if i < NUM_FREE_VALUES else NUM_FREE_VALUES + _long_to_int4(i - NUM_FREE_VALUES)
+
+
+def byte4_to_int(b):
+    return b if b < NUM_FREE_VALUES else NUM_FREE_VALUES + _int4_to_long(b - NUM_FREE_VALUES)
+
+
+LENGTH_TABLE = [byte4_to_int(b) for b in range(256)]
+
+
+def min_should_match(clauses, spec=MM):
+    """Solr's calculateMinShouldMatch for conditional specs like '2<-1 5<80%'"""
+    required = clauses
+    for upper, value, percent in spec:
+        if clauses > upper:
+            if percent:
+                required = int(clauses * value / 100) if value >= 0 else clauses + int(clauses * value / 100)
+            else:
+                required = value if value >= 0 else clauses + value
+    return min(max(required, 0), clauses)
+
+
+def feedback_boost(likes, dislikes):
+    """bf: product(sum(1,log(sum(likes,1))),div(1,log(sum(dislikes,2)))) - Solr's log() is log10"""
+    return (1 + math.log10(likes + 1)) * (1 / math.log10(dislikes + 2))
+
+
+# --- II. Array-Backed Field Index ---
+
+class FieldIndex:
+    """
+    Inverted index of one field in flat arrays: a term maps to a slice of
+    doc ids / frequencies, and each posting to a slice of the positions array.
+    Norms are the encoded field lengths, one byte per document.
+    """
+    def __init__(self, name, num_docs, with_positions):
+        self.name = name
+        self.terms = {}
+        self.docs = array('i')
+        self.freqs = array('i')
+        self.position_starts = array('i', [0])
+        self.positions = array('i')
+        self.norms = bytearray(num_docs)
+        self.with_positions = with_positions
+        self.doc_count = 0
+        self.norm_inverse = [0.0] * 256
+        # Per-term results never change for a built index, so they are computed once
+        self._scores = {}
+        self._positions = {}
+
+    def build(self, postings, lengths):
+        """postings: {term: [(doc, [positions] or freq)]}; lengths: {doc: field length}"""
+        for term in sorted(postings):
+            start = len(self.docs)
+            for doc, occurrences in postings[term]:
+                self.docs.append(doc)
+                if self.with_positions:
+                    self.freqs.append(len(occurrences))
+                    self.positions.extend(occurrences)
+                    self.position_starts.append(len(self.positions))
+                else:
+                    self.freqs.append(occurrences)
+            self.terms[term] = (start, len(self.docs))
+        for doc, length in lengths.items():
+            self.norms[doc] = int_to_byte4(length)
+        self.doc_count = len(lengths)
+        total = sum(self.freqs)
+        avgdl = total / self.doc_count if self.doc_count else 1.0
+        self.norm_inverse = [1.0 / (K1 * ((1 - B) + B * LENGTH_TABLE[i] / avgdl)) for i in range(256)]
+
+    def postings(self, term):
+        return self.terms.get(term, (0, 0))
+
+    def idf(self, doc_freq):
+        return math.log(1 + (self.doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def bm25(self, doc_freq, freqs):
+        """{doc: score} for {doc: frequency} (BM25Scorer.score without boost)"""
+        weight = self.idf(doc_freq)
+        norms, inverse = self.norms, self.norm_inverse
+        return {doc: weight - weight / (1 + freq * inverse[norms[doc]]) for doc, freq in freqs.items()}
+
+    def term_scores(self, term):
+        scores = self._scores.get(term)
+        if scores is None:
+            start, end = self.postings(term)
+            scores = self.bm25(end - start, dict(zip(self.docs[start:end], self.freqs[start:end])))
+            self._scores[term] = scores
+        return scores
+
+    def term_positions(self, term):
+        """{doc: positions} of one term"""
+        positions = self._positions.get(term)
+        if positions is None:
+            start, end = self.postings(term)
+            starts = self.position_starts
+            positions = {self.docs[i]: self.positions[starts[i]:starts[i + 1]] for i in range(start, end)}
+            self._positions[term] = positions
+        return positions
+
+
+# --- III. Query Nodes ---
+# Every node evaluates to {doc: score}, mirroring the Lucene query edismax builds
+
+class TermNode:
+    def __init__(self, field, term):
+        self.field, self.term = field, term
+
+    def evaluate(self, engine):
+        return engine.fields[self.field].term_scores(self.term)
+
+
+class SynonymNode:
+    """SynonymQuery: the terms are scored as one, with summed frequency and the highest doc freq"""
+    def __init__(self, field, terms):
+        self.field, self.terms = field, terms
+
+    def evaluate(self, engine):
+        fi = engine.fields[self.field]
+        freq = {}
+        doc_freq = 0
+        for term in self.terms:
+            start, end = fi.postings(term)
+            doc_freq = max(doc_freq, end - start)
+            for i in range(start, end):
+                doc = fi.docs[i]
+                freq[doc] = freq.get(doc, 0) + fi.freqs[i]
+        return fi.bm25(doc_freq, freq) if freq else {}
+
+
+class BooleanNode:
+    """Sum of matching clauses; all `must` clauses and at least `mm` (or one) `should` clauses"""
+    def __init__(self, must=(), should=(), mm=0):
+        self.must, self.should, self.mm = list(must), list(should), mm
+
+    def evaluate(self, engine):
+        scores = None
+        for clause in self.must:
+            result = clause.evaluate(engine)
+            scores = result if scores is None else {d: s + result[d] for d, s in scores.items() if d in result}
+            if not scores:
+                return {}
+        if not self.should:
+            return scores or {}
+        required = self.mm if self.must else max(self.mm, 1)
+        totals, counts = {}, {}
+        for clause in self.should:
+            for doc, score in clause.evaluate(engine).items():
+                totals[doc] = totals.get(doc, 0.0) + score
+                counts[doc] = counts.get(doc, 0) + 1
+        if scores is None:
+            return {d: s for d, s in totals.items() if counts[d] >= required}
+        return {d: s + totals.get(d, 0.0) for d, s in scores.items() if counts.get(d, 0) >= required}
+
+
+class DisMaxNode:
+    """DisjunctionMaxQuery: best clause plus `tie` times the others"""
+    def __init__(self, clauses, tie):
+        self.clauses, self.tie = clauses, tie
+
+    def evaluate(self, engine):
+        best, total = {}, {}
+        for clause in self.clauses:
+            for doc, score in clause.evaluate(engine).items():
+                if score > best.get(doc, -1.0):
+                    best[doc] = score
+                total[doc] = total.get(doc, 0.0) + score
+        return {doc: m + self.tie * (total[doc] - m) for doc, m in best.items()}
+
+
+class BoostNode:
+    def __init__(self, clause, boost):
+        self.clause, self.boost = clause, boost
+
+    def evaluate(self, engine):
+        return {doc: score * self.boost for doc, score in self.clause.evaluate(engine).items()}
+
+
+class PhraseNode:
+    """
+    Sloppy (Multi)PhraseQuery: `slots` holds the alternative terms of each
+    phrase position. Frequency is the sum of 1/(1 + match length) over matches
+    within `slop`; idf is summed over the phrase terms.
+    """
+    def __init__(self, field, slots, slop):
+        self.field, self.slots, self.slop = field, slots, slop
+
+    def evaluate(self, engine):
+        fi = engine.fields[self.field]
+        per_slot = []
+        idf = 0.0
+        for terms in self.slots:
+            present = [fi.term_positions(term) for term in terms if fi.postings(term)[0] != fi.postings(term)[1]]
+            if not present:
+                return {}
+            idf += sum(fi.idf(len(positions)) for positions in present)
+            if len(present) == 1:
+                per_slot.append(present[0])
+            else:
+                union = {}
+                for positions in present:
+                    for doc, p in positions.items():
+                        union.setdefault(doc, []).extend(p)
+                per_slot.append({doc: sorted(p) for doc, p in union.items()})
+        candidates = set(per_slot[0]).intersection(*per_slot[1:])
+        norms, inverse = fi.norms, fi.norm_inverse
+        scores = {}
+        for doc in candidates:
+            freq = sloppy_frequency([slot[doc] for slot in per_slot], self.slop)
+            if freq > 0:
+                scores[doc] = idf - idf / (1 + freq * inverse[norms[doc]])
+        return scores
+
+
+def sloppy_frequency(slot_positions, slop):
+    """SloppyPhraseMatcher.nextMatch, summed like PhraseScorer (phrase without repeated terms)"""
+    heap = []
+    end = None
+    for offset, positions in enumerate(slot_positions):
+        position = positions[0] - offset
+        heap.append((position, offset, 0))
+        end = position if end is None else max(end, position)
+    heapq.heapify(heap)
+    freq = 0.0
+    while True:
+        position, offset, index = heapq.heappop(heap)
+        match_length = end - position
+        next_position = heap[0][0]
+        matched = False
+        while index + 1 < len(slot_positions[offset]):
+            index += 1
+            position = slot_positions[offset][index] - offset
+            end = max(end, position)
+            if position > next_position:
+                heapq.heappush(heap, (position, offset, index))
+                if match_length <= slop:
+                    matched = True
+                    break
+                position, offset, index = heapq.heappop(heap)
+                next_position = heap[0][0]
+                match_length = end - position
+            else:
+                match_length = min(match_length, end - position)
+        if match_length <= slop:
+            freq += 1.0 / (1.0 + match_length)
+        if not matched:
+            return freq
+
+
+# --- IV. Engine ---
+
+class SearchEngine:
+    """
+    Embeddable approximation of /fastfood_search: load the processed menu once, answer queries in-process.
+    Plain-text queries only (search raises UnsupportedQuery otherwise).
+    """
+    def __init__(self, docs, analyzers=None):
+        self.analyzers = analyzers or Analyzers()
+        self.docs = list(docs)
+        self.ids = {str(doc['id']): i for i, doc in enumerate(self.docs)}
+        self.likes = array('i', (int(doc.get('likes') or 0) for doc in self.docs))
+        self.dislikes = array('i', (int(doc.get('dislikes') or 0) for doc in self.docs))
+        self.boosts = array('d', map(feedback_boost, self.likes, self.dislikes))
+        self.fields = {field: self._index_field(field, kind) for field, kind in FIELD_TYPES.items()}
+        self.plan = lru_cache(maxsize=4096)(self._plan)
+        self.relevance = lru_cache(maxsize=4096)(self._relevance)
+
+    @classmethod
+    def from_file(cls, filename=DEFAULT_INPUT):
+        return cls(iter_documents(filename))
+
+    def _index_field(self, field, kind):
+        fi = FieldIndex(field, len(self.docs), with_positions=(kind == 'text_general'))
+        postings, lengths = {}, {}
+        for doc, record in enumerate(self.docs):
+            value = record.get(field)
+            if value is None or value == '':
+                continue  # dropped by the remove-blank update processor
+            if kind == 'string':
+                postings.setdefault(str(value), []).append((doc, 1))
+                lengths[doc] = 1
+            elif kind == 'text_general':
+                tokens, _ = self.analyzers.general_index(str(value))
+                if not tokens:
+                    continue
+                by_term = {}
+                for term, position in tokens:
+                    by_term.setdefault(term, []).append(position)
+                for term, positions in by_term.items():
+                    postings.setdefault(term, []).append((doc, positions))
+                lengths[doc] = len(tokens)
+            else:
+                terms, length = self.analyzers.strong_index(str(value))
+                if not terms:
+                    continue
+                by_term = {}
+                for term in terms:
+                    by_term[term] = by_term.get(term, 0) + 1
+                for term, freq in by_term.items():
+                    postings.setdefault(term, []).append((doc, freq))
+                lengths[doc] = length
+        fi.build(postings, lengths)
+        return fi
+
+    # --- Query construction ---
+    @staticmethod
+    def _segment_node(field, paths):
+        if len(paths) == 1 and len(paths[0]) == 1:
+            return TermNode(field, paths[0][0])
+        if all(len(path) == 1 for path in paths):
+            return SynonymNode(field, [path[0] for path in paths])
+        # Multi-word synonyms: one clause per alternative, multi-word ones with all terms required
+        return BooleanNode(should=[TermNode(field, path[0]) if len(path) == 1
+                                   else BooleanNode(must=[TermNode(field, t) for t in path])
+                                   for path in paths])
+
+    def _analyze(self, field, text):
+        kind = FIELD_TYPES[field]
+        if kind == 'text_general':
+            return self.analyzers.general_query(text)
+        return self.analyzers.strong_query(text)
+
+    def _field_query(self, field, text):
+        """qf clause of one field; mm is applied per field (edismax with sow=false)"""
+        if FIELD_TYPES[field] == 'string':
+            return TermNode(field, text)
+        segments = self._analyze(field, text)
+        if not segments:
+            return None
+        nodes = [self._segment_node(field, paths) for paths in segments]
+        if len(nodes) == 1:
+            return nodes[0]
+        return BooleanNode(should=nodes, mm=min_should_match(len(nodes)))
+
+    def _phrase_query(self, field, text):
+        """pf clause of one field"""
+        if FIELD_TYPES[field] == 'string':
+            return TermNode(field, text)
+        segments = self._analyze(field, text)
+        if any(len(path) > 1 for paths in segments for path in paths):
+            # Token graph: one phrase per path through the graph
+            phrases = []
+            for combination in product(*segments):
+                terms = [term for path in combination for term in path]
+                phrases.append(TermNode(field, terms[0]) if len(terms) == 1
+                               else PhraseNode(field, [[t] for t in terms], PHRASE_SLOP))
+                if len(phrases) == MAX_BOOLEAN_CLAUSES:
+                    break
+            return BooleanNode(should=phrases)
+        if len(segments) < 2:
+            return None
+        return PhraseNode(field, [[path[0] for path in paths] for paths in segments], PHRASE_SLOP)
+
+    def _plan(self, text):
+        """(main query, phrase boost query) for a normalized query string"""
+        main = [BoostNode(q, boost) for field, boost in QF if (q := self._field_query(field, text)) is not None]
+        phrase = None
+        if len(text.split()) > 1:
+            clauses = [BoostNode(q, boost) for field, boost in PF if (q := self._phrase_query(field, text)) is not None]
+            phrase = DisMaxNode(clauses, TIE) if clauses else None
+        return (DisMaxNode(main, TIE) if main else None), phrase
+
+    # --- Search ---
+    def _matches_filters(self, doc, filters):
+        record = self.docs[doc]
+        for field, condition in filters.items():
+            value = record.get(field)
+            values = value if isinstance(value, list) else [value]
+            if isinstance(condition, tuple):
+                low, high = condition
+                if not any(v is not None and (low is None or v >= low) and (high is None or v <= high)
+                           for v in values):
+                    return False
+            elif condition not in values:
+                return False
+        return True
+
+    def _relevance(self, text):
+        """Text score (qf + pf) of every matching document; cached per query string"""
+        if text == '*:*':
+            return {doc: 1.0 for doc in range(len(self.docs))}
+        syntax = query_syntax(text)
+        if syntax is not None:
+            # Rewriting it as plain text would answer a different query than Solr does
+            raise UnsupportedQuery(f"{syntax!r} in {text!r} is query syntax the engine does not model")
+        main, phrase = self.plan(' '.join(text.translate(WORD_SEPARATORS).split()))
+        scores = main.evaluate(self) if main else {}
+        if phrase and scores:
+            phrase_scores = phrase.evaluate(self)
+            scores = {doc: score + phrase_scores.get(doc, 0.0) for doc, score in scores.items()}
+        return scores
+
+    def score_all(self, q):
+        """{doc: score} for every matching document; the bf part always uses the current likes"""
+        text = ' '.join(q.split())
+        if not text:
+            return {}
+        boosts = self.boosts
+        return {doc: score + boosts[doc] for doc, score in self.relevance(text).items()}
+
+    def search(self, q, rows=10, start=0, filters=None, fl=None):
+        """Solr-style response: numFound, start and the page of docs (with score), best first"""
+        scores = self.score_all(q)
+        if filters:
+            scores = {doc: s for doc, s in scores.items() if self._matches_filters(doc, filters)}
+        top = heapq.nsmallest(start + rows, scores.items(), key=lambda item: (-item[1], item[0]))[start:]
+        docs = []
+        for doc, score in top:
+            record = self.docs[doc]
+            if fl is not None:
+                record = {f: record[f] for f in fl if f in record}
+            docs.append({**record, 'score': score})
+        return {'numFound': len(scores), 'start': start, 'docs': docs}
+
+    def set_feedback(self, doc_id, likes=None, dislikes=None):
+        """Keep the bf inputs in sync with Solr (e.g. after feedback flushes)"""
+        doc = self.ids[str(doc_id)]
+        if likes is not None:
+            self.likes[doc] = likes
+        if dislikes is not None:
+            self.dislikes[doc] = dislikes
+        self.boosts[doc] = feedback_boost(self.likes[doc], self.dislikes[doc])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the processed menu in-process, approximating /fastfood_search")
+    parser.add_argument('query', nargs='+')
+    parser.add_argument('--input', default=DEFAULT_INPUT)
+    parser.add_argument('--rows', type=int, default=10)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    engine = SearchEngine.from_file(args.input)
+    print(f"Indexed {len(engine.docs)} docs in {(time.perf_counter() - started) * 1000:.0f} ms")
+    q = ' '.join(args.query)
+    started = time.perf_counter()
+    try:
+        result = engine.search(q, rows=args.rows, fl=['id', 'product_name', 'brand'])
+    except UnsupportedQuery as e:
+        parser.error(f"{e}; run it against Solr")
+    elapsed = (time.perf_counter() - started) * 1e6
+    print(f"{result['numFound']} results for '{q}' in {elapsed:.0f} µs")
+    for doc in result['docs']:
+        print(f"  {doc['score']:8.4f}  {doc['id']:>4}  {doc['brand']:<12} {doc['product_name']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+from autocomplete import Autocomplete
+from query_cache import QueryCache, normalize_filters, normalize_query
+from solr_client import DEFAULT_CORE, DEFAULT_SOLR_URL, SolrClient, SolrError
+
+SEARCH_HANDLER = 'fastfood_search'
+
+# Per-view field lists: what ProductCard shows vs. what pages/product/[id].vue shows
+LIST_FIELDS = [
+    'id', 'product_name', 'brand', 'category_main', 'category_sub', 'description', 'image_url',
+    'calories_kcal', 'protein_g', 'fat_g', 'carbs_g', 'sugar_g', 'salt_g', 'likes', 'dislikes',
+]
+DETAIL_FIELDS = LIST_FIELDS + ['url', 'original_category']
+# The large fields, only fetched when the detail page asks for them
+INGREDIENT_FIELDS = ['ingredients_text', 'components_list']
+
+# FilterBar slider -> Solr field; <name> is the maximum and <name>_min the minimum
+# ([min TO max], as in useFoodData; the minimum defaults to 0)
+RANGE_FILTERS = {'salt': 'salt_g', 'fat': 'fat_g', 'calories': 'calories_kcal'}
+RANGE_MINIMUMS = {f'{name}_min' for name in RANGE_FILTERS}
+FILTER_NAMES = {'category', 'company', 'collapse', *RANGE_FILTERS, *RANGE_MINIMUMS}
+# collapse=true keeps the best document per near-duplicate group (cluster_id); docs without one are kept
+COLLAPSE_FILTER = '{!collapse field=cluster_id nullPolicy=expand}'
+
+DEFAULT_ROWS = 24
+MAX_ROWS = 200
+
+
+def quote(value):
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def filter_queries(filters):
+    """The FilterBar state ({category, company, salt, fat, calories, <range>_min}) as fq clauses"""
+    fq = []
+    category = filters.get('category')
+    if category and category != 'All':
+        if ' > ' in category:
+            main, sub = category.split(' > ', 1)
+            fq.append(f"category_main:{quote(main)} AND category_sub:{quote(sub)}")
+        else:
+            fq.append(f"category_main:{quote(category)}")
+    company = filters.get('company')
+    if company and company != 'All':
+        fq.append(f"brand:{quote(company)}")
+    for name, field in RANGE_FILTERS.items():
+        low, high = filters.get(f'{name}_min'), filters.get(name)
+        if low in (None, '') and high in (None, ''):
+            continue
+        low = f"{float(low):g}" if low not in (None, '') else '0'
+        high = f"{float(high):g}" if high not in (None, '') else '*'
+        fq.append(f"{field}:[{low} TO {high}]")
+    if str(filters.get('collapse', '')).lower() in ('true', '1'):
+        fq.append(COLLAPSE_FILTER)
+    return fq
+
+
+def search_key(query, filters, cursor, rows):
+    """Normalized (filters, rows, cache key) of a search page request"""
+    filters = {name: value for name, value in (filters or {}).items() if name in FILTER_NAMES}
+    rows = max(1, min(int(rows), MAX_ROWS))
+    return filters, rows, ('search', normalize_query(query), normalize_filters(filters), cursor or '*', rows)
+
+
+def search_params(query, filters, cursor, rows):
+    return {
+        'q': query or '*:*',
+        'fq': filter_queries(filters),
+        'fl': ','.join(LIST_FIELDS),
+        'rows': rows,
+        'sort': 'score desc,id asc',
+        'cursorMark': cursor or '*',
+        'wt': 'json',
+    }
+
+
+def search_page(data, cursor):
+    """Solr response -> {'numFound', 'docs', 'nextCursor', 'done'}"""
+    next_cursor = data.get('nextCursorMark', cursor)
+    return {
+        'numFound': data['response']['numFound'],
+        'docs': data['response']['docs'],
+        'nextCursor': next_cursor,
+        # Solr returns the same cursor once the results are exhausted
+        'done': next_cursor == cursor,
+    }
+
+
+def lookup_params(product_id, fields):
+    return {'q': f"id:{quote(product_id)}", 'fl': ','.join(fields), 'rows': 1, 'wt': 'json'}
+
+
+class SearchGateway:
+    """
+    Paged, projected access to the fastfood_menu core.
+    Result lists are walked with cursorMark (sort ends on the uniqueKey, so pages
+    stay stable while likes/dislikes change scores) and only carry LIST_FIELDS;
+    product details and ingredients are separate, cheaper-than-search lookups.
+    With a QueryCache, pages and documents are served from it until they expire
+    or one of their products is invalidated. With an Autocomplete index it
+    also answers suggest-as-you-type without going to Solr.
+    """
+    def __init__(self, client, handler=SEARCH_HANDLER, cache=None, autocomplete=None):
+        self.client = client
+        self.handler = handler
+        self.cache = cache
+        self.autocomplete = autocomplete
+
+    def _cached(self, key, load):
+        return load() if self.cache is None else self.cache.get_or_load(key, load)
+
+    def search(self, query='', filters=None, cursor='*', rows=DEFAULT_ROWS):
+        """One page of results: {'numFound', 'docs', 'nextCursor', 'done'}"""
+        filters, rows, key = search_key(query, filters, cursor, rows)
+        return self._cached(key, lambda: self._search(query, filters, cursor, rows))
+
+    def _search(self, query, filters, cursor, rows):
+        params = search_params(query, filters, cursor, rows)
+        return search_page(self.client.select(params, handler=self.handler), params['cursorMark'])
+
+    def _get(self, product_id, fields):
+        data = self.client.select(lookup_params(product_id, fields))
+        docs = data['response']['docs']
+        return docs[0] if docs else None
+
+    def product(self, product_id, ingredients=False):
+        """Detail view; ingredients only on request (the page loads them lazily)"""
+        fields = DETAIL_FIELDS + (INGREDIENT_FIELDS if ingredients else [])
+        return self._cached(('product', str(product_id), ingredients), lambda: self._get(product_id, fields))
+
+    def ingredients(self, product_id):
+        return self._cached(('ingredients', str(product_id)),
+                            lambda: self._get(product_id, ['id'] + INGREDIENT_FIELDS))
+
+
+def make_server(gateway, host='127.0.0.1', port=8091):
+    """
+    GET /search?q=&category=&company=&salt=&fat=&calories=&collapse=&cursor=&rows=
+    GET /product/<id>[?ingredients=true]
+    GET /product/<id>/ingredients
+    GET /suggest?q=&k=
+    GET /cache/stats, POST /cache/invalidate with {"ids": [...], "delay": s} or {"all": true}
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive
+        disable_nagle_algorithm = True
+
+        def _send(self, status, payload):
+            data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            parts = [unquote(part) for part in url.path.strip('/').split('/')]
+            try:
+                if parts == ['search']:
+                    return self._send(200, gateway.search(params.get('q', ''), params, params.get('cursor', '*'),
+                                                          params.get('rows', DEFAULT_ROWS)))
+                if len(parts) in (2, 3) and parts[0] == 'product':
+                    if len(parts) == 3 and parts[2] != 'ingredients':
+                        return self._send(404, {'error': 'not found'})
+                    doc = (gateway.ingredients(parts[1]) if len(parts) == 3 else
+                           gateway.product(parts[1], params.get('ingredients') == 'true'))
+                    return self._send(200, doc) if doc else self._send(404, {'error': 'Product not found'})
+            except ValueError as e:
+                return self._send(400, {'error': str(e)})
+            except SolrError as e:
+                return self._send(502, {'error': str(e)})
+            if parts == ['suggest'] and gateway.autocomplete is not None:
+                return self._send(200, {'suggestions': gateway.autocomplete.complete(
+                    params.get('q', ''), int(params['k']) if params.get('k', '').isdigit() else None)})
+            if parts == ['cache', 'stats'] and gateway.cache is not None:
+                return self._send(200, gateway.cache.metrics())
+            self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/cache/invalidate' or gateway.cache is None:
+                return self._send(404, {'error': 'not found'})
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                delay = float(body.get('delay', 0))
+            except ValueError:
+                return self._send(400, {'error': 'invalid JSON'})
+            if body.get('all'):
+                gateway.cache.clear(delay)
+                return self._send(200, {'cleared': True})
+            self._send(200, {'invalidated': gateway.cache.invalidate(body.get('ids', []), delay)})
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paged search / product detail gateway in front of Solr")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8091)
+    parser.add_argument('--solr-url', default=DEFAULT_SOLR_URL)
+    parser.add_argument('--core', default=DEFAULT_CORE)
+    parser.add_argument('--cache-size', type=int, default=1000, help="Cached pages/documents (0 disables the cache)")
+    parser.add_argument('--cache-ttl', type=float, default=60.0, help="Seconds a cached result is served")
+    parser.add_argument('--suggest', action='store_true', help="Serve /suggest from the processed JSON and synonyms.txt")
+    args = parser.parse_args()
+
+    cache = QueryCache(args.cache_size, args.cache_ttl) if args.cache_size > 0 else None
+    autocomplete = Autocomplete.from_files().watch() if args.suggest else None
+    server = make_server(SearchGateway(SolrClient(args.solr_url, args.core), cache=cache, autocomplete=autocomplete),
+                         args.host, args.port)
+    print(f"Search gateway listening on http://{args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
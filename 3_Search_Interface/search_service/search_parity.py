@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+import sys
+import time
+from search_engine import SearchEngine, UnsupportedQuery
+from solr_client import DEFAULT_CORE, DEFAULT_SOLR_URL, SolrClient
+from solr_indexer import DEFAULT_INPUT
+
+DEFAULT_RECORDING = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fastfood_search_recording.json')
+# Committed recording of the engine itself (source "search_engine"): a regression baseline, not parity with Solr
+BASELINE_RECORDING = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'fastfood_search_baseline.json')
+
+# Single words, multi-word queries, synonym groups (single and multi-word), category names
+DEFAULT_QUERIES = [
+    'burger', 'chicken', 'fries', 'cheese', 'wrap', 'coffee', 'salad', 'vegan', 'breakfast', 'nuggets',
+    'big mac', 'chicken burger', 'spicy chicken wrap', 'bacon cheeseburger', 'ice cream', 'apple pie',
+    'popcorn chicken', 'french fries', 'quarter pounder', 'kentucky fried chicken', 'hash browns',
+    'Main', 'Drinks', 'Sides', 'milkshake', 'fish', '*:*',
+]
+
+
+def record(client, queries, rows):
+    """Query the live handler; also capture every non-zero like/dislike count (they feed bf)"""
+    recording = {'source': 'solr', 'core': client.core, 'rows': rows, 'queries': {}}
+    for q in queries:
+        response = client.select({'q': q, 'rows': rows, 'fl': 'id,score', 'wt': 'json'}, handler='fastfood_search')
+        recording['queries'][q] = {'numFound': response['response']['numFound'],
+                                   'docs': response['response']['docs']}
+    feedback = client.select({'q': '*:*', 'fq': 'likes:[1 TO *] OR dislikes:[1 TO *]', 'rows': 100000,
+                              'fl': 'id,likes,dislikes', 'wt': 'json'})
+    recording['feedback'] = feedback['response']['docs']
+    return recording
+
+
+def record_engine(engine, queries, rows):
+    """The same recording from the engine, for catching changes to it where no Solr is available"""
+    recording = {'source': 'search_engine', 'rows': rows, 'queries': {}}
+    for q in queries:
+        response = engine.search(q, rows=rows, fl=['id'])
+        recording['queries'][q] = {'numFound': response['numFound'], 'docs': response['docs']}
+    recording['feedback'] = [{'id': doc['id'], 'likes': engine.likes[i], 'dislikes': engine.dislikes[i]}
+                             for i, doc in enumerate(engine.docs) if engine.likes[i] or engine.dislikes[i]]
+    return recording
+
+
+def compare(expected, actual, tolerance):
+    """First difference between two ranked lists, or None; equal-score neighbours may swap"""
+    if expected['numFound'] != actual['numFound']:
+        return f"numFound {actual['numFound']} != {expected['numFound']}"
+    actual_scores = {str(doc['id']): doc['score'] for doc in actual['docs']}
+    for rank, doc in enumerate(expected['docs']):
+        doc_id = str(doc['id'])
+        score = actual_scores.get(doc_id)
+        if score is None or abs(score - doc['score']) > tolerance * max(1.0, abs(doc['score'])):
+            return f"rank {rank + 1}: id {doc_id} score {score} != {doc['score']}"
+        other = actual['docs'][rank]
+        if str(other['id']) != doc_id and abs(other['score'] - doc['score']) > tolerance * max(1.0, abs(doc['score'])):
+            return f"rank {rank + 1}: id {other['id']} instead of {doc_id}"
+    return None
+
+
+def check(engine, recording, tolerance):
+    for doc in recording.get('feedback', []):
+        if str(doc['id']) in engine.ids:
+            engine.set_feedback(doc['id'], doc.get('likes', 0), doc.get('dislikes', 0))
+    source = recording.get('source', 'solr')
+    failures = 0
+    for q, expected in recording['queries'].items():
+        started = time.perf_counter()
+        try:
+            actual = engine.search(q, rows=recording['rows'], fl=['id'])
+            problem = compare(expected, actual, tolerance)
+        except UnsupportedQuery as e:
+            problem = str(e)
+        elapsed = (time.perf_counter() - started) * 1e6
+        failures += problem is not None
+        print(f"{'OK ' if problem is None else 'BAD'} {q:<28} {expected['numFound']:>4} hits {elapsed:8.0f} µs"
+              + (f"  {problem}" if problem else ''))
+    print(f"\n{len(recording['queries']) - failures}/{len(recording['queries'])} queries match {source}")
+    if source != 'solr':
+        print("(not a Solr recording: this checks the engine against an earlier run of itself)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record /fastfood_search results from Solr, or check the in-process engine against them")
+    parser.add_argument('mode', choices=['record', 'record-baseline', 'check'],
+                        help="record-baseline records the engine itself (no Solr needed) to --recording")
+    parser.add_argument('--recording', default=DEFAULT_RECORDING)
+    parser.add_argument('--input', default=DEFAULT_INPUT, help="Processed menu file the Solr core was loaded from")
+    parser.add_argument('--solr-url', default=DEFAULT_SOLR_URL)
+    parser.add_argument('--core', default=DEFAULT_CORE)
+    parser.add_argument('--rows', type=int, default=20)
+    parser.add_argument('--queries', nargs='+', default=DEFAULT_QUERIES)
+    parser.add_argument('--tolerance', type=float, default=1e-4, help="Relative score tolerance (Solr scores are float32)")
+    args = parser.parse_args()
+
+    if args.mode == 'record':
+        recording = record(SolrClient(args.solr_url, args.core), args.queries, args.rows)
+        with open(args.recording, 'w', encoding='utf-8') as f:
+            json.dump(recording, f, ensure_ascii=False, indent=2)
+        print(f"Recorded {len(recording['queries'])} queries to {args.recording}")
+        return
+    if args.mode == 'record-baseline':
+        recording = record_engine(SearchEngine.from_file(args.input), args.queries, args.rows)
+        with open(args.recording, 'w', encoding='utf-8') as f:
+            json.dump(recording, f, ensure_ascii=False, indent=2)
+        print(f"Recorded the engine's results for {len(recording['queries'])} queries to {args.recording}")
+        return
+
+    with open(args.recording, 'r', encoding='utf-8') as f:
+        recording = json.load(f)
+    sys.exit(1 if check(SearchEngine.from_file(args.input), recording, args.tolerance) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_SOLR_URL = os.environ.get('SOLR_URL', 'http://localhost:8983/solr')
+DEFAULT_CORE = os.environ.get('SOLR_CORE', 'fastfood_menu')
+
+# Status codes worth retrying: Solr overloaded / restarting / proxy errors
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class SolrError(Exception):
+    """A Solr request that still failed after all retries"""
+
+
+class SolrClient:
+    """
+    Thin Solr HTTP client: one pooled keep-alive session shared by all threads,
+    JSON requests, and retries with exponential backoff for transient failures.
+    """
+    def __init__(self, base_url=DEFAULT_SOLR_URL, core=DEFAULT_CORE, pool_size=8,
+                 retries=3, backoff=0.5, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.core = core
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def url(self, handler):
+        return f"{self.base_url}/{self.core}/{handler.lstrip('/')}"
+
+    def request(self, method, handler, params=None, json=None):
+        """Send one request, retrying connection errors, timeouts and 429/5xx responses"""
+        url = self.url(handler)
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.request(method, url, params=params, json=json, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    try:
+                        return response.json()
+                    except ValueError as e:
+                        # e.g. an HTML error page from a proxy answered with 200
+                        raise SolrError(f"{method} {url} returned a non-JSON response: {e}") from e
+                error = f"HTTP {response.status_code}"
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = str(e)
+            except requests.exceptions.HTTPError as e:
+                # 4xx other than 429: the request itself is wrong, retrying will not help
+                raise SolrError(f"{method} {url} failed: {e}") from e
+            if attempt < self.retries:
+                time.sleep(self.backoff * 2 ** attempt)
+        raise SolrError(f"{method} {url} failed after {self.retries + 1} attempts: {error}")
+
+    def select(self, params, handler='select'):
+        return self.request('GET', handler, params=params)
+
+    def get(self, ids, fields=None):
+        """Real-time get: the latest version of each document, committed or not"""
+        params = {'ids': ','.join(map(str, ids))}
+        if fields:
+            params['fl'] = ','.join(fields)
+        return self.request('GET', 'get', params=params)['response']['docs']
+
+    def add(self, docs, commit_within=None):
+        """Add/replace documents; commitWithin (ms) lets Solr batch the commits"""
+        params = {'commitWithin': commit_within} if commit_within else None
+        return self.request('POST', 'update', params=params, json=list(docs))
+
+    def atomic_update(self, updates, commit_within=None):
+        """
+        Atomic updates, e.g. [{'id': '12', 'likes': {'inc': 3}}]. A `_version_`
+        in an update makes Solr apply it only to that version (409 otherwise).
+        """
+        return self.add(updates, commit_within)
+
+    def commit(self):
+        return self.request('POST', 'update', params={'commit': 'true'}, json={'commit': {}})
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from query_cache import notify_invalidation
+from solr_client import DEFAULT_CORE, DEFAULT_SOLR_URL, SolrClient, SolrError
+
+PROCESSED_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  '..', '..', '1_Data_Acquisition', '1.4_Processed_Data')
+DEFAULT_INPUT = os.path.join(PROCESSED_DATA_DIR, 'fast_food_menu_for_solr_V3.json')
+
+
+def iter_documents(filename):
+    """Documents from a JSON Lines file (streamed line by line) or a JSON array file"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        if filename.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def index_documents(client, docs, batch_size=500, workers=4, commit_within=10000):
+    """
+    Send documents in batches over `workers` parallel update streams.
+    At most two batches per worker are in flight, so memory stays bounded
+    for any input size. Returns (indexed count, failed batches).
+    """
+    indexed = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def collect(done):
+            nonlocal indexed
+            for future in done:
+                batch = pending.pop(future)
+                try:
+                    future.result()
+                    indexed += len(batch)
+                except SolrError as e:
+                    print(f"  Batch of {len(batch)} docs (first id {batch[0].get('id')}) failed: {e}")
+                    failed.append(batch)
+
+        for batch in batched(docs, batch_size):
+            if len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending[pool.submit(client.add, batch, commit_within)] = batch
+        collect(wait(pending).done)
+    return indexed, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load processed menu documents into Solr")
+    parser.add_argument('input', nargs='?', default=DEFAULT_INPUT, help="Processed JSON or JSON Lines file")
+    parser.add_argument('--solr-url', default=DEFAULT_SOLR_URL)
+    parser.add_argument('--core', default=DEFAULT_CORE)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=4, help="Parallel update streams")
+    parser.add_argument('--commit-within', type=int, default=10000, help="commitWithin in ms")
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--final-commit', action='store_true',
+                        help="Send one hard commit at the end (otherwise commitWithin makes the docs visible)")
+    parser.add_argument('--failed-output', help="Write documents of failed batches to this JSONL file")
+    parser.add_argument('--invalidate-url', help="Search gateway whose cache is cleared after indexing")
+    args = parser.parse_args()
+
+    client = SolrClient(args.solr_url, args.core, pool_size=args.workers, retries=args.retries)
+    started = time.perf_counter()
+    indexed, failed = index_documents(client, iter_documents(args.input), args.batch_size,
+                                      args.workers, args.commit_within)
+    if args.final_commit and indexed:
+        client.commit()
+    elapsed = time.perf_counter() - started
+    client.close()
+    if args.invalidate_url and indexed:
+        # New documents can match any cached query, so the whole cache goes
+        notify_invalidation(args.invalidate_url, delay=0 if args.final_commit else args.commit_within / 1000)
+
+    print(f"Indexed {indexed} documents into {args.core} in {elapsed:.2f}s "
+          f"({indexed / elapsed if elapsed else 0:,.0f} docs/s)")
+    if failed:
+        print(f"{len(failed)} batches failed ({sum(len(batch) for batch in failed)} documents)")
+        if args.failed_output:
+            with open(args.failed_output, 'w', encoding='utf-8') as f:
+                for batch in failed:
+                    for doc in batch:
+                        f.write(json.dumps(doc, ensure_ascii=False) + '\n')
+            print(f"Failed documents written to {args.failed_output} (re-run with it as input)")
+
+if __name__ == "__main__":
+    main()
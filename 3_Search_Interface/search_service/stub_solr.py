@@ -0,0 +1,219 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubSolr:
+    """
+    In-process stand-in for a Solr core, for trying the Python tools without Solr.
+    Every /update request is recorded in `batches` (params + body); added docs
+    and atomic `inc`/`set` updates are applied to an in-memory store that
+    /select serves back (honouring fl, start/rows and cursorMark, but not q/fq
+    beyond id lookups) and /get (real-time get by `ids`). Every stored doc has a
+    `_version_`; an update carrying one is applied only if it matches (-1: the
+    doc must not exist), otherwise the request answers 409 like Solr's optimistic
+    concurrency. `fail_next` makes the next N updates answer `fail_status` (503);
+    `fail_after_apply` does the same after applying them (the answer is lost).
+    `latency` (seconds per query) with at most `workers` queries running at
+    once models the query cost of a real core; `queries` counts /select calls.
+    `update_latency` (seconds per update) lets updates overlap;
+    `max_updates_in_flight` is the most that were ever processed at once.
+    """
+    def __init__(self, host='127.0.0.1', port=0, core='fastfood_menu', fail_next=0, latency=0.0, workers=4,
+                 update_latency=0.0, fail_status=503, fail_after_apply=0):
+        self.core = core
+        self.batches = []
+        self.docs = {}
+        self.fail_next = fail_next
+        self.fail_status = fail_status
+        self.fail_after_apply = fail_after_apply
+        self.version = 1 << 20  # Solr's versions are large; 1 and -1 have special meanings
+        self.latency = latency
+        self.update_latency = update_latency
+        self.queries = 0
+        self.updates_in_flight = 0
+        self.max_updates_in_flight = 0
+        self.lock = threading.Lock()
+        self.searchers = threading.Semaphore(workers)
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/solr"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def apply_update(self, params, body):
+        """Record one update request and apply it; returns the HTTP status to answer with"""
+        with self.lock:
+            self.updates_in_flight += 1
+            self.max_updates_in_flight = max(self.max_updates_in_flight, self.updates_in_flight)
+        try:
+            if self.update_latency:
+                time.sleep(self.update_latency)
+            return self._record_update(params, body)
+        finally:
+            with self.lock:
+                self.updates_in_flight -= 1
+
+    def _record_update(self, params, body):
+        with self.lock:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                return self.fail_status
+            self.batches.append({'params': params, 'body': body})
+            if isinstance(body, list):
+                for doc in body:
+                    # Docs before a conflicting one stay applied, as in Solr
+                    if not self._apply_doc(doc):
+                        return 409
+            if self.fail_after_apply > 0:
+                self.fail_after_apply -= 1
+                return self.fail_status
+            return 200
+
+    def _apply_doc(self, doc):
+        """Apply one doc or atomic update; False on a _version_ conflict"""
+        key = str(doc['id'])
+        doc = dict(doc)
+        expected = doc.pop('_version_', None)
+        existing = self.docs.get(key)
+        if expected is not None and expected != 0:
+            if (expected < 0 and existing is not None) or (expected > 0 and (
+                    existing is None or (expected != 1 and existing.get('_version_') != expected))):
+                return False
+        self.version += 1
+        operations = {field: value for field, value in doc.items() if isinstance(value, dict)}
+        if not operations:
+            self.docs[key] = {**doc, '_version_': self.version}
+            return True
+        stored = self.docs.setdefault(key, {'id': doc['id']})
+        for field, op in operations.items():
+            if 'inc' in op:
+                stored[field] = stored.get(field, 0) + op['inc']
+            elif 'set' in op:
+                stored[field] = op['set']
+        stored['_version_'] = self.version
+        return True
+
+    def get(self, params):
+        """Real-time get: {'response': {'docs'}} for the comma-separated `ids`"""
+        with self.lock:
+            docs = [dict(self.docs[key]) for key in params.get('ids', '').split(',') if key in self.docs]
+        if params.get('fl'):
+            fields = params['fl'].split(',')
+            docs = [{field: doc[field] for field in fields if field in doc} for doc in docs]
+        return {'response': {'numFound': len(docs), 'start': 0, 'docs': docs}}
+
+    def select(self, params):
+        q = params.get('q', '*:*')
+        if self.latency:
+            with self.searchers:
+                time.sleep(self.latency)
+        with self.lock:
+            self.queries += 1
+            if q.startswith('id:'):
+                docs = [self.docs[key] for key in [q[3:].strip('"')] if key in self.docs]
+            else:
+                docs = list(self.docs.values())
+        # cursorMark is an opaque token in Solr; here it is just the next offset
+        cursor = params.get('cursorMark')
+        start = int(params.get('start', 0)) if cursor is None else (0 if cursor == '*' else int(cursor))
+        rows = int(params.get('rows', 10))
+        page = docs[start:start + rows]
+        if params.get('fl'):
+            fields = params['fl'].split(',')
+            page = [{field: doc[field] for field in fields if field in doc} for doc in page]
+        result = {'responseHeader': {'status': 0, 'params': params},
+                  'response': {'numFound': len(docs), 'start': start, 'docs': page}}
+        if cursor is not None:
+            result['nextCursorMark'] = str(min(start + rows, len(docs))) if page else cursor
+        return result
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+            disable_nagle_algorithm = True
+
+            def _params(self):
+                query = parse_qs(urlparse(self.path).query)
+                return {key: values[-1] for key, values in query.items()}
+
+            def _route(self):
+                parts = urlparse(self.path).path.strip('/').split('/')
+                if len(parts) >= 3 and parts[0] == 'solr' and parts[1] == stub.core:
+                    return parts[2]
+                return None
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                route = self._route()
+                if route is None:
+                    return self._send(404, {'error': 'unknown core'})
+                if route == 'get':
+                    return self._send(200, stub.get(self._params()))
+                self._send(200, stub.select(self._params()))
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'null')
+                route = self._route()
+                if route is None:
+                    return self._send(404, {'error': 'unknown core'})
+                if route != 'update':
+                    return self._send(200, stub.select({**self._params(), **(body or {}).get('params', {})}))
+                status = stub.apply_update(self._params(), body)
+                if status == 409:
+                    return self._send(409, {'error': {'msg': 'version conflict', 'code': 409}})
+                if status != 200:
+                    return self._send(status, {'error': 'stub failure'})
+                self._send(200, {'responseHeader': {'status': 0}})
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stub Solr core that records update batches")
+    parser.add_argument('--port', type=int, default=8983)
+    parser.add_argument('--core', default='fastfood_menu')
+    parser.add_argument('--fail-next', type=int, default=0, help="Answer the first N updates with 503")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds each query takes")
+    parser.add_argument('--workers', type=int, default=4, help="Queries served concurrently")
+    args = parser.parse_args()
+
+    stub = StubSolr(port=args.port, core=args.core, fail_next=args.fail_next,
+                    latency=args.latency, workers=args.workers).start()
+    print(f"Stub Solr listening on {stub.base_url}/{args.core} (Ctrl+C to stop)")
+    try:
+        stub.thread.join()
+    except KeyboardInterrupt:
+        print(f"\n{len(stub.batches)} update requests, {len(stub.docs)} documents stored")
+        stub.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import os
+import sys
+import pytest
+
+# The service modules import each other as siblings, the way the scripts are run
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from solr_client import SolrClient
+from stub_solr import StubSolr
+
+
+@pytest.fixture
+def stub():
+    stub = StubSolr().start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def client(stub):
+    client = SolrClient(stub.base_url, stub.core, retries=3, backoff=0.01, timeout=5)
+    yield client
+    client.close()
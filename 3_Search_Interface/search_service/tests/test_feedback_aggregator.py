@@ -0,0 +1,187 @@
+import glob
+import os
+import threading
+import time
+from feedback_aggregator import FEEDBACK_FIELDS, FeedbackAggregator
+from solr_client import SolrClient
+
+
+def segments(log_dir):
+    return sorted(glob.glob(os.path.join(log_dir, 'feedback.*.log')))
+
+
+def batches(log_dir):
+    return sorted(glob.glob(os.path.join(log_dir, 'feedback.*.batch')))
+
+
+def counts(stub):
+    """{id: {field: count}} of the feedback fields stored in the stub"""
+    return {key: {field: doc[field] for field in FEEDBACK_FIELDS.values() if field in doc}
+            for key, doc in stub.docs.items()}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.01)
+
+
+def test_exact_totals_under_threads(stub, client, tmp_path):
+    aggregator = FeedbackAggregator(client, str(tmp_path), flush_interval=0.05, flush_size=50,
+                                    commit_within=1000, fsync=False).start()
+    threads, clicks = 8, 250
+
+    def click(worker):
+        for i in range(clicks):
+            aggregator.record(str(i % 5), 'like' if (i + worker) % 3 else 'dislike')
+
+    pool = [threading.Thread(target=click, args=(worker,)) for worker in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    aggregator.stop()
+
+    expected = {}
+    for worker in range(threads):
+        for i in range(clicks):
+            field = 'likes' if (i + worker) % 3 else 'dislikes'
+            fields = expected.setdefault(str(i % 5), {})
+            fields[field] = fields.get(field, 0) + 1
+    assert counts(stub) == expected
+    assert aggregator.stats['events'] == threads * clicks
+    assert all(batch['params'] == {'commitWithin': '1000'} for batch in stub.batches)
+    assert segments(str(tmp_path)) == [] and batches(str(tmp_path)) == []
+
+
+def test_failed_flush_keeps_batch_and_retries(stub, client, tmp_path):
+    client.retries = 0
+    aggregator = FeedbackAggregator(client, str(tmp_path), flush_interval=60)
+    aggregator.record('7', 'like')
+    aggregator.record('7', 'like')
+    stub.fail_next = 1
+    assert aggregator.flush() == 0
+    assert aggregator.stats['failed_flushes'] == 1
+    assert stub.docs == {} and len(batches(str(tmp_path))) == 1
+    aggregator.record('7', 'dislike')
+    # the failed batch is resent on its own first, then the newer click
+    assert aggregator.flush() == 2
+    assert counts(stub) == {'7': {'likes': 2, 'dislikes': 1}}
+    aggregator.stop()
+    assert segments(str(tmp_path)) == [] and batches(str(tmp_path)) == []
+
+
+def test_lost_answers_do_not_double_count(stub, tmp_path):
+    # Solr applies the update but the answer is lost: the client retries, then the flush is resent
+    client = SolrClient(stub.base_url, stub.core, retries=2, backoff=0.01, timeout=5)
+    aggregator = FeedbackAggregator(client, str(tmp_path), flush_interval=60)
+    for _ in range(3):
+        aggregator.record('4', 'like')
+    aggregator.record('6', 'dislike')
+    stub.fail_after_apply = 3  # the first attempt and both retries
+    assert aggregator.flush() == 0
+    assert counts(stub) == {'4': {'likes': 3}, '6': {'dislikes': 1}}
+    assert aggregator.flush() == 0  # resent: every product already has this batch
+    assert batches(str(tmp_path)) == []
+    aggregator.record('4', 'like')
+    aggregator.stop()
+    client.close()
+    assert counts(stub) == {'4': {'likes': 4}, '6': {'dislikes': 1}}
+
+
+def test_concurrent_writer_is_not_overwritten(stub, client, tmp_path):
+    aggregator = FeedbackAggregator(client, str(tmp_path), flush_interval=60)
+    aggregator.record('8', 'like')
+    aggregator.flush()
+    get = client.get
+
+    def get_then_other_write(ids, fields=None):
+        docs = get(ids, fields)
+        client.atomic_update([{'id': '8', 'likes': {'inc': 10}}])  # e.g. the direct like route
+        return docs
+
+    aggregator.record('8', 'like')
+    client.get = get_then_other_write
+    assert aggregator.flush() == 0  # 409: the _version_ it read is stale
+    client.get = get
+    assert aggregator.flush() == 1
+    aggregator.stop()
+    assert counts(stub) == {'8': {'likes': 12}}
+
+
+def test_recovers_segments_of_a_crashed_run(stub, client, tmp_path):
+    crashed = FeedbackAggregator(client, str(tmp_path), flush_interval=60)
+    for _ in range(3):
+        crashed.record('1', 'like')
+    crashed.record('2', 'dislike')
+    crashed._log.write('{"id": "3", "fie')  # torn last line: never acknowledged
+    crashed._log.close()  # crash: no flush, no stop
+    assert stub.batches == []
+
+    restarted = FeedbackAggregator(client, str(tmp_path), flush_interval=60)
+    restarted.record('2', 'dislike')
+    assert restarted.flush() == 2
+    restarted.stop()
+    assert counts(stub) == {'1': {'likes': 3}, '2': {'dislikes': 2}}
+    assert segments(str(tmp_path)) == []
+
+
+def test_recovers_a_batch_whose_answer_was_lost(stub, client, tmp_path):
+    crashed = FeedbackAggregator(client, str(tmp_path), flush_interval=60)
+    crashed.record('3', 'like')
+    crashed.record('3', 'like')
+    stub.fail_after_apply = 1
+    crashed.flush()  # applied by Solr, the retry gets 409, the batch file stays
+    crashed.record('3', 'dislike')
+    crashed._log.close()  # crash
+    assert len(batches(str(tmp_path))) == 1
+
+    restarted = FeedbackAggregator(client, str(tmp_path), flush_interval=60)
+    restarted.stop()
+    assert counts(stub) == {'3': {'likes': 2, 'dislikes': 1}}
+    assert segments(str(tmp_path)) == [] and batches(str(tmp_path)) == []
+
+
+def test_flusher_survives_unexpected_errors(stub, client, tmp_path):
+    class BrokenOnce:
+        def __init__(self):
+            self.calls = 0
+
+        def get(self, ids, fields=None):
+            return client.get(ids, fields)
+
+        def atomic_update(self, updates, commit_within=None):
+            self.calls += 1
+            if self.calls == 1:
+                raise RuntimeError("not a SolrError")
+            return client.atomic_update(updates, commit_within)
+
+    broken = BrokenOnce()
+    aggregator = FeedbackAggregator(broken, str(tmp_path), flush_interval=0.02).start()
+    aggregator.record('5', 'like')
+    wait_for(lambda: aggregator.stats['flushes'] == 1)
+    assert aggregator._thread.is_alive()
+    assert aggregator.stats['failed_flushes'] >= 1
+    aggregator.stop()
+    assert counts(stub) == {'5': {'likes': 1}}
+
+
+def test_failed_notification_is_not_a_failed_flush(stub, client, tmp_path):
+    notified = []
+
+    def on_flush(product_ids, delay):
+        notified.append(product_ids)
+        raise ConnectionError("gateway down")
+
+    aggregator = FeedbackAggregator(client, str(tmp_path), flush_interval=0.02, on_flush=on_flush).start()
+    aggregator.record('9', 'like')
+    wait_for(lambda: notified)
+    aggregator.record('9', 'like')
+    wait_for(lambda: len(notified) == 2)
+    assert aggregator._thread.is_alive()
+    aggregator.stop()
+    assert notified == [['9'], ['9']]
+    assert aggregator.stats['failed_flushes'] == 0
+    assert aggregator.stats['failed_notifications'] == 2
+    assert counts(stub) == {'9': {'likes': 2}}
@@ -0,0 +1,15 @@
+from query_cache import normalize_filters, normalize_query
+
+
+def test_query_case_is_part_of_the_key():
+    # category_main / category_sub are case-sensitive string fields in qf
+    assert normalize_query('Desserts') != normalize_query('desserts')
+
+
+def test_query_whitespace_is_collapsed():
+    assert normalize_query('  big   Mac ') == 'big Mac'
+    assert normalize_query('') == normalize_query('   ') == normalize_query(None) == '*:*'
+
+
+def test_filters_ignore_all_and_number_format():
+    assert normalize_filters({'company': 'All', 'salt': '2', 'category': ''}) == normalize_filters({'salt': 2.0})
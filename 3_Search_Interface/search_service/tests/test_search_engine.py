@@ -0,0 +1,54 @@
+import json
+import os
+import pytest
+from search_engine import SearchEngine, UnsupportedQuery
+from search_parity import BASELINE_RECORDING, DEFAULT_RECORDING, check
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return SearchEngine.from_file()
+
+
+def load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_matches_baseline(engine):
+    recording = load(BASELINE_RECORDING)
+    assert recording['source'] == 'search_engine'
+    assert check(engine, recording, tolerance=1e-9) == 0
+
+
+@pytest.mark.skipif(not os.path.exists(DEFAULT_RECORDING),
+                    reason="no Solr recording (python search_parity.py record against a running core)")
+def test_matches_solr_recording(engine):
+    assert check(engine, load(DEFAULT_RECORDING), tolerance=1e-4) == 0
+
+
+@pytest.mark.parametrize('q', [
+    '-burger', '+burger', 'burger AND fries', 'burger OR fries', 'NOT fries', 'burger && fries', 'burger||fries',
+    'product_name:burger', '"big mac"', 'burg*', 'burge?', 'burger~1', 'burger^2', '(burger)',
+    'calories_kcal:[0 TO 500]', '/burg.*/', 'burger!',
+])
+def test_rejects_query_syntax(engine, q):
+    with pytest.raises(UnsupportedQuery):
+        engine.search(q)
+
+
+def test_plain_text_is_not_syntax(engine):
+    # lower-case operator words, hyphens inside words and match-all stay supported
+    assert engine.search('burger and fries')['numFound'] > 0
+    assert engine.search('coca-cola')['numFound'] == engine.search('coca cola')['numFound']
+    assert engine.search('*:*')['numFound'] == len(engine.docs)
+
+
+def test_feedback_changes_ranking(engine):
+    last = engine.search('burger', rows=93, fl=['id'])['docs'][-1]
+    likes = engine.likes[engine.ids[str(last['id'])]]
+    engine.set_feedback(last['id'], likes=10 ** 6)
+    try:
+        assert engine.search('burger', rows=1, fl=['id'])['docs'][0]['id'] == last['id']
+    finally:
+        engine.set_feedback(last['id'], likes=likes)
@@ -0,0 +1,19 @@
+import pytest
+from search_gateway import filter_queries, search_key
+
+
+@pytest.mark.parametrize('filters, expected', [
+    ({'salt': '2'}, ['salt_g:[0 TO 2]']),
+    ({'salt': '2', 'salt_min': '0.5'}, ['salt_g:[0.5 TO 2]']),
+    ({'calories_min': 300}, ['calories_kcal:[300 TO *]']),
+    ({'fat': 40, 'fat_min': ''}, ['fat_g:[0 TO 40]']),
+    ({'fat': '', 'fat_min': None}, []),
+])
+def test_range_filters(filters, expected):
+    assert filter_queries(filters) == expected
+
+
+def test_minimums_are_part_of_the_key():
+    filters, _, key = search_key('burger', {'salt': '2', 'salt_min': '1', 'unknown': 'x'}, '*', 24)
+    assert filters == {'salt': '2', 'salt_min': '1'}
+    assert key != search_key('burger', {'salt': '2'}, '*', 24)[2]
@@ -0,0 +1,97 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from solr_client import SolrClient, SolrError
+from solr_indexer import index_documents
+
+
+def docs(count):
+    return [{'id': str(i), 'product_name': f"Item {i}"} for i in range(count)]
+
+
+@pytest.mark.parametrize('status', [429, 500, 502, 503, 504])
+def test_retries_transient_status(stub, client, status):
+    stub.fail_status = status
+    stub.fail_next = 2
+    client.add(docs(3))
+    assert len(stub.batches) == 1
+    assert stub.fail_next == 0
+
+
+def test_gives_up_after_retries(stub, client):
+    stub.fail_next = client.retries + 1
+    with pytest.raises(SolrError, match='after 4 attempts: HTTP 503'):
+        client.add(docs(1))
+    assert stub.batches == []
+
+
+def test_client_error_is_not_retried(stub, client):
+    stub.fail_status = 400
+    stub.fail_next = 1
+    with pytest.raises(SolrError):
+        client.add(docs(1))
+    # the one failure was used up by the first attempt and not retried
+    assert stub.fail_next == 0 and stub.batches == []
+
+
+def test_non_json_response_raises_solr_error():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            data = b'<html>Bad gateway</html>'
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        host, port = server.server_address[:2]
+        client = SolrClient(f"http://{host}:{port}/solr", retries=0)
+        with pytest.raises(SolrError, match='non-JSON'):
+            client.select({'q': '*:*'})
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_index_documents_batch_sizes(stub, client):
+    indexed, failed = index_documents(client, docs(1234), batch_size=100, workers=3, commit_within=7000)
+    assert (indexed, failed) == (1234, [])
+    assert sorted(len(batch['body']) for batch in stub.batches) == [34] + [100] * 12
+    assert all(batch['params'] == {'commitWithin': '7000'} for batch in stub.batches)
+    assert len(stub.docs) == 1234
+
+
+def test_index_documents_in_flight_window(stub, client):
+    stub.update_latency = 0.02
+    workers, batch_size = 2, 10
+    consumed = []
+    ahead = []
+
+    def stream():
+        for doc in docs(300):
+            # documents read from the input but not yet accepted by Solr
+            ahead.append(len(consumed) - sum(len(batch['body']) for batch in stub.batches))
+            consumed.append(doc)
+            yield doc
+
+    indexed, failed = index_documents(client, stream(), batch_size=batch_size, workers=workers)
+    assert (indexed, failed) == (300, [])
+    assert stub.max_updates_in_flight == workers
+    # two batches per worker in flight, plus the one being read
+    assert max(ahead) <= (workers * 2 + 1) * batch_size
+
+
+def test_index_documents_reports_failed_batches(stub):
+    client = SolrClient(stub.base_url, stub.core, retries=0)
+    stub.fail_next = 1
+    indexed, failed = index_documents(client, docs(50), batch_size=10, workers=1)
+    client.close()
+    assert indexed == 40
+    assert [len(batch) for batch in failed] == [10]
@@ -0,0 +1,354 @@
+import os
+import re
+import unicodedata
+
+# Analysis chains of the fastfood_menu core, re-implemented in Python so the
+# in-process engine produces the same terms as Solr (see managed-schema.xml)
+
+SOLR_CONF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '..', '..', '2_Solr_Configuration', 'fastfood_menu', 'conf')
+
+# StandardTokenizer (UAX#29 word breaks), approximated: runs of letters/digits,
+# joined by . ' ’ inside words, : between letters and , ; between digits
+TOKEN_PATTERN = re.compile(r"\w+(?:(?:[.'’]|(?<=[^\W\d_]):(?=[^\W\d_])|(?<=\d)[,;](?=\d))\w+)*")
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text) if text else []
+
+
+def ascii_fold(token):
+    """ASCIIFoldingFilter for the accented latin letters found in menu text"""
+    if token.isascii():
+        return token
+    return ''.join(c for c in unicodedata.normalize('NFKD', token) if not unicodedata.combining(c))
+
+
+# --- I. Porter Stemmer (port of Lucene's PorterStemmer) ---
+
+class PorterStemmer:
+    """The original Porter algorithm, step for step as in org.apache.lucene.analysis.en.PorterStemmer"""
+    def __init__(self):
+        self.b = []
+        self.k = 0
+        self.j = 0
+
+    def cons(self, i):
+        ch = self.b[i]
+        if ch in 'aeiou':
+            return False
+        if ch == 'y':
+            return True if i == 0 else not self.cons(i - 1)
+        return True
+
+    def m(self):
+        n = 0
+        i = 0
+        j = self.j
+        while True:
+            if i > j:
+                return n
+            if not self.cons(i):
+                break
+            i += 1
+        i += 1
+        while True:
+            while True:
+                if i > j:
+                    return n
+                if self.cons(i):
+                    break
+                i += 1
+            i += 1
+            n += 1
+            while True:
+                if i > j:
+                    return n
+                if not self.cons(i):
+                    break
+                i += 1
+            i += 1
+
+    def vowelinstem(self):
+        return any(not self.cons(i) for i in range(self.j + 1))
+
+    def doublec(self, j):
+        return j >= 1 and self.b[j] == self.b[j - 1] and self.cons(j)
+
+    def cvc(self, i):
+        if i < 2 or not self.cons(i) or self.cons(i - 1) or not self.cons(i - 2):
+            return False
+        return self.b[i] not in 'wxy'
+
+    def ends(self, s):
+        length = len(s)
+        if length > self.k + 1 or ''.join(self.b[self.k - length + 1:self.k + 1]) != s:
+            return False
+        self.j = self.k - length
+        return True
+
+    def setto(self, s):
+        self.b[self.j + 1:] = list(s)
+        self.k = self.j + len(s)
+
+    def r(self, s):
+        if self.m() > 0:
+            self.setto(s)
+
+    def step1(self):
+        b = self.b
+        if b[self.k] == 's':
+            if self.ends('sses'):
+                self.k -= 2
+            elif self.ends('ies'):
+                self.setto('i')
+            elif b[self.k - 1] != 's':
+                self.k -= 1
+        del b[self.k + 1:]
+        if self.ends('eed'):
+            if self.m() > 0:
+                self.k -= 1
+        elif (self.ends('ed') or self.ends('ing')) and self.vowelinstem():
+            self.k = self.j
+            del b[self.k + 1:]
+            if self.ends('at'):
+                self.setto('ate')
+            elif self.ends('bl'):
+                self.setto('ble')
+            elif self.ends('iz'):
+                self.setto('ize')
+            elif self.doublec(self.k):
+                ch = b[self.k]
+                self.k -= 1
+                if ch in 'lsz':
+                    self.k += 1
+            elif self.m() == 1 and self.cvc(self.k):
+                self.setto('e')
+        del b[self.k + 1:]
+
+    def step2(self):
+        if self.ends('y') and self.vowelinstem():
+            self.b[self.k] = 'i'
+
+    STEP3 = {
+        'a': (('ational', 'ate'), ('tional', 'tion')),
+        'c': (('enci', 'ence'), ('anci', 'ance')),
+        'e': (('izer', 'ize'),),
+        'l': (('bli', 'ble'), ('alli', 'al'), ('entli', 'ent'), ('eli', 'e'), ('ousli', 'ous')),
+        'o': (('ization', 'ize'), ('ation', 'ate'), ('ator', 'ate')),
+        's': (('alism', 'al'), ('iveness', 'ive'), ('fulness', 'ful'), ('ousness', 'ous')),
+        't': (('aliti', 'al'), ('iviti', 'ive'), ('biliti', 'ble')),
+        'g': (('logi', 'log'),),
+    }
+    STEP4 = {
+        'e': (('icate', 'ic'), ('ative', ''), ('alize', 'al')),
+        'i': (('iciti', 'ic'),),
+        'l': (('ical', 'ic'), ('ful', '')),
+        's': (('ness', ''),),
+    }
+    STEP5 = {
+        'a': ('al',), 'c': ('ance', 'ence'), 'e': ('er',), 'i': ('ic',), 'l': ('able', 'ible'),
+        'n': ('ant', 'ement', 'ment', 'ent'), 'o': ('ion', 'ou'), 's': ('ism',), 't': ('ate', 'iti'),
+        'u': ('ous',), 'v': ('ive',), 'z': ('ize',),
+    }
+
+    def step3(self):
+        if self.k == 0:
+            return
+        for suffix, replacement in self.STEP3.get(self.b[self.k - 1], ()):
+            if self.ends(suffix):
+                self.r(replacement)
+                return
+
+    def step4(self):
+        for suffix, replacement in self.STEP4.get(self.b[self.k], ()):
+            if self.ends(suffix):
+                self.r(replacement)
+                return
+
+    def step5(self):
+        if self.k == 0:
+            return
+        for suffix in self.STEP5.get(self.b[self.k - 1], ()):
+            if self.ends(suffix):
+                if suffix == 'ion' and not (self.j >= 0 and self.b[self.j] in 'st'):
+                    continue
+                break
+        else:
+            return
+        if self.m() > 1:
+            self.k = self.j
+            del self.b[self.k + 1:]
+
+    def step6(self):
+        self.j = self.k
+        if self.b[self.k] == 'e':
+            a = self.m()
+            if a > 1 or (a == 1 and not self.cvc(self.k - 1)):
+                self.k -= 1
+        if self.b[self.k] == 'l' and self.doublec(self.k) and self.m() > 1:
+            self.k -= 1
+        del self.b[self.k + 1:]
+
+    def stem(self, word):
+        if len(word) <= 2:
+            return word
+        self.b = list(word)
+        self.k = len(word) - 1
+        self.j = 0
+        self.step1()
+        self.step2()
+        self.step3()
+        self.step4()
+        self.step5()
+        self.step6()
+        return ''.join(self.b[:self.k + 1])
+
+
+_stemmer = PorterStemmer()
+_stem_cache = {}
+
+
+def porter_stem(word):
+    try:
+        return _stem_cache[word]
+    except KeyError:
+        _stem_cache[word] = stem = _stemmer.stem(word)
+        return stem
+
+
+# --- II. Word Lists and Synonyms ---
+
+def load_word_list(filename):
+    """Stop word file in Solr's plain format ('#' comments)"""
+    words = set()
+    if not os.path.exists(filename):
+        return words
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                words.add(line)
+    return words
+
+
+def load_synonyms(filename):
+    """
+    Parse synonyms.txt like SolrSynonymParser (expand=true, ignoreCase=true):
+    returns {input tuple: (output tuples, keep original)} with outputs
+    deduplicated in first-seen order. Rule words are only whitespace-split and
+    lowercased, not run through the rest of the field's analysis chain.
+    """
+    rules = {}
+
+    def phrase(text):
+        return tuple(text.lower().split())
+
+    def add(source, target, keep_orig):
+        outputs, keep = rules.get(source, ([], False))
+        if target not in outputs:
+            outputs.append(target)
+        rules[source] = (outputs, keep or keep_orig)
+
+    if not os.path.exists(filename):
+        return rules
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            if '=>' in line:
+                left, right = line.split('=>', 1)
+                inputs = [phrase(p) for p in left.split(',') if p.strip()]
+                outputs = [phrase(p) for p in right.split(',') if p.strip()]
+                for source in inputs:
+                    for target in outputs:
+                        add(source, target, False)
+            else:
+                group = [phrase(p) for p in line.split(',') if p.strip()]
+                for source in group:
+                    for target in group:
+                        if source != target:
+                            add(source, target, True)
+    return {source: (tuple(outputs), keep) for source, (outputs, keep) in rules.items()}
+
+
+def apply_synonyms(tokens, rules, lowercase_match=False):
+    """
+    SynonymGraphFilter: greedy longest match at each token.
+    Returns segments, each a tuple of paths (tuples of tokens): unmatched
+    tokens become one single-token path, a match becomes all its outputs.
+    """
+    max_len = max((len(source) for source in rules), default=0)
+    keys = [t.lower() for t in tokens] if lowercase_match else tokens
+    segments = []
+    i = 0
+    while i < len(tokens):
+        for length in range(min(max_len, len(tokens) - i), 0, -1):
+            rule = rules.get(tuple(keys[i:i + length]))
+            if rule is not None:
+                outputs, keep_orig = rule
+                paths = list(outputs)
+                if keep_orig:
+                    paths.insert(0, tuple(tokens[i:i + length]))
+                segments.append((tuple(paths), length))
+                i += length
+                break
+        else:
+            segments.append((((tokens[i],),), 1))
+            i += 1
+    return segments
+
+
+def synonym_positions(paths):
+    """
+    Positions a synonym match occupies in the index: one for the start node
+    plus one per intermediate node of every multi-token path.
+    """
+    return 1 + sum(len(path) - 1 for path in paths)
+
+
+# --- III. Field Analyzers ---
+
+class Analyzers:
+    """The text_general and text_enhanced_strong chains, loaded from the core's conf directory"""
+    def __init__(self, conf_dir=SOLR_CONF_DIR):
+        self.stopwords = {w.lower() for w in load_word_list(os.path.join(conf_dir, 'stopwords.txt'))}
+        self.stopwords_en = load_word_list(os.path.join(conf_dir, 'lang', 'stopwords_en.txt'))
+        self.synonyms = load_synonyms(os.path.join(conf_dir, 'synonyms.txt'))
+
+    # text_general, index: standard -> stop(ignoreCase) -> lowercase -> porter
+    def general_index(self, text):
+        """Tokens with positions (stop words leave a position gap)"""
+        tokens = []
+        position = -1
+        for token in tokenize(text):
+            position += 1
+            if token.lower() in self.stopwords:
+                continue
+            tokens.append((porter_stem(token.lower()), position))
+        return tokens, position + 1
+
+    # text_general, query: standard -> stop -> synonyms(ignoreCase) -> lowercase -> porter
+    def general_query(self, text):
+        tokens = [t for t in tokenize(text) if t.lower() not in self.stopwords]
+        return [tuple(tuple(porter_stem(t.lower()) for t in path) for path in paths)
+                for paths, _ in apply_synonyms(tokens, self.synonyms, lowercase_match=True)]
+
+    # text_enhanced_strong (index and query): standard -> lowercase -> asciifolding -> porter -> stop -> synonyms
+    def _strong_tokens(self, text):
+        stems = (porter_stem(ascii_fold(t.lower())) for t in tokenize(text))
+        return [t for t in stems if t not in self.stopwords_en]
+
+    def strong_query(self, text):
+        return [paths for paths, _ in apply_synonyms(self._strong_tokens(text), self.synonyms)]
+
+    def strong_index(self, text):
+        """(terms, field length): synonym outputs are indexed in place of the matched tokens"""
+        terms = []
+        length = 0
+        for paths, _ in apply_synonyms(self._strong_tokens(text), self.synonyms):
+            for path in paths:
+                terms.extend(path)
+            length += synonym_positions(paths)
+        return terms, length